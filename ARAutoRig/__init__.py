@@ -1,5 +1,6 @@
-from _autoRig_Body import ARAutoRig_Body
 # ARAutoRig must be deleted in the future from the init.py
 #import ARAutoRig_Abstract
-from _autoRig_Face import ARAutoRig_Face
-
+# builder classes are imported on first access
+from ..ARCore import ARLazy
+ARLazy.lazyPackage(__name__, ['_autoRig_Abstract', '_autoRig_Body', '_autoRig_Face'],
+                   {'ARAutoRig_Body': '_autoRig_Body', 'ARAutoRig_Face': '_autoRig_Face'})
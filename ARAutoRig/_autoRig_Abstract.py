@@ -1,13 +1,13 @@
 import pymel.core as pm
-import re
 from maya import OpenMaya
 
 from ..ARCore import ARCore as ARC
+from ..ARCore import ARNameIndex
+from ..ARCore import ARProfiler
+from ..ARCore import ARMatrixCache
 
-import logging
-logging.basicConfig()
-logger = logging.getLogger('ARAutoRig_Abstract:')
-logger.setLevel(logging.DEBUG)
+from ..ARCore import ARLogging
+logger = ARLogging.getLogger('ARAutoRig.ARAutoRig_Abstract')
 
 class _ARAutoRig_Abstract(object):
     def __init__(self, chName, path):
@@ -23,6 +23,8 @@ class _ARAutoRig_Abstract(object):
         self._lastSide = ""  # store the last created side, useful for ikfk systems for example
         # skin joints name marker
         self._skinJointNaming = "skin_joint"  # naming of an skin joint
+        # scene joints by name, to find the skin joints without scanning the scene
+        self._jointIndex = ARNameIndex.JointNameIndex(skinJointNaming=self._skinJointNaming)
 
         # create necessary groups
         # check if noXform exist
@@ -41,6 +43,22 @@ class _ARAutoRig_Abstract(object):
             pm.PyNode('rig_grp').addChild(self._ctrGrp)
 
 
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+
+    def close(self):
+        """
+        Release the scene callbacks of the builder, call it when the build ends
+        """
+        self._jointIndex.close()
+
+
     # method decorator, check if already exist the rig part,
     # and create the necessary attr circuity (nodes with controllers connections)
     class checker_auto(object):
@@ -70,7 +88,7 @@ class _ARAutoRig_Abstract(object):
                     moduleNode = None
 
                 if moduleNode:
-                    logger.debug('%s %s module exist yet' % (nodeName))
+                    logger.debug('%s module exist yet', nodeName)
                     return None
 
                 # if module does not exist, run method
@@ -107,6 +125,7 @@ class _ARAutoRig_Abstract(object):
             return wrapper
 
 
+    @ARProfiler.profiled
     def latticeBend_auto(self, lattice, parent):
         """
         Given a lattice, create a bend deformer and connect it to the rig
@@ -127,9 +146,9 @@ class _ARAutoRig_Abstract(object):
 
         # lattice nodes
         ffd = lattice.worldMatrix.outputs()[0]
-        logger.debug('ffd1: %s' % ffd)
+        logger.debug('ffd1: %s', ffd)
         latticeBase = ffd.baseLatticeMatrix.inputs()[0]
-        logger.debug('latticeBase %s' % latticeBase)
+        logger.debug('latticeBase %s', latticeBase)
 
         # look if lastSide attr exist
         baseName = [self._chName, self._lastZone]
@@ -198,7 +217,7 @@ class _ARAutoRig_Abstract(object):
         controller = self._create_controller('%s_ctr' % str(ctrTrns), ctrType, ctrSize, 24)
         # align with cluster, we need to query world space pivot
         if ctrNull:
-            matrix = pm.xform(ctrNull, ws=True, q=True, m=True)
+            matrix = ARMatrixCache.worldMatrix(ctrNull)
             if symCtr:
                 # reflected matrix
                 matrix = ARC.VectorMath.reflectedMatrix(matrix, True)
@@ -221,6 +240,7 @@ class _ARAutoRig_Abstract(object):
         return [controller], []
 
 
+    @ARProfiler.profiled
     def point_auto(self, zone, parent):
         """
         Create a simple point control for a joint
@@ -228,16 +248,15 @@ class _ARAutoRig_Abstract(object):
         :param parent: parent of the controllers
         :return:
         """
-        pointJoints = [point for point in pm.ls() if re.match('^%s.*%s$' % (zone, self._skinJointNaming), str(point))]
+        pointJoints = self._jointIndex.skinJoints(zone)
 
-        # create controllers
-        pointControllers = []
-        for joint in pointJoints:
-            controller = self._create_controller(str(joint).replace('joint', 'ctr'), 'pole', 2, 10)
-            pm.xform(controller, ws=True, m=pm.xform(joint, ws=True, q=True, m=True))
+        # create controllers, all in one pass
+        specs = [(str(joint).replace('joint', 'ctr'), 'pole', 2, 10, ARMatrixCache.worldMatrix(joint))
+                 for joint in pointJoints]
+        pointControllers = [handle.node() for handle in self._create_controllers(specs)]
+        for controller in pointControllers:
             # hierarchy
             parent.addChild(controller)
-            pointControllers.append(controller)
 
         # roots
         ARC.createRoots(pointControllers)
@@ -262,6 +281,17 @@ class _ARAutoRig_Abstract(object):
         return controller
 
 
+    def _create_controllers(self, specs):
+        """
+        Create several controllers in one pass
+        Args:
+            specs: list of (name, controllerType, scale, colorIndex, matrix), matrix None -> stored position
+        return:
+            list of ARC.ControllerHandle, call node() to get the pymel transformNode
+        """
+        return ARC.createControllers(specs, self._chName, self._path)
+
+
     def addShapeCtr(self, controllers, sizeCtr, customCtr, color=17):
         """
         Add a shape to the controller
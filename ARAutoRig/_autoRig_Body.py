@@ -4,12 +4,13 @@ from maya import OpenMaya
 
 from ..ARCore import ARCore as ARC
 from ..ARCore import ARHelper as ARH
+from ..ARCore import ARProfiler
+from ..ARCore import ARMatrixCache
 from _autoRig_Abstract import _ARAutoRig_Abstract
 
 import logging
-logging.basicConfig()
-logger = logging.getLogger('ARAutoRig_Body:')
-logger.setLevel(logging.DEBUG)
+from ..ARCore import ARLogging
+logger = ARLogging.getLogger('ARAutoRig.ARAutoRig_Body')
 
 # TODO: main Joints, naming pe. akona_foreArm_main. similar a joint name
 # TODO: Name convention revision
@@ -50,6 +51,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
                                       ['X', 'Y', 'Z'])
 
     # TODO: zone var in names
+    @ARProfiler.profiled
     def spine_auto(self, zone='spine', *funcs):
         """
         Auto create a character spine
@@ -59,14 +61,12 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         baseName = zone
 
         # detect spine joints and their positions
-        spineJoints = [point for point in pm.ls() if
-                       re.match('^%s.*%s$' % (zone, self._skinJointNaming),
-                                str(point))]
+        spineJoints = self._jointIndex.skinJoints(zone)
 
         positions = [point.getTranslation(space='world') for point in
                      spineJoints]
 
-        logger.debug('Spine joints: %s' % spineJoints)
+        logger.debug('Spine joints: %s', spineJoints)
 
         spineCurveTransform = pm.curve(ep=positions, name='%s_1_crv' % baseName)
         # parent to nXform grp
@@ -83,7 +83,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
                         rt=0, d=3, kt=0, kr=0)
 
         # review: test autoMethod
-        ARC.snapCurveToPoints(spineJoints, spineCurve, 16, 0.01)
+        ARC.snapCurveToPoints(spineJoints, spineCurve, 2, 0.01, 'leastSquares')
 
         #TODO: nameController variable
         # create locators and connect to curve CV's
@@ -112,7 +112,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
             # create controller and parent locator
             spineController = self._create_controller(
                 '%s_%s_1_ik_ctr' % (baseName, ctrType), '%sIk' % ctrType, 1, 17)
-            logger.debug('spine controller: %s' % spineController)
+            logger.debug('spine controller: %s', spineController)
 
             spineController.setTranslation(point)
 
@@ -134,8 +134,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
                 if len(spineFKControllerList) > 1:
                     spineFKControllerList[n - 1].addChild(spineFKController)
 
-                    logger.debug('parent %s, child %s' % (
-                    spineFKControllerList[-1], spineFKController))
+                    logger.debug('parent %s, child %s', spineFKControllerList[-1], spineFKController)
 
             # configure ctr hierarchy, valid for 5 ctrllers
             if n == 1:
@@ -240,9 +239,9 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         totalDistance = ObjectUpVectorList[-1].getTranslation('world') \
                         - ObjectUpVectorList[0].getTranslation('world')
 
-        logger.debug('totalDistance: %s' % totalDistance)
+        logger.debug('totalDistance: %s', totalDistance)
         totalDistance = totalDistance.length()
-        logger.debug('totalDistance: %s' % totalDistance)
+        logger.debug('totalDistance: %s', totalDistance)
 
         # can't do this before, because we need de first and
         # the last upVectorObjects to config the pointConstraints
@@ -281,7 +280,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
 
             # TODO: do this more legible if it is possible
             if re.match(".*(Tip|hips).*", str(joint)):
-                logger.debug("Spine ini and end joint: %s" % str(joint))
+                logger.debug("Spine ini and end joint: %s", joint)
                 # last joint and first joint connect to controller
                 # if hips, use de min val, zero. when end, n will be bigger
                 # than ik controllers, so use  the last ik controller.
@@ -350,6 +349,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         return self._spineIKControllerList, spineFKControllerList
 
 
+    @ARProfiler.profiled
     def neckHead_auto(self, zone='neckHead', *funcs):
         """
         Create neck head system.
@@ -360,8 +360,8 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         self._lastZone = zone
         baseName = zone
         # store joints, not end joint
-        neckHeadJoints = [point for point in pm.ls() if re.match('^%s.*%s$' % (zone, self._skinJointNaming), str(point))]
-        logger.debug('Neck head joints: %s' % neckHeadJoints)
+        neckHeadJoints = self._jointIndex.skinJoints(zone)
+        logger.debug('Neck head joints: %s', neckHeadJoints)
         positions = [point.getTranslation(space='world') for point in neckHeadJoints[:-1]]  # no tip joint
 
         neckHeadCurveTransform = pm.curve(ep=positions, name='%s1_crv' % baseName)
@@ -375,7 +375,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
 
         # rebuildCurve
         pm.rebuildCurve(neckHeadCurve, s=2, rpo=True, ch=False, rt=0, d=3, kt=0, kr=0)
-        ARC.snapCurveToPoints(neckHeadJoints[:-1], neckHeadCurve, 16, 0.01)
+        ARC.snapCurveToPoints(neckHeadJoints[:-1], neckHeadCurve, 2, 0.01, 'leastSquares')
 
         # create locators and connect to curve CV's
         neckHeadDrvList = []
@@ -400,7 +400,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
                 # create controller and parent drivers to controllers
                 ctrType = 'neck' if not len(self.neckHeadIKCtrList) else 'head'
                 neckHeadIKCtr = self._create_controller('%s_%s_ik_ctr' % (baseName, ctrType), '%sIk' % ctrType, 1, 17)
-                logger.debug('neckHead controller: %s' % neckHeadIKCtr)
+                logger.debug('neckHead controller: %s', neckHeadIKCtr)
 
                 if n == neckHeadCurve.numCVs() - 1:  # las iteration
                     lastSpineIkController = self.neckHeadIKCtrList[-1].getTranslation('world')
@@ -427,7 +427,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
                     # Fk hierarchy, if we have more fk controllers. not the case TODO: more procedural
                     if len(neckHeadFKCtrList) > 2:
                         neckHeadFKCtrList[n-1].addChild(neckHeadFKCtr)
-                        logger.debug('parent %s, child %s' % (neckHeadFKCtrList[-1], neckHeadFKCtr))
+                        logger.debug('parent %s, child %s', neckHeadFKCtrList[-1], neckHeadFKCtr)
 
         # configure ctr hierarchy
         neckHeadFKCtrList[-1].addChild(self.neckHeadIKCtrList[-1])
@@ -602,6 +602,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         return self.neckHeadIKCtrList, neckHeadFKCtrList
 
 
+    @ARProfiler.profiled
     def ikFkChain_auto(self, side, parent, zone='leg', stretch=True, bendingBones=False, *funcs):
         """
         # TODO: organize and optimize this method
@@ -623,10 +624,10 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
 
         # be careful with poseInterpolator
         # try a finder with the API
-        ikFkJoints = [point for point in pm.ls() if re.match('^%s.*%s_.*?_(skin_joint)$' % (zoneA, side), str(point).lower()) and not twistName in str(point)]
-        self.ikFkTwistJoints = [point for point in pm.ls() if re.match('^%s.*%s.*(twist).*(skin_joint)$' % (zoneA, side), str(point).lower())]
-        logger.debug('%s %s joints: %s' % (side, zoneA, ikFkJoints))
-        logger.debug('%s %s twist joints: %s' % (side, zoneA, self.ikFkTwistJoints))
+        ikFkJoints = self._jointIndex.query('^%s.*%s_.*?_(skin_joint)$' % (zoneA, side), lower=True, exclude=[twistName])
+        self.ikFkTwistJoints = self._jointIndex.query('^%s.*%s.*(twist).*(skin_joint)$' % (zoneA, side), lower=True)
+        logger.debug('%s %s joints: %s', side, zoneA, ikFkJoints)
+        logger.debug('%s %s twist joints: %s', side, zoneA, self.ikFkTwistJoints)
 
         # group for ikFk controls
         self.ikFkCtrGrp = pm.group(empty=True, name='%s_ik_ctrGrp_root' % baseName)
@@ -654,10 +655,10 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
             try:
                 # review this, use a check, not a try
                 fkControl = self._create_controller('%s_%s_fk_ctr' % (baseName, controllerName), '%sFk_%s' % (controllerName, side), 1, fkColor)
-                pm.xform(fkControl, ws=True, m=pm.xform(joint, q=True, ws=True, m=True))
+                pm.xform(fkControl, ws=True, m=ARMatrixCache.worldMatrix(joint))
                 self._ikFk_FkControllersList.append(fkControl)
             except:
-                logger.debug('no controller for fk controller: %s' % joint)
+                logger.debug('no controller for fk controller: %s', joint)
                 pass
             # ik and main joints
             self._ikFk_IkJointList.append(joint.duplicate(po=True, name='%s_%s_ik_joint' % (baseName, controllerName))[0])
@@ -696,7 +697,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
 
             NameIdList.append(controllerName)
 
-        logger.debug('ikFk IK joints: %s' % self._ikFk_IkJointList)
+        logger.debug('ikFk IK joints: %s', self._ikFk_IkJointList)
 
         # reconstruct hierarchy
         # create Fk control shapes
@@ -712,7 +713,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
 
         # ik control
         self.ikFk_IkControl = self._create_controller("%s_ik_ctr" % baseName, "%sIk_%s" % (zoneA, side), 1, 17)
-        self.ikFk_IkControl.setTranslation(ikFkJoints[-1].getTranslation('world'), 'world')
+        self.ikFk_IkControl.setTranslation(ARMatrixCache.worldTranslation(ikFkJoints[-1]), 'world')
         self.ikFkCtrGrp.addChild(self.ikFk_IkControl)  # parent to ctr group
 
         # set hierarchy
@@ -873,6 +874,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         return self._ikFk_IkControllerList, self._ikFk_FkControllersList
 
 
+    @ARProfiler.profiled
     def foot_auto(self, zones=('foot', 'toe'), planeAlign=None, *funcs):
         """
         # TODO: organize and optimize this Func
@@ -887,9 +889,9 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         zoneB = zones[0]
         zoneC = zones[1]
         fkColor = 14 if self._lastSide == 'left' else 29
-        toesJoints = [point for point in pm.ls() if re.match('^%s.*%s.*%s.(?!End)(?!0)(?!twist).*skin_joint$' % (zoneB, self._lastSide, zoneC), str(point))]
+        toesJoints = self._jointIndex.query('^%s.*%s.*%s.(?!End)(?!0)(?!twist).*skin_joint$' % (zoneB, self._lastSide, zoneC))
         #toesZeroJoints = [point for point in pm.ls() if re.match('^%s.*(%s).(?!_end)(?=0)(?!twist).*%s.*joint$' % (self.chName, zoneC, self.lastSide), str(point))]
-        footJoints = [point for point in pm.ls() if re.match('^%s.*%s.*skin_joint$' % (zoneB, self._lastSide), str(point)) and not zoneC in str(point)]
+        footJoints = self._jointIndex.query('^%s.*%s.*skin_joint$' % (zoneB, self._lastSide), exclude=[zoneC])
 
         # arrange toes by joint chain p.e [[toea, toesa_Tip], [toeb, toeb_tip]]
         toesJointsArr = ARC.arrangeListByHierarchy(toesJoints)
@@ -907,10 +909,10 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         # create foot ctr
         for joint in footJoints:
             controllerName = str(joint).split('_')[-3]
-            logger.debug('foot controller name: %s' % controllerName)
+            logger.debug('foot controller name: %s', controllerName)
             footFkCtr = self._create_controller('%s_%s_fk_ctr' % (baseNameB, controllerName),
                                                '%sFk_%s' % (controllerName, self._lastSide), 1, fkColor)
-            pm.xform(footFkCtr, ws=True, m=pm.xform(joint, q=True, ws=True, m=True))
+            pm.xform(footFkCtr, ws=True, m=ARMatrixCache.worldMatrix(joint))
 
             footMain = joint.duplicate(po=True, name='%s_%s_main_joint' % (baseNameB, controllerName))[0]
 
@@ -962,16 +964,16 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
             toeMainChain = []
             for joint in toe:
                 controllerName = str(joint).split('_')[-3]
-                logger.debug('foot controller name: %s' % controllerName)
+                logger.debug('foot controller name: %s', controllerName)
 
                 # create controllers and main
                 toeFkCtr = self._create_controller('%s_%s_fk_ctr' % (baseNameB, controllerName), '%sFk_%s' % (controllerName, self._lastSide), 1, fkColor)
-                pm.xform(toeFkCtr, ws=True, m=pm.xform(joint, q=True, ws=True, m=True))
+                pm.xform(toeFkCtr, ws=True, m=ARMatrixCache.worldMatrix(joint))
 
                 toeMainJnt = joint.duplicate(po=True, name='%s_%s_main_joint' % (baseNameB, controllerName))[0]
 
                 toeIkCtr = self._create_controller('%s_%s_ik_ctr' % (baseNameB, controllerName), '%sFk_%s' % (controllerName, self._lastSide), 1, fkColor)
-                pm.xform(toeIkCtr, ws=True, m=pm.xform(joint, q=True, ws=True, m=True))
+                pm.xform(toeIkCtr, ws=True, m=ARMatrixCache.worldMatrix(joint))
 
                 # if joint Chain (not the first controller created), reconstruct hierarchy
                 if toeFkChain:
@@ -998,8 +1000,8 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
             footFkControllerList[-1].addChild(toeFkChain[0])
             toeIkCtrParents.append(toeIkChain[0])  # ik ctr parent, for parent later in on ik ctrllers
             toeMainParents.append(toeMainChain[0])  # main parents
-            logger.debug('toeIkchain: %s, %s' % (toeIkChain[0], type(toeIkChain[0])))
-            logger.debug('toeIkCtrParents: %s' % (toeIkCtrParents))
+            logger.debug('toeIkchain: %s, %s', toeIkChain[0], type(toeIkChain[0]))
+            logger.debug('toeIkCtrParents: %s', toeIkCtrParents)
             footMainJointsList[-1].addChild(toeMainChain[0])
 
         # ik foot ctr TODO: simplify this section
@@ -1051,7 +1053,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         pm.xform(footBallIkCtr, ws=True, m=footBallIkMatrix)
 
         # parent toes Ik ctr to footToes
-        logger.debug('toeIkCtrParents: %s' % toeIkCtrParents)
+        logger.debug('toeIkCtrParents: %s', toeIkCtrParents)
         for toeCtr in toeIkCtrParents:
             footToesIkCtr.addChild(toeCtr)
 
@@ -1094,7 +1096,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         for ikOrFk in [toesFkAuto, toesIkAuto]:
             toesGeneralCtrIkOrFk = toeFkGeneralController if ikOrFk == toesFkAuto else toeIkGeneralController
 
-            logger.debug('toesGeneralCtrIkOrFk: %s, %s' % (toesGeneralCtrIkOrFk, type(toesGeneralCtrIkOrFk)))
+            logger.debug('toesGeneralCtrIkOrFk: %s, %s', toesGeneralCtrIkOrFk, type(toesGeneralCtrIkOrFk))
             for i, iAuto in enumerate(ikOrFk):
                 if zoneC in str(iAuto) and '%sGeneral' % zoneC not in str(iAuto):
                     for axis in ('X', 'Y', 'Z'):
@@ -1114,7 +1116,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
                 autoGrp.attr('maxRotZLimit').set(0)
 
         for autoGrp in footRollAuto:
-            logger.debug('footRoolAutoGrp: %s, %s' % (autoGrp, type(autoGrp)))
+            logger.debug('footRoolAutoGrp: %s, %s', autoGrp, type(autoGrp))
             animNode = pm.createNode('animCurveTU', name='%s_animNode' % autoGrp)
             footIkControllerList[0].attr(footIkAttrTypes[-1]).connect(animNode.input)
             animNode.output.connect(autoGrp.rotateZ)
@@ -1213,6 +1215,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         return footIkControllerList + toesIkControllerList, footTotalFkControllers
 
 
+    @ARProfiler.profiled
     def hand_auto(self, zones=('hand', 'finger'), planeAlign=None, *funcs):
         """
         This method should be called as a *arg for ikFkChain_auto.
@@ -1231,15 +1234,15 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         zoneC = zones[1]
         fkColor = 14 if self._lastSide == 'left' else 29  # review, more procedural
         # don't get zero joints, this do not has control
-        fingerJoints = [point for point in pm.ls() if re.match('^%s.*%s.*%s.(?!End)(?!0)(?!twist).*skin_joint$' % (zoneB, self._lastSide, zoneC), str(point))]
+        fingerJoints = self._jointIndex.query('^%s.*%s.*%s.(?!End)(?!0)(?!twist).*skin_joint$' % (zoneB, self._lastSide, zoneC))
         # here get zero joints, this do not has control
-        fingerZeroJoints = [point for point in pm.ls() if re.match('^%s.*%s.*%s.(?!End)(?=0)(?!twist).*skin_joint$' % (zoneB, self._lastSide, zoneC), str(point))]
+        fingerZeroJoints = self._jointIndex.query('^%s.*%s.*%s.(?!End)(?=0)(?!twist).*skin_joint$' % (zoneB, self._lastSide, zoneC))
         # get hand joints
-        handJoints = [point for point in pm.ls() if re.match('^%s.*%s.*((?!twist).).*skin_joint$' % (zoneB, self._lastSide), str(point)) and not zoneC in str(point)]
+        handJoints = self._jointIndex.query('^%s.*%s.*((?!twist).).*skin_joint$' % (zoneB, self._lastSide), exclude=[zoneC])
 
         # arrange toes by joint chain p.e [[toea, toesa_Tip], [toeb, toeb_tip]]
         fingerJointsArr = ARC.arrangeListByHierarchy(fingerJoints)
-        logger.debug('Finger arranged list %s %s: %s' % (zoneB, self._lastSide, fingerJointsArr))
+        logger.debug('Finger arranged list %s %s: %s', zoneB, self._lastSide, fingerJointsArr)
 
         # controllers and main lists
         handFkControllerList = []  # fk lists
@@ -1252,9 +1255,9 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         # create hand ctr
         for joint in handJoints:
             controllerName = str(joint).split('_')[-3]
-            logger.debug('foot controller name: %s' % controllerName)
+            logger.debug('foot controller name: %s', controllerName)
             handFkCtr = self._create_controller('%s_%s_fk_ctr' % (baseNameB, controllerName), '%sFk_%s' % (controllerName, self._lastSide), 1, fkColor)
-            pm.xform(handFkCtr, ws=True, m=pm.xform(joint, q=True, ws=True, m=True))
+            pm.xform(handFkCtr, ws=True, m=ARMatrixCache.worldMatrix(joint))
 
             handMain = joint.duplicate(po=True, name='%s_%s_main_joint' % (baseNameB, controllerName))[0]
 
@@ -1299,10 +1302,10 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
             fingerMainChain = []
             for joint in toe:
                 controllerName = str(joint).split('_')[-3]
-                logger.debug('foot controller name: %s' % controllerName)
+                logger.debug('foot controller name: %s', controllerName)
                 # review
                 fingerMainJnt = self._create_controller('%s_%s_fk_ctr' % (baseNameB, controllerName), '%sFk_%s' % (controllerName, self._lastSide), 1, fkColor)
-                pm.xform(fingerMainJnt, ws=True, m=pm.xform(joint, q=True, ws=True, m=True))
+                pm.xform(fingerMainJnt, ws=True, m=ARMatrixCache.worldMatrix(joint))
 
                 # if joint Chain, reconstruct hierarchy
                 if fingerMainChain:
@@ -1393,6 +1396,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
             return handIkControllerList, handFkControllerList + fingerMainJointsList
 
 
+    @ARProfiler.profiled
     def clavicle_auto(self, zone='clavicle', *funcs):
         """
         This method should be called as a *arg for ikFkChain_auto.
@@ -1400,14 +1404,14 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         """
         baseName = "%s_%s" % (zone, self._lastSide)
         fkColor = 14 if self._lastSide == 'left' else 29
-        clavicleJoints = [point for point in pm.ls() if re.match('^%s.*%s.*(?!End)(?!0)(?!twist).*skin_joint$' % (zone, self._lastSide), str(point))]
+        clavicleJoints = self._jointIndex.query('^%s.*%s.*(?!End)(?!0)(?!twist).*skin_joint$' % (zone, self._lastSide))
         clUpperArmJoint = clavicleJoints[-1].getChildren()[0]
 
         parent = self._ikFk_MainJointList[0].firstParent()  # get parent of the system
 
         parentChilds = [child for child in parent.listRelatives(c=True, type='transform') if (self._lastSide in str(child)) and (self._lastZone in str(child).lower()) and not ('pole' in str(child))]
 
-        logger.debug('childs: %s' %parentChilds)
+        logger.debug('childs: %s', parentChilds)
 
         # store clavicle main joints here
         clavicleMainList = []
@@ -1416,7 +1420,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
             controllerName = str(joint).split('_')[-3]
             # create controller shape
             clavicleController = self._create_controller(str(joint).replace('skin', 'fk').replace('joint', 'ctr'), '%sFk_%s' % (controllerName, self._lastSide), 1, fkColor)
-            pm.xform(clavicleController, ws=True, m=pm.xform(joint, q=True, ws=True, m=True))
+            pm.xform(clavicleController, ws=True, m=ARMatrixCache.worldMatrix(joint))
             clavicleMainList.append(clavicleController)
 
         # hierarchy
@@ -1519,6 +1523,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         return [], []
 
 
+    @ARProfiler.profiled
     def PSSkirt_auto(self, zone, drivers, parent):
         """
         PoseSpace skirt
@@ -1534,7 +1539,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         VM_N = ARC.VectorMath_Nodes  # vector math for nodes module
         DGU = ARC.DGUtils  # dependency graph utils
 
-        skirtJoints = [point for point in pm.ls() if re.match('^%s.*%s$' % (zone, self._skinJointNaming), str(point))]
+        skirtJoints = self._jointIndex.skinJoints(zone)
         # arrange lists by hierarchy
         skirtJointsArrange = ARC.arrangeListByHierarchy(skirtJoints)
 
@@ -1549,9 +1554,15 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
         for chainJoints in skirtJointsArrange:
             fkChainController=[]
             pointChainController=[]
-            for joint in chainJoints:
-                controller = self._create_controller(str(joint).replace('joint', 'ctr').replace('skin', 'fk'), 'squareFk', 1, 11)
-                pm.xform(controller, ws=True, m=pm.xform(joint, ws=True, q=True, m=True))
+            # create the chain controllers in one pass, fk and point controllers at the joint position
+            jointMatrices = [ARMatrixCache.worldMatrix(joint) for joint in chainJoints]
+            fkNames = [str(joint).replace('joint', 'ctr').replace('skin', 'fk') for joint in chainJoints]
+            specs = [(name, 'squareFk', 1, 11, matrix) for name, matrix in zip(fkNames, jointMatrices)]
+            specs += [(name.replace('fk', 'point'), 'pole', 0.5, 7, matrix) for name, matrix in zip(fkNames, jointMatrices)]
+            handles = self._create_controllers(specs)
+
+            for i, joint in enumerate(chainJoints):
+                controller = handles[i].node()
                 # construct hierarchy
                 if fkChainController:
                     fkChainController[-1].addChild(controller)
@@ -1560,9 +1571,8 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
                 # append controller
                 fkChainController.append(controller)
 
-                # create point ctr
-                pointCtr = self._create_controller(str(controller).replace('ctr', 'ctr').replace('fk', 'point'), 'pole', 0.5, 7)
-                pm.xform(pointCtr, ws=True, m=pm.xform(controller, ws=True, q=True, m=True))
+                # point ctr
+                pointCtr = handles[len(chainJoints) + i].node()
 
                 # parent to controller
                 controller.addChild(pointCtr)
@@ -1592,7 +1602,7 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
             # we do not use the driver itself to preserve modularity
             driverVectorGrp = pm.group(empty=True, name='%s_vectorGrp' % str(driver))  # <-this node x axis should control the system
             # get the matrix of the driver
-            driverMatrix = pm.xform(driver, q=True, m=True, ws=True)
+            driverMatrix = ARMatrixCache.worldMatrix(driver)
             pm.xform(driverVectorGrp, ws=True, m=driverMatrix)  # align with the driver object
             parent.addChild(driverVectorGrp)  # parent
 
@@ -1615,8 +1625,10 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
 
             # get vector from matrix, x vector in this case, cause childDriver has only x translate
             driverVector = VM_N.vectorProduct(childDriver, None, 3, "%s.worldMatrix[0]" % str(driverVectorGrp), True)  # <- X Axis
-            logger.debug('Skirt driver Vector X: %s' % str(driverVector.get()))
-            logger.debug(childDriver.x + childDriver.y + childDriver.z)
+            # get() queries the scene, only with debug output
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Skirt driver Vector X: %s', driverVector.get())
+                logger.debug(childDriver.x + childDriver.y + childDriver.z)
 
             # node with driverVector
             driverVector.node().rename('%s_driver' % DVName)
@@ -1629,10 +1641,10 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
                 if int(getattr(childDriver, axis)) == 0:  # Equal to zero. is one of the pair of vectors that define a plane
                     vector = pm.datatypes.Vector()
                     setattr(vector, axis, 1)
-                    logger.debug('PSSkirt vector: %s %s' % (axis, vector))
+                    logger.debug('PSSkirt vector: %s %s', axis, vector)
                     planeVecs.append(vector)
 
-            logger.debug('PSSkirt plane vectors: %s' % planeVecs)
+            logger.debug('PSSkirt plane vectors: %s', planeVecs)
 
             ## no twist transform track##
             # create a transform node that will follow the driven but its twist
@@ -1650,9 +1662,10 @@ class ARAutoRig_Body(_ARAutoRig_Abstract):
 
             # get vector dot products for z and y
             # review:
-            vecProd_list = DGU.treeTracker(vectorZ_Proj.node(), 'vectorProduct', True, 4)  # search for vectorProducts
+            # search for the closest vectorProducts
+            vecProd_list = DGU.treeTracker(vectorZ_Proj.node(), 'vectorProduct', True, 4, order='breadth')
             dotZ_node = [node for node in vecProd_list if node.operation.get() == 1][0]  # save here dot Node
-            vecProd_list = DGU.treeTracker(vectorY_Proj.node(), 'vectorProduct', True, 4)
+            vecProd_list = DGU.treeTracker(vectorY_Proj.node(), 'vectorProduct', True, 4, order='breadth')
             dotY_node = [node for node in vecProd_list if node.operation.get() == 1][0]
             # get the abs Val of one dot product
             dotBlendAbs = VM_N.absVal(dotZ_node.outputX)
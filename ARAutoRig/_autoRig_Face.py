@@ -6,12 +6,10 @@ from maya import mel
 
 from _autoRig_Abstract import _ARAutoRig_Abstract
 from ..ARCore import ARCore as ARC
+from ..ARCore import ARProfiler
 
-import logging
-
-logging.basicConfig()
-logger = logging.getLogger('ARAutoRig_Face:')
-logger.setLevel(logging.DEBUG)
+from ..ARCore import ARLogging
+logger = ARLogging.getLogger('ARAutoRig.ARAutoRig_Face')
 
 
 class ARAutoRig_Face(_ARAutoRig_Abstract):
@@ -34,6 +32,7 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
         super(ARAutoRig_Face, self).__init__(chName, path)
 
 
+    @ARProfiler.profiled
     def wires_auto(self, deformer, parent=None, sizeCtr=0.5, customCtr=None, ctrFollow=False, orientType=None):
         """
         This method configure a wire deform for facial rigs.
@@ -121,8 +120,8 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
 
         listLen = len(positive)
 
-        logger.debug("Positive list: %s" % positive)
-        logger.debug("Negative list: %s" % negative)
+        logger.debug("Positive list: %s", positive)
+        logger.debug("Negative list: %s", negative)
 
         if midCtr:
             listOptions = [positive, negative, positive[:listLen/2+1], negative[:listLen/2+1]]
@@ -146,7 +145,7 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
                     influence = lambda x: x / lenSide  # influence formula
 
                 else:
-                    print "op %s" % op
+                    logger.debug("op %s", op)
                     influence = lambda x: (x / lenSide) ** (1/2.5)
 
             driverMatrix = pm.xform(driver, q=True, ws=True, m=True)
@@ -157,14 +156,14 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
                 for attr in ["translate"]:
                     for j, axis in enumerate(axisList):
                         # additive for functions
-                        logger.debug("Current axis SDK: %s, %s" % (axis, j))
+                        logger.debug("Current axis SDK: %s, %s", axis, j)
                         # each attribute has its animCurve type
                         animNode = pm.createNode("animCurveTL") if attr == "translate" else pm.createNode("animCurveTA")  # create anim node
                         driver.attr("%s%s" % (attr, axis)).connect(animNode.input)
                         plugs = obj.attr("%s%s" % (attr, axis)).inputs(p=True)
 
                         if plugs:
-                            logger.debug("Found plugs: %s" % plugs)
+                            logger.debug("Found plugs: %s", plugs)
                             plugs[0].disconnect(obj.attr("%s%s" % (attr, axis)))
                             plusNode = VMN.plusMinusAverage(1, plugs[0], animNode.output)
                             plusNode.connect(obj.attr("%s%s" % (attr, axis)))
@@ -175,14 +174,10 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
                         drvVector = pm.datatypes.Vector(driverMatrix[j])
                         autoVector = pm.datatypes.Vector(autoMatrix[j])
                         dot = drvVector * autoVector
-                        logger.debug("dot: %s" %(dot))
                         dot = dot if dot != 0 else 1
                         sign = dot/abs(dot)
-                        logger.debug("sign:%s" %(sign))
-                        print influence(i)
-                        print i
-                        print i/len(side)
-                        print len(side)
+                        logger.debug("dot: %s", dot)
+                        logger.debug("sign: %s, influence: %s, index: %s of %s", sign, influence(i), i, len(side))
 
                         animNode.addKeyframe(0, 0.0)
                         animNode.addKeyframe(1, influence(i)*sign)
@@ -268,7 +263,7 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
                 valControllers.append(controllers[i])
                 valJoints.append(joints[i])
 
-        logger.debug("%s, %s" %(len(valControllers), len(valJoints)))
+        logger.debug("%s, %s", len(valControllers), len(valJoints))
 
         # root and autos
         controllersRoot = ARC.createRoots(valControllers, "root")
@@ -285,6 +280,7 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
         self.controllers["jointControllers"] = valControllers
 
 
+    @ARProfiler.profiled
     def _deformPlanes(self, autoGrp, baseGrp=None):
         """
         Create a plane and copy the deforms from base mesh, then constraint the autoGrp and baseGrp to the plane
@@ -326,7 +322,7 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
 
         # connect each auto grp to each poly face
         numFaces = planes.getShape().numFaces()
-        logger.debug("num Faces: %s" % numFaces)
+        logger.debug("num Faces: %s", numFaces)
         for i in range(numFaces):
             pm.select(planes.f[i], r=True)
             pm.select(autoGrp[i], add=True)
@@ -343,7 +339,7 @@ class ARAutoRig_Face(_ARAutoRig_Abstract):
                 #TODO: bad aproximation
                 vertex = pm.modeling.polyListComponentConversion(planes.f[i], tv=True)
                 pm.select(vertex, r=True)
-                logger.debug("vertices %s:" % vertex)
+                logger.debug("vertices %s:", vertex)
                 mel.eval("weightHammerVerts;")
                 pm.select(cl=True)
             except:
@@ -3,67 +3,129 @@ import maya.cmds as cmds
 from maya import OpenMaya
 import maya.api.OpenMaya as OpenMaya2
 from maya import OpenMayaAnim
+import numpy as np
+import ctypes
 import ctrSaveLoadToJson
+import ARWeights
+import ARTopology
+import ARSpatial
+import ARSymmetry
+import ARCtrLibrary
+import ARProfiler
+import ARNurbs
+import ARGraph
+import ARHierarchy
+import ARNaming
+import ARMatrixCache
 import inspect
 import os
 
-import logging
-logging.basicConfig()
-logger = logging.getLogger('ARCore:')
-logger.setLevel(logging.DEBUG)
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARCore')
 
 
 def cloneWithHierarchy(root, type="transform", suffix="_dup"):
     """
     Clone the given joint root, clone the hierarchy with transform nodes
     :param root(str or pm):
-    :param type(str): type of output objects
-    :return:
-    """
-    # check type
-    root = pm.PyNode(root) if isinstance(root, str) else root
-    allChildren = [i for i in root.listRelatives(ad=True) if isinstance(i, pm.nodetypes.Transform) or isinstance(i, pm.nodetypes.Joint)]
-
-    allChildren.append(root)  # copy root too
-
-    suffix = "_"+suffix
-
-    if type == "transform":
-        dupFunc = lambda x: pm.group(empty=True, w=True, name=str(x) + suffix)
-    elif type == "locator":
-        dupFunc = lambda x: pm.spaceLocator(name=str(x) + suffix)
-    elif type == "joint":
-        dupFunc = lambda x: pm.createNode("joint", name=str(x) + suffix)
-
-    allDuplicated = []
-    for child in allChildren:
-        dup = dupFunc(child)
-        pm.xform(dup, ws=True, m=pm.xform(child, q=True, ws=True, m=True))
-        allDuplicated.append(dup)
-
-    for i, child in enumerate(allChildren):
-        pChild = child.firstParent()
-        logger.debug("Parent %s" %str(pChild))
-        logger.debug("Obj:  %s" %str(child))
-        if pChild in allChildren:
-            logger.debug("%s in allChildren" % (pChild))
-            pChildId = allChildren.index(pChild)
-            logger.debug("Parent id: %s" % pChildId)
-            allDuplicated[pChildId].addChild(allDuplicated[i])
-            if type == "joint":
-                pm.makeIdentity(allDuplicated[i],apply=True, r=True, t=False, s=False)
-                jointP = allDuplicated[i].firstParent()
-                if not jointP in allDuplicated:
-                    pm.ungroup(jointP)
+    :param type(str): type of output objects, transform, locator or joint
+    :return(list, list): clones and source nodes, in listRelatives order with the root last
+
+    The source hierarchy is read once, parents are mapped by path (see ARHierarchy), and the clones are
+    created and parented in one modifier pass, in topological order. Cloned joints get their local rotation
+    in the joint orient, like a makeIdentity of the rotation.
+    """
+    if type not in ("transform", "locator", "joint"):
+        raise ValueError("cloneWithHierarchy: unknown type %s, use transform, locator or joint" % type)
+
+    # read the source hierarchy, transforms and derived types, root last
+    rootPath = fullPaths([root])[0]
+    paths = cmds.listRelatives(rootPath, ad=True, fullPath=True, type="transform") or []
+    paths.append(rootPath)  # copy root too
+
+    mSel = OpenMaya2.MSelectionList()
+    for path in paths:
+        mSel.add(path)
+    dagPaths = [mSel.getDagPath(i) for i in range(mSel.length())]
+    names = ["%s_%s" % (dagPath.partialPathName(), suffix) for dagPath in dagPaths]
+
+    parents = ARHierarchy.parentIndices(paths)
+    order = ARHierarchy.topologicalOrder(paths, parents)
+    worldMatrices = np.array([list(dagPath.inclusiveMatrix()) for dagPath in dagPaths]).reshape(-1, 4, 4)
+    localMatrices = ARHierarchy.localMatrices(worldMatrices, parents)
+
+    # create and parent, parents before children
+    dagModifier = OpenMaya2.MDagModifier()
+    clones = [None] * len(paths)
+    for i in order:
+        parent = clones[parents[i]] if parents[i] != -1 else OpenMaya2.MObject.kNullObj
+        clones[i] = dagModifier.createNode("joint" if type == "joint" else "transform", parent)
+        dagModifier.renameNode(clones[i], names[i])
+        if type == "locator":
+            shape = dagModifier.createNode("locator", clones[i])
+            dagModifier.renameNode(shape, "%sShape" % names[i])
+    dagModifier.doIt()
+
+    # transform values
+    dgModifier = OpenMaya2.MDGModifier()
+    scales = [None] * len(paths)
+    for i in order:
+        fnClone = OpenMaya2.MFnDependencyNode(clones[i])
+        matrix = localMatrices[i]
+        jointOrient = type == "joint" and parents[i] != -1
+        if jointOrient:
+            # child joints compensate the parent scale, with the inverseScale connection of the parent command
+            matrix = matrix.copy()
+            matrix[:3, :3] *= scales[parents[i]]
+            dgModifier.connect(OpenMaya2.MFnDependencyNode(clones[parents[i]]).findPlug("scale", False),
+                               fnClone.findPlug("inverseScale", False))
+
+        transformMatrix = OpenMaya2.MTransformationMatrix(OpenMaya2.MMatrix(matrix.ravel().tolist()))
+        scales[i] = transformMatrix.scale(OpenMaya2.MSpace.kWorld)
+        values = list(zip(("translateX", "translateY", "translateZ"), transformMatrix.translation(OpenMaya2.MSpace.kWorld)))
+        values += list(zip(("scaleX", "scaleY", "scaleZ"), scales[i]))
+        values += list(zip(("shearXY", "shearXZ", "shearYZ"), transformMatrix.shear(OpenMaya2.MSpace.kWorld)))
+        for attr, value in values:
+            dgModifier.newPlugValueDouble(fnClone.findPlug(attr, False), value)
+        rotation = transformMatrix.rotation()
+        rotateAttr = "jointOrient" if jointOrient else "rotate"
+        for axis, value in zip("XYZ", (rotation.x, rotation.y, rotation.z)):
+            dgModifier.newPlugValueMAngle(fnClone.findPlug(rotateAttr + axis, False), OpenMaya2.MAngle(value))
+    dgModifier.doIt()
+
+    allDuplicated = [pm.PyNode(OpenMaya2.MDagPath.getAPathTo(clone).fullPathName()) for clone in clones]
+    allChildren = [pm.PyNode(path) for path in paths]
 
     return allDuplicated, allChildren
 
 
-def nearestGeometries(keys, geometries, distance=0.5):
+def sampleFrames(startTime, endTime, sampling=24):
+    """
+    Frames to evaluate in a time range
+    :param startTime(int):
+    :param endTime(int):
+    :param sampling(int or list): int -> one frame each sampling frames, list -> explicit frames
+    :return(list): sorted frames inside the range
+    """
+    if isinstance(sampling, (list, tuple)):
+        return sorted(set(frame for frame in sampling if startTime <= frame <= endTime))
+
+    return list(range(int(startTime), int(endTime) + 1, max(1, int(sampling))))
+
+
+def nearestGeometries(keys, geometries, distance=0.5, frames=24, adaptiveStride=24):
     """
     return all the geometries inside the distance range
+    Time is evaluated in one pass, world points are cached per frame, geometries are rejected
+    by bounding box first, and a geometry stops being checked once a near point is found.
+    The key points of a frame are solved in one batch query of a triangle bvh of the geometry.
     :param keys: reference geometries
     :param geometries: geametries to check
+    :param distance(float): max distance
+    :param frames(int, list or str): frame sampling of the playback range.
+            int -> stride, list -> explicit frames,
+            'adaptive' -> adaptiveStride frames, subdivided while the keys move more than distance between samples
+    :param adaptiveStride(int): initial stride with adaptive sampling
     :return: geometries inside the range distance
     """
     nearestGeos = set()  # save here the nearest geometries
@@ -73,58 +135,63 @@ def nearestGeometries(keys, geometries, distance=0.5):
         geometries[i] = pm.PyNode(geometries[i]) if isinstance(geometries[i], str) else geometries[i]
         geometries[i] = geometries[i].getShape() if isinstance(geometries[i], pm.nodetypes.Transform) else geometries[i]
 
+    keyPaths = [MeshOp.getDagPath2(key) for key in keys]
+    geoPaths = [MeshOp.getDagPath2(geo) for geo in geometries]
+    # triangles do not change with time, only the points
+    geoTriangles = [np.array(OpenMaya2.MFnMesh(path).getTriangles()[1], dtype=np.int64).reshape(-1, 3)
+                    for path in geoPaths]
+
     # time range
     startTime = int(pm.playbackOptions(minTime=True, q=True))
     endTime = int(pm.playbackOptions(maxTime=True, q=True))
 
+    adaptive = frames == 'adaptive'
+    pending = sampleFrames(startTime, endTime, adaptiveStride if adaptive else frames)
+
+    # frame -> world points of all the keys
+    keyPointsCache = {}
+
+    def keyPointsAt(frame):
+        if frame not in keyPointsCache:
+            keyPointsCache[frame] = np.vstack([MeshOp.getPoints(MeshOp.getWorldMeshData(path, frame))
+                                               for path in keyPaths])
+        return keyPointsCache[frame]
+
+    remaining = list(range(len(geometries)))
+    previous = None
+    while pending and remaining:
+        frame = pending[0]
+        # adaptive, subdivide the interval if keys move more than the search distance
+        if adaptive and previous is not None and frame - previous > 1:
+            keyPoints, previousPoints = keyPointsAt(frame), keyPointsAt(previous)
+            if keyPoints.shape == previousPoints.shape and \
+                    np.sqrt(((keyPoints - previousPoints) ** 2).sum(axis=1)).max() > distance:
+                pending.insert(0, (previous + frame) // 2)
+                continue
 
-    for geo in geometries:
-        # check each geometry
-        geoSelList = OpenMaya.MSelectionList()
-        geoSelList.add(str(geo))
-        geoDag = OpenMaya.MDagPath()
-        geoSelList.getDagPath(0, geoDag)
-        MFnGeoM = OpenMaya.MFnMesh(geoDag)
-
-        found = False
-        # check all vertices for element
-        # time frame
-        for stime in range(startTime, endTime, 24):
-            pm.currentTime(stime)
-
-            for key in keys:
-                key = pm.PyNode(key) if isinstance(key, str) else key
-                key = key.getShape() if isinstance(key, pm.nodetypes.Transform) else key
-
-                # create a iterator
-                mselection = OpenMaya.MSelectionList()
-                mselection.add(str(key))
-                mdagPath = OpenMaya.MDagPath()
-                mselection.getDagPath(0, mdagPath)
-                meshIt = OpenMaya.MItMeshVertex(mdagPath)
-
-                #iterate over the vertices
-                while not meshIt.isDone():
-                    vPos = meshIt.position(OpenMaya.MSpace.kWorld)
-                    # check nearestPoint
-                    mPoint = OpenMaya.MPoint()
-                    MFnGeoM.getClosestPoint(vPos, mPoint, OpenMaya.MSpace.kWorld)  # maybe here get error
-                    vecDistance = OpenMaya.MVector(vPos - mPoint)
-
-                    if vecDistance.length() <= distance:
-                        logger.debug("point Found at: %s" % vecDistance.length())
-                        nearestGeos.add(geo)
-                        found = True
-                        break
+        pending.pop(0)
+        previous = frame
 
-                    meshIt.next()
+        keyPoints = keyPointsAt(frame)
+        keyMin, keyMax = ARSpatial.boundingBox(keyPoints)
+        for index in list(remaining):
+            geoPoints = MeshOp.getPoints(MeshOp.getWorldMeshData(geoPaths[index], frame))
+            geoMin, geoMax = ARSpatial.boundingBox(geoPoints)
+            # bounding box rejection
+            if not ARSpatial.boxesOverlap(keyMin, keyMax, geoMin, geoMax, distance):
+                continue
 
-                if found:
-                    break
+            candidates = keyPoints[ARSpatial.pointsInBox(keyPoints, geoMin, geoMax, distance)]
+            if not len(candidates):
+                continue
 
-            if found:
-                found = False
-                break
+            bvh = ARSpatial.TriangleBVH(geoPoints, geoTriangles[index])
+            closestPoints = bvh.closestPoints(candidates)[0]
+            vecDistance = np.sqrt(((closestPoints - candidates) ** 2).sum(axis=1)).min()
+            if vecDistance <= distance:
+                logger.debug("point Found at: %s, frame: %s", vecDistance, frame)
+                nearestGeos.add(geometries[index])
+                remaining.remove(index)
 
     return nearestGeos
 
@@ -163,6 +230,7 @@ def sortByPosition(key):
     return key.getTranslation("world")[0]
 
 
+@ARProfiler.profiled
 def createRoots(listObjects, suffix='root'):
     """
     Create root on elements, respecting their present hierarchy.
@@ -172,39 +240,76 @@ def createRoots(listObjects, suffix='root'):
 
     Returns:
         roots(list): list of roots
+
+    All the roots are created in one pass with OpenMaya 2 modifiers: each root takes the world matrix of its
+    object relative to the object parent, and the objects are reparented under their roots with their transform
+    values reset, the same result as grouping them in place.
     """
     # check type
     if not isinstance(listObjects, list):
         listObjects = [listObjects]
 
-    roots = []
+    # read the hierarchy and the matrices before any change
+    mSel = OpenMaya2.MSelectionList()
+    items = []
     for arg in listObjects:
-        try:
-            parent = arg.firstParent()
-        except:
-            parent = None
-        # explanation: pm getTransformation gives transform matrix in object space.
-        # so we need to use pm.xform()
-        rootGrp = pm.group(em=True, name='%s_%s' % (arg, suffix))
-        matrixTransform = pm.xform(arg, q=True, ws=True, m=True)
-        pm.xform(rootGrp, ws=True, m=matrixTransform)
-
-        if parent:
-            parent.addChild(rootGrp)
-        rootGrp.addChild(arg)
-
+        mSel.clear()
+        mSel.add(str(arg))
+        dagPath = mSel.getDagPath(0)
+        parent = OpenMaya2.MFnDagNode(dagPath).parent(0)
+        if parent.apiType() == OpenMaya2.MFn.kWorld:
+            parent = OpenMaya2.MObject.kNullObj
+        # explanation: root local matrix = object world matrix * parent world inverse matrix
+        localMatrix = OpenMaya2.MMatrix(ARMatrixCache.worldMatrix(arg)) * dagPath.exclusiveMatrixInverse()
+        items.append((dagPath.node(), parent, '%s_%s' % (arg, suffix), localMatrix))
+
+    # create and reparent
+    dagModifier = OpenMaya2.MDagModifier()
+    roots = []
+    for node, parent, name, localMatrix in items:
+        rootGrp = dagModifier.createNode('transform', parent)
+        dagModifier.renameNode(rootGrp, name)
+        dagModifier.reparentNode(node, rootGrp)
+        roots.append(rootGrp)
+    dagModifier.doIt()
+
+    # transform values, roots take the matrix, objects are reset
+    dgModifier = OpenMaya2.MDGModifier()
+    for rootGrp, (node, parent, name, localMatrix) in zip(roots, items):
+        transformMatrix = OpenMaya2.MTransformationMatrix(localMatrix)
+        fnRoot = OpenMaya2.MFnDependencyNode(rootGrp)
+        values = list(zip(('translateX', 'translateY', 'translateZ'), transformMatrix.translation(OpenMaya2.MSpace.kWorld)))
+        values += list(zip(('scaleX', 'scaleY', 'scaleZ'), transformMatrix.scale(OpenMaya2.MSpace.kWorld)))
+        values += list(zip(('shearXY', 'shearXZ', 'shearYZ'), transformMatrix.shear(OpenMaya2.MSpace.kWorld)))
+        for attr, value in values:
+            dgModifier.newPlugValueDouble(fnRoot.findPlug(attr, False), value)
+        rotation = transformMatrix.rotation()
+        for attr, value in zip(('rotateX', 'rotateY', 'rotateZ'), (rotation.x, rotation.y, rotation.z)):
+            dgModifier.newPlugValueMAngle(fnRoot.findPlug(attr, False), OpenMaya2.MAngle(value))
+
+        fnNode = OpenMaya2.MFnDependencyNode(node)
+        resetValues = [('translate', 0.0), ('scale', 1.0), ('shear', 0.0)]
+        angleAttrs = ['rotate']
         # if is a joint, assegure reset values
-        if isinstance(arg, pm.nodetypes.Joint):
+        if node.hasFn(OpenMaya2.MFn.kJoint):
+            angleAttrs.append('jointOrient')
+            # the parent is not a joint anymore
+            inverseScale = fnNode.findPlug('inverseScale', False)
+            if inverseScale.isDestination:
+                dgModifier.disconnect(inverseScale.source(), inverseScale)
+
+        for attr, value in resetValues:
+            for axis in (('XY', 'XZ', 'YZ') if attr == 'shear' else ('X', 'Y', 'Z')):
+                dgModifier.newPlugValueDouble(fnNode.findPlug(attr + axis, False), value)
+        for attr in angleAttrs:
             for axis in ('X', 'Y', 'Z'):
-                arg.attr('jointOrient%s' % axis).set(0.0)
+                dgModifier.newPlugValueMAngle(fnNode.findPlug(attr + axis, False), OpenMaya2.MAngle(0.0))
+    dgModifier.doIt()
 
-            arg.setRotation((0,0,0), 'object')
-
-        roots.append(rootGrp)
-
-    return roots
+    return [pm.PyNode(OpenMaya2.MDagPath.getAPathTo(rootGrp).fullPathName()) for rootGrp in roots]
 
 
+@ARProfiler.profiled
 def createController (name, controllerType, chName, path, scale=1.0, colorIndex=4):
     """
     Args:
@@ -216,18 +321,118 @@ def createController (name, controllerType, chName, path, scale=1.0, colorIndex=
         controller: pymel transformNode
         transformMatrix: stored position
     """
-    controller, transformMatrix = ctrSaveLoadToJson.SaveLoadControls.ctrLoadJson(controllerType, chName, path, scale, colorIndex)
-    controller = pm.PyNode(controller)
-    controller.rename(name)
+    return createControllers([(name, controllerType, scale, colorIndex, None)], chName, path)[0].node()
+
+
+class ControllerHandle(object):
+    """
+    Lightweight reference to a controller created by createControllers.
+    The pymel node is only built when it is requested.
+    """
+    def __init__(self, mObject):
+        """
+        :param mObject(OpenMaya2.MObject): controller transform
+        """
+        self._handle = OpenMaya2.MObjectHandle(mObject)
+        self._pyNode = None
+
+    def __str__(self):
+        return self.name()
+
+    def __repr__(self):
+        return 'ControllerHandle(%s)' % self.name()
+
+    def mObject(self):
+        return self._handle.object()
+
+    def dagPath(self):
+        """
+        :return(OpenMaya2.MDagPath):
+        """
+        return OpenMaya2.MDagPath.getAPathTo(self._handle.object())
+
+    def name(self):
+        """
+        :return(str): partial name of the transform
+        """
+        return self.dagPath().partialPathName()
+
+    def node(self):
+        """
+        :return(pm.nodetypes.Transform): pymel node, built the first time it is requested
+        """
+        if self._pyNode is None:
+            self._pyNode = pm.PyNode(self.dagPath().fullPathName())
+
+        return self._pyNode
+
+
+@ARProfiler.profiled
+def createControllers(specs, chName, path):
+    """
+    Create several controllers in one pass with OpenMaya 2.
+    Transforms, names, colors and transform values are applied with dag and dg modifiers,
+    and the ai* render attributes of the shapes are hidden directly on their plugs.
+    p.e: createControllers([('akona_ctr', 'pole', 1.0, 17, None)], 'akona', path)
+    Args:
+        specs: list of (name, controllerType, scale, colorIndex, matrix), matrix is a world matrix
+                as 16 floats, None -> matrix stored in the library
+        chName: name of json file
+        path: path where is json file
+    return:
+        list of ControllerHandle, in specs order
+    """
+    library = ARCtrLibrary.getLibrary(ctrSaveLoadToJson.controllerFile(chName, path))
 
-    shapes = controller.listRelatives(s=True)
-    # hide shape attr
+    # transforms
+    dagModifier = OpenMaya2.MDagModifier()
+    transforms = []
+    for name, controllerType, scale, colorIndex, matrix in specs:
+        transform = dagModifier.createNode('transform')
+        dagModifier.renameNode(transform, name)
+        transforms.append(transform)
+    dagModifier.doIt()
+
+    # shapes, curve creation is not available in the modifiers
+    dgModifier = OpenMaya2.MDGModifier()
+    shapes = []
+    for transform, (name, controllerType, scale, colorIndex, matrix) in zip(transforms, specs):
+        controllerData = library[controllerType]
+        for n, (cvs, knots, degree, form) in enumerate(controllerData.shapes()):
+            curveFn = OpenMaya2.MFnNurbsCurve()
+            form = curveFn.kOpen if form == 0 else curveFn.kPeriodic
+            curveFn.create((cvs * scale).tolist(), knots.tolist(), int(degree), form, False, True, transform)
+            shape = curveFn.object()
+            dgModifier.renameNode(shape, '%sShape%s' % (name, n if n else ''))
+            # color
+            dgModifier.newPlugValueBool(curveFn.findPlug('overrideEnabled', False), True)
+            dgModifier.newPlugValueInt(curveFn.findPlug('overrideColor', False), colorIndex)
+            shapes.append(shape)
+
+        # transform values
+        matrix = controllerData.matrix.tolist() if matrix is None else list(matrix)
+        transformMatrix = OpenMaya2.MTransformationMatrix(OpenMaya2.MMatrix(matrix))
+        fnTransform = OpenMaya2.MFnDependencyNode(transform)
+        values = list(zip(('translateX', 'translateY', 'translateZ'), transformMatrix.translation(OpenMaya2.MSpace.kWorld)))
+        values += list(zip(('scaleX', 'scaleY', 'scaleZ'), transformMatrix.scale(OpenMaya2.MSpace.kWorld)))
+        values += list(zip(('shearXY', 'shearXZ', 'shearYZ'), transformMatrix.shear(OpenMaya2.MSpace.kWorld)))
+        for attr, value in values:
+            dgModifier.newPlugValueDouble(fnTransform.findPlug(attr, False), value)
+        rotation = transformMatrix.rotation()
+        for attr, value in zip(('rotateX', 'rotateY', 'rotateZ'), (rotation.x, rotation.y, rotation.z)):
+            dgModifier.newPlugValueMAngle(fnTransform.findPlug(attr, False), OpenMaya2.MAngle(value))
+    dgModifier.doIt()
+
+    # hide render attributes in the channel box
     for shape in shapes:
+        fnShape = OpenMaya2.MFnDependencyNode(shape)
         for attr in ('aiRenderCurve', 'aiCurveWidth', 'aiSampleRate', 'aiCurveShaderR', 'aiCurveShaderG', 'aiCurveShaderB'):
-            pm.setAttr('%s.%s' % (str(shape), attr), channelBox=False, keyable=False)
+            if fnShape.hasAttribute(attr):
+                plug = fnShape.findPlug(attr, False)
+                plug.isKeyable = False
+                plug.isChannelBox = False
 
-    pm.xform(controller, ws=True, m=transformMatrix)
-    return controller
+    return [ControllerHandle(transform) for transform in transforms]
 
 
 def jointPointToController(joints, controller):
@@ -250,7 +455,7 @@ def jointPointToController(joints, controller):
         else:
             controllerDup = controller.duplicate()[0]
 
-        pm.xform(controllerDup, ws=True, m=pm.xform(joint, ws=True, q=True, m=True))
+        pm.xform(controllerDup, ws=True, m=ARMatrixCache.worldMatrix(joint))
         controllerRoot = createRoots([controllerDup])[0]
         # point constraint
         parentConstraint = pm.parentConstraint(joint, controllerRoot)
@@ -268,89 +473,90 @@ def jointPointToController(joints, controller):
     return controllerList, rootList, pointConstraintList
 
 
+def fullPaths(items):
+    """
+    Full dag paths of a list of dag nodes, read with one selection list.
+    One path per item, repeated items repeat their path
+    :param items(list(str or pm)):
+    :return(list(str)):
+    """
+    mSel = OpenMaya2.MSelectionList()
+    indexByName = {}
+    for item in items:
+        name = str(item)
+        if name in indexByName:
+            continue
+        # the selection list merges repeated nodes, p.e: the same node by short and full name
+        length = mSel.length()
+        mSel.add(name)
+        indexByName[name] = length if mSel.length() > length else None
+
+    paths = {}
+    for name, index in indexByName.items():
+        dagPath = mSel.getDagPath(index) if index is not None else OpenMaya2.MSelectionList().add(name).getDagPath(0)
+        paths[name] = dagPath.fullPathName()
+
+    return [paths[str(item)] for item in items]
+
+
 def arrangeListByHierarchy(itemList):
     """
-    Arrange a list by hierarchy
+    Arrange a list by hierarchy, one list per top item, parents before children.
+    Items between a listed item and its listed descendants do not need to be in the list.
+    Repeated items are kept once, at their first position.
     p.e [[toea1, toea2, ...], [toeb, toeb_tip]]
     Args:
         itemList:
     Returns(list(list)): final list
     """
-    def hierarchySize(obj):
-        # key func for sort
-        fullPath = obj.fullPath()
-        sizeFullPath = fullPath.split('|')
-        return len(sizeFullPath)
-
-    itemListCopy = list(itemList)  # copy of the toes list
-    itemListArr = []
-    while len(itemListCopy):
-        toeJoint = []
-        firstJoint = itemListCopy.pop(0)
-        toeJoint.append(firstJoint)
-        for joint in firstJoint.listRelatives(ad=True):
-            if joint in itemListCopy:
-                toeJoint.append(joint)
-                itemListCopy.remove(joint)
-
-        # sort the list to assure a good order
-        itemListArr.append(sorted(toeJoint, key=hierarchySize))
-    logger.debug('arrangeListByHierarchy: sorted: %s' % itemListArr)
+    itemList = list(itemList)
+    # dedupe by path, the hierarchy indices must point to one item per node
+    paths = []
+    uniqueItems = []
+    seen = set()
+    for item, path in zip(itemList, fullPaths(itemList)):
+        if path not in seen:
+            seen.add(path)
+            paths.append(path)
+            uniqueItems.append(item)
+    itemList = uniqueItems
+
+    groups = ARHierarchy.groupByHierarchy(paths)
+    itemListArr = [[itemList[i] for i in group] for group in groups]
+    logger.debug('arrangeListByHierarchy: sorted: %s', itemListArr)
 
     return itemListArr
 
 
-def findMirrorPoints(listObjects, mirrorVector=(-1,1,1), precision=0.01):
+def findMirrorPoints(listObjects, mirrorVector=(-1,1,1), precision=0.01, reportAmbiguous=False):
     """
     Given a list of transform nodes, organize a list with each respectivaly mirror point
     p.e [[objLeft, objRight], [obj2Left, obj2Right], ...]
+    World positions are queried at once, and pairs are searched with a kd-tree, see ARSpatial.mirrorPairs
     :param listObjects:
     :param mirrorVector: x y z value positive or negative
     :param precision:
-    :return:
+    :param reportAmbiguous(bool): if True, return too a list with the objects that had more than one candidate
+            p.e [[obj, [candidate1, candidate2]], ...]
+    :return: mirrorObjectsList, noMirrorObjectsList, (ambiguousList)
     """
     # check type
     mirrorVector = checkVectorType(mirrorVector)
+    listObjects = list(listObjects)
 
-    # save here the results
-    mirrorObjectsList = []
-    noMirrorObjectsList = []
-    # iterate half list
-    while len(listObjects):
-        candidate = None
-        paired = []
-        # get obj positions
-        obj = listObjects.pop()
-        objPos = pm.datatypes.Vector(obj.getTranslation('world'))
-        # get search vector
-        searchVector = pm.datatypes.Vector(0,0,0)
-        for axis in range(3):
-            searchVector[axis] = objPos[axis] * mirrorVector[axis]
-
-        for mirrorObj in listObjects:
-            # compare positions
-            diferenceVector = mirrorObj.getTranslation('world') - searchVector
-            if diferenceVector.length() <= precision:
-                if not candidate:
-                    candidate = mirrorObj
-
-                # check if new candidate is nearest
-                elif candidate and diferenceVector.length() < pm.datatypes.Vector(candidate.getTranslation('world') -
-                                                                                  searchVector).length():
-                    candidate = mirrorObj
-
-        if candidate:
-            paired.append(obj)
-            paired.append(candidate)
-            # remove from list
-            listObjects.remove(candidate)
-            # and add to return list
-            mirrorObjectsList.append(paired)
-
-        # no candidate
-        else:
-            noMirrorObjectsList.append(obj)
+    # all world positions in one query
+    positions = cmds.xform([str(obj) for obj in listObjects], q=True, ws=True, t=True) if listObjects else []
+    pairs, unpaired, ambiguous = ARSpatial.mirrorPairs(positions, tuple(mirrorVector), precision)
+
+    mirrorObjectsList = [[listObjects[i], listObjects[j]] for i, j in pairs]
+    noMirrorObjectsList = [listObjects[i] for i in unpaired]
 
+    if ambiguous:
+        logger.info('findMirrorPoints: %s objects with more than one mirror candidate', len(ambiguous))
+
+    if reportAmbiguous:
+        ambiguousList = [[listObjects[i], [listObjects[j] for j in candidates]] for i, candidates in ambiguous]
+        return mirrorObjectsList, noMirrorObjectsList, ambiguousList
 
     return mirrorObjectsList, noMirrorObjectsList
 
@@ -434,47 +640,20 @@ def syncListsByKeyword(primaryList, secondaryList, keyword=None):
     keyword: twist
     Returnsn : [['akona_upperArm_twist1_left_joint', 'akona_upperArm_twist2_left_joint'], ['akona_foreArm_twist1_left_joint', 'akona_foreArm_twist2_left_joint'], []]
 
+    each secondary name is reduced once to its key, and matched by dict, see ARNaming
     """
-    filterChars = '1234567890_'
+    # names are read once, secondary items keep their list order inside each group
+    primaryNames = [str(item) for item in primaryList]
+    secondaryNames = [str(item) for item in secondaryList]
     # if not keyword try to find one
     if not keyword:
-        count = {}
-        # count how many copies of each word we have, using a dictionary on the secondary list
-        for secondaryItem in secondaryList:
-            for word in str(secondaryItem).split('_'):
-                for fChar in filterChars:
-                    word = word.replace(fChar, '')
-                # if word is yet in dictionary, plus one, if not, create key with word and set it to one
-                # explanation: dict.get(word, 0) return the value of word, if not, return 0
-                count[word] = count.get(word, 0) + 1
-        # key word must not be in primary list
-        wordsDetect = [word for word in count if count[word] == len(secondaryList) and word not in str(primaryList[0])]
-
-        if len(wordsDetect) != 1:
+        keyword = ARNaming.detectKeyword(primaryNames, secondaryNames)
+        if not keyword:
             logger.info('no keyword detect')
             return
-        keyword = wordsDetect[0]
-
-    arrangedSecondary = []
-    # arrange by keyword
-    for primaryItem in primaryList:
-        actualList = []
-        for secondaryItem in secondaryList:
-            splitStr = str(secondaryItem).partition(keyword)
-            indexCut = None
-            for i, char in enumerate(splitStr[-1]):
-                if char in filterChars:
-                    indexCut = i + 1
-                else:
-                    break
-
-            compareWord = splitStr[0] + splitStr[-1][indexCut:]
-            if compareWord == str(primaryItem):
-                actualList.append(secondaryItem)
 
-        arrangedSecondary.append(actualList)
-
-    return arrangedSecondary
+    return [[secondaryList[i] for i in group]
+            for group in ARNaming.groupByKeyword(primaryNames, secondaryNames, keyword)]
 
 
 def relocatePole(pole, joints, distance=1):
@@ -516,15 +695,49 @@ def relocatePole(pole, joints, distance=1):
                        poleVector.x * distance + position2[0], poleVector.y * distance + position2[1], poleVector.z * distance + position2[2], 1])
 
 
-def snapCurveToPoints(points, curve, iterations=4, precision=0.05):
+@ARProfiler.profiled
+def snapCurveToPoints(points, curve, iterations=4, precision=0.05, method='iterative', parameterization='chord'):
     """
     Snap curve to points moving CV's of the nurbsCurve
     Args:
         points(list): transform where snap curve
         curve(pm.nurbsCurve): curve to snap
         iterations(int): number of passes, higher more precise. default 4
+                with leastSquares, number of param corrections, 1 or 2 are enough
         precision(float): distance between point and curve the script is gonna take as valid. default 0.05
+        method(str): iterative, each pass moves the nearest cv to each point.
+                leastSquares, fits all the cvs at once, curve ends are kept
+        parameterization(str): leastSquares initial params, chord or centripetal
+    Returns:
+        float: with leastSquares, max distance between points and curve
     """
+    if method == 'leastSquares':
+        mfnCurve = OpenMaya2.MFnNurbsCurve(MeshOp.getDagPath2(curve))
+        if mfnCurve.form == OpenMaya2.MFnNurbsCurve.kPeriodic:
+            raise ValueError('snapCurveToPoints: leastSquares needs an open curve, %s is periodic' % curve)
+
+        targets = np.array([cmds.xform(str(point), q=True, ws=True, t=True) for point in points], dtype=np.float64)
+        cvs = np.array([list(cv)[:3] for cv in mfnCurve.cvPositions(OpenMaya2.MSpace.kWorld)])
+        knots = np.array(mfnCurve.knots())
+
+        # chord params between the curve params of the first and last points
+        start = mfnCurve.closestPoint(OpenMaya2.MPoint(*targets[0]), space=OpenMaya2.MSpace.kWorld)[1]
+        end = mfnCurve.closestPoint(OpenMaya2.MPoint(*targets[-1]), space=OpenMaya2.MSpace.kWorld)[1]
+        params = ARNurbs.parameterize(targets, parameterization, start, end)
+
+        cvs, params, error = ARNurbs.fitCurve(cvs, knots, mfnCurve.degree, targets, params, iterations=iterations,
+                                              precision=precision)
+        mfnCurve.setCVPositions([OpenMaya2.MPoint(*cv) for cv in cvs.tolist()], OpenMaya2.MSpace.kWorld)
+        mfnCurve.updateCurve()
+
+        if error > precision:
+            logger.warning('snapCurveToPoints: %s max distance %s is over precision %s, add cvs to the curve',
+                           curve, error, precision)
+        return error
+
+    elif method != 'iterative':
+        raise ValueError('snapCurveToPoints: unknown method %s, use iterative or leastSquares' % method)
+
     selection = OpenMaya.MSelectionList()
     selection.add(str(curve))
     dagpath = OpenMaya.MDagPath()
@@ -534,7 +747,7 @@ def snapCurveToPoints(points, curve, iterations=4, precision=0.05):
 
     for i in range(iterations):
         for joint in points:
-            jointPos = joint.getTranslation('world')
+            jointPos = ARMatrixCache.worldTranslation(joint)
             jointPosArray = OpenMaya.MFloatArray()
             util = OpenMaya.MScriptUtil()
             util.createFloatArrayFromList(jointPos, jointPosArray)
@@ -627,16 +840,72 @@ class APIHelp:
             transform = mSelIt.getDependNode()
             mfnTransform = OpenMaya2.MFnDependencyNode(transform)
 
-            print transform
+            logger.info('%s', mfnTransform.name())
 
             for i in range(mfnTransform.attributeCount()):
                 transformAttr = mfnTransform.attribute(i)
                 transformAttr_plug = mfnTransform.findPlug(transformAttr, True)
-                print ('%s is type: %s' % (transformAttr_plug.info, transformAttr.apiTypeStr))
+                logger.info('%s is type: %s', transformAttr_plug.info, transformAttr.apiTypeStr)
 
             mSelIt.next()
 
 
+    # API1 array type -> (MScriptUtil pointer method, ctypes type, numpy type)
+    _MARRAY_TYPES = {OpenMaya.MFloatArray: ('asFloatPtr', ctypes.c_float, np.float32),
+                     OpenMaya.MIntArray: ('asIntPtr', ctypes.c_int, np.int32),
+                     OpenMaya.MDoubleArray: ('asDoublePtr', ctypes.c_double, np.float64)}
+
+    @staticmethod
+    def mArrayToNumpy(mArray):
+        """
+        Copy an API1 MFloatArray, MIntArray or MDoubleArray to a numpy array.
+        API1 arrays do not expose their storage, so the values are copied once on the C side
+        into a MScriptUtil buffer, and the buffer is read with ctypes. No per element python calls.
+        Args:
+            mArray: OpenMaya.MFloatArray, MIntArray or MDoubleArray
+
+        Returns: np.array
+        """
+        ptrMethod, cType, npType = APIHelp._MARRAY_TYPES[type(mArray)]
+        length = mArray.length()
+        if not length:
+            return np.zeros(0, dtype=npType)
+
+        util = OpenMaya.MScriptUtil()
+        util.createFromList([0] * length, length)
+        ptr = getattr(util, ptrMethod)()
+        mArray.get(ptr)  # c side copy
+
+        # swig pointers give its address with int()
+        buffer = (cType * length).from_address(int(ptr))
+        return np.frombuffer(buffer, dtype=npType).copy()
+
+
+    @staticmethod
+    def numpyToMArray(array, arrayType=OpenMaya.MFloatArray):
+        """
+        Create an API1 array from a numpy array
+        Args:
+            array: np.array or list
+            arrayType: OpenMaya.MFloatArray, MIntArray or MDoubleArray
+
+        Returns: arrayType object
+        """
+        npType = APIHelp._MARRAY_TYPES[arrayType][2]
+        values = np.ascontiguousarray(array, dtype=npType).tolist()
+
+        mArray = arrayType()
+        util = OpenMaya.MScriptUtil()
+        if arrayType is OpenMaya.MIntArray:
+            util.createIntArrayFromList(values, mArray)
+        elif arrayType is OpenMaya.MFloatArray:
+            util.createFloatArrayFromList(values, mArray)
+        else:
+            util.createDoubleArrayFromList(values, mArray)
+
+        return mArray
+
+
     @staticmethod
     def getSingleSourceObjectFromPlug(plug):
         """
@@ -685,11 +954,11 @@ class DeformerOp:
     class WeightsOP:
         # TODO: work with BS targets
         def __init__(self):
-            # weights buffer
+            # weights buffer, ARWeights.WeightBuffer
             self._weights = None
-            # data to calculate symmetric weights, with barycentric coords
+            # data to calculate symmetric weights, with barycentric coords. np.array (n, 3)
             self._symetryWeights = None
-            # list with symmetric index vertex, 3 vertices for each vertex, to apply correct the barycentric weights
+            # symmetric index vertex, 3 vertices for each vertex, to apply correct the barycentric weights. np.array (n, 3)
             self._symetryID = None
 
 
@@ -698,8 +967,7 @@ class DeformerOp:
             shrink the vertex weight values
             :return:
             """
-            for i in range(self._weights.length()):
-                self._weights[i] = self._weights[i] * self._weights[i]
+            self._weights.shrink()
 
 
         def inverValues(self):
@@ -707,8 +975,7 @@ class DeformerOp:
             Invert vertex weight values
             :return:
             """
-            for i in range(self._weights.length()):
-                self._weights[i] = 1.0 - self._weights[i]
+            self._weights.invert()
 
 
         def setSymetryData(self, mesh, axis="x"):
@@ -717,102 +984,115 @@ class DeformerOp:
             :param mesh: Base mesh to set the symmetry
             :param axis:
             """
-            print "__StartSymetry__"
+            logger.debug("__StartSymetry__")
+            # mirror is a gather over the arrays
             self._symetryWeights, self._symetryID = MeshOp.barycentricSym(mesh, axis)
-            print "__EndSymetry__"
+            logger.debug("__EndSymetry__")
 
 
         def mirrorWeights(self):
             """
-            Mirror the data in BSWeights
-            :param BSNode:
+            Mirror the data in the weights buffer
             :return:
             """
-            oldWeights = OpenMaya.MFloatArray(self._weights)
-            for i in range(oldWeights.length()):
-                newWeight = 0.0
-                for j, axis in enumerate("xyz"):
-                    newWeight += getattr(self._symetryWeights[i], axis) * oldWeights[self._symetryID[i * 3 + j]]
+            self._weights.mirror(self._symetryID, self._symetryWeights)
 
-                self._weights[i] = newWeight
 
-
-        def setWeights(self, node):
+        def setWeights(self, node, target=None):
             """
             Method to apply the current weights in the buffer
             :param node:
+            :param target(int or str): blend shape only, target index or alias. None -> base weights
             :return:
             """
             # check type
             node = pm.PyNode(node) if isinstance(node, str) else node
 
             if isinstance(node, pm.nodetypes.BlendShape):
-                self._setWeights_BS(node)
+                self._setWeights_BS(node, target)
 
             else:
                 self._setWeights_DEF(node)
 
 
-        def getWeights(self, node):
+        def getWeights(self, node, target=None):
             """
             Method to get the current weights in the buffer
             :param node:
+            :param target(int or str): blend shape only, target index or alias. None -> base weights
             :return:
             """
             # check type
             node = pm.PyNode(node) if isinstance(node, str) else node
 
             if isinstance(node, pm.nodetypes.BlendShape):
-                self._getWeights_BS(node)
+                self._getWeights_BS(node, target)
 
             else:
                 self._getWeights_DEF(node)
 
 
-        def _setWeights_BS(self, BSNode):
+        def _setWeights_BS(self, BSNode, target=None):
             """
-            Set the Blend shape weights with the float array values
+            Set the Blend shape weights with the float array values.
+            Write the sparse array in contiguous ranges, one setAttr per range.
+            elements with the default value (1.0) that do not exist in the node are skipped.
             :param BSNode:
+            :param target(int or str): target index or alias. None -> base weights
             :return:
             """
-            arraySize, weightAttr = self._setGetCommon(BSNode)
+            arraySize, weightAttr = self._setGetCommon_BS(BSNode, target)
 
-            if arraySize != self._weights.length():
-                logger.info("mFloatArray do not has the correct size")
+            if arraySize != len(self._weights):
+                logger.info("weights buffer do not has the correct size")
                 return
 
-            for i in range(arraySize):
-                weightAttr[i].set(self._weights[i])
+            existing = cmds.getAttr(weightAttr, multiIndices=True) or []
+            weights = self._weights.weights
+            for start, end in ARWeights.sparseWriteRuns(weights, existing, 1.0):
+                values = weights[start:end+1].tolist()
+                cmds.setAttr('%s[%s:%s]' % (weightAttr, start, end), *values, size=len(values))
 
 
-        def _getWeights_BS(self, BSNode):
+        def _getWeights_BS(self, BSNode, target=None):
             """
-            Get the blend shape node weights per vertex
+            Get the blend shape node weights per vertex, reading the whole sparse array at once.
+            the non existing elements get the default value (1.0)
             :param BSNode:
+            :param target(int or str): target index or alias. None -> base weights
             :return:
             """
-            arraySize, weightAttr = self._setGetCommon_BS(BSNode)
+            arraySize, weightAttr = self._setGetCommon_BS(BSNode, target)
 
-            # set the array with the total of points, mFloatArray is faster
-            self._weights = OpenMaya.MFloatArray(arraySize, 0.0)
+            indices = cmds.getAttr(weightAttr, multiIndices=True) or []
+            values = cmds.getAttr(weightAttr) if indices else []
+            # with only one element, getAttr returns a float
+            values = values if isinstance(values, list) else [values]
 
-            for i in range(arraySize):
-                self._weights.set(weightAttr[i].get(), i)
+            self._weights = ARWeights.WeightBuffer(ARWeights.denseFromSparse(indices, values, arraySize, 1.0))
 
 
-        def _setGetCommon_BS(self, BSNode):
+        def _setGetCommon_BS(self, BSNode, target=None):
             """
             Common between get and set bs weights
-            must call plug_weight.destructHandle(dataHandle) at the end
             :param BSNode (str):
-            :return:
+            :param target(int or str): target index or alias. None -> base weights
+            :return(int, str): number of vertices, weights attribute name
             """
             # get total vertex in mesh
             mesh = pm.PyNode(str(BSNode)).outputGeometry.outputs()[0].getShape()
             arraySize = mesh.numVertices()
-            weightAttr = pm.PyNode('%s.inputTarget[0].baseWeights' % BSNode)
 
-            return arraySize, weightAttr
+            if target is None:
+                return arraySize, '%s.inputTarget[0].baseWeights' % BSNode
+
+            # alias to target index
+            if isinstance(target, str):
+                aliasList = cmds.aliasAttr(str(BSNode), q=True) or []
+                aliasDict = dict(zip(aliasList[::2], aliasList[1::2]))
+                target = int(aliasDict[target].split('[')[-1][:-1])
+
+            return arraySize, '%s.inputTarget[0].inputTargetGroup[%s].targetWeights' % (BSNode, target)
 
 
         def _setWeights_DEF(self, node):
@@ -823,7 +1103,7 @@ class DeformerOp:
             """
             weightGeometryFilter, arraySize, components, dagPath = self._setGetCommon_DEF(node)
 
-            weightGeometryFilter.setWeight(dagPath, components, self._weights)
+            weightGeometryFilter.setWeight(dagPath, components, APIHelp.numpyToMArray(self._weights.weights))
 
 
         def _getWeights_DEF(self, node):
@@ -834,8 +1114,9 @@ class DeformerOp:
             """
             weightGeometryFilter, arraySize, components, dagPath = self._setGetCommon_DEF(node)
 
-            self._weights = OpenMaya.MFloatArray(arraySize, 0.0)
-            weightGeometryFilter.getWeights(0, components, self._weights)  # review documentation
+            mWeights = OpenMaya.MFloatArray(arraySize, 0.0)
+            weightGeometryFilter.getWeights(0, components, mWeights)  # review documentation
+            self._weights = ARWeights.WeightBuffer(APIHelp.mArrayToNumpy(mWeights))
 
 
         def _setGetCommon_DEF(self, node):
@@ -866,10 +1147,12 @@ class DeformerOp:
 
 
     @staticmethod
-    def smoothDeformerWeights(deformer):
+    def _deformerMembers(deformer):
         """
-        smooth deformer weights.
+        Read the members of a deformer set
         :param deformer(str): Deformer name
+        :return(MFnWeightGeometryFilter, MDagPath, MObject, np.array): weight mfn, dag path and components
+                of the first element of the deformer set, and the members vertex index in components order
         """
         mSelection = OpenMaya.MSelectionList()
         mSelection.add(deformer)
@@ -887,47 +1170,84 @@ class DeformerOp:
         components = OpenMaya.MObject()
         membersSelList.getDagPath(0, dagPathComponents, components)  # first element deformer set
 
-        # get original weights
+        # members vertex index
+        members = OpenMaya.MIntArray()
+        OpenMaya.MFnSingleIndexedComponent(components).getElements(members)
+
+        return weightGeometryFilter, dagPathComponents, components, APIHelp.mArrayToNumpy(members)
+
+
+    @staticmethod
+    @ARProfiler.profiled
+    def smoothDeformerWeights(deformer, iterations=1, method='laplacian', factor=None):
+        """
+        smooth deformer weights.
+        The mesh adjacency is built once per topology and cached, see ARTopology.
+        Only the members of the deformer set are modified.
+        :param deformer(str): Deformer name
+        :param iterations(int): smooth iterations
+        :param method(str): laplacian or taubin
+        :param factor(float): smooth step, None -> average of each vertex and its neighbours
+        """
+        weightGeometryFilter, dagPathComponents, components, members = DeformerOp._deformerMembers(deformer)
+
+        # get original weights, in components order
         originalWeight = OpenMaya.MFloatArray()
         weightGeometryFilter.getWeights(0, components, originalWeight)
 
-        # mesh
-        meshVertIt = OpenMaya.MItMeshVertex(dagPathComponents)
+        # dense weights, no members have no weight
+        weights = np.zeros(OpenMaya.MFnMesh(dagPathComponents).numVertices(), dtype=np.float64)
+        weights[members] = APIHelp.mArrayToNumpy(originalWeight)
 
-        newWeights = OpenMaya.MFloatArray()
-        # calculate new weights
-        while not meshVertIt.isDone():
-            index = meshVertIt.index()
-            connectedVertices = OpenMaya.MIntArray()
-            meshVertIt.getConnectedVertices(connectedVertices)
+        DeformerOp.setDeformerWeights(deformer, weights, iterations, method, factor)
 
-            averageValue = originalWeight[index]
-            for vertex in connectedVertices:
-                averageValue += originalWeight[vertex]
 
-            newWeights.append(averageValue / (connectedVertices.length() + 1))
+    @staticmethod
+    @ARProfiler.profiled
+    def setDeformerWeights(deformer, weights, smoothIterations=0, method='laplacian', factor=None):
+        """
+        Write a per vertex weight map to the members of a deformer set, with one setWeight call.
+        The map can be smoothed in memory before, over the cached mesh adjacency, only the members are modified.
+        :param deformer(str): Deformer name
+        :param weights(np.array): one weight per vertex of the mesh
+        :param smoothIterations(int): smooth iterations, 0 writes the weights as they are
+        :param method(str): laplacian or taubin
+        :param factor(float): smooth step, None -> average of each vertex and its neighbours
+        """
+        weightGeometryFilter, dagPathComponents, components, members = DeformerOp._deformerMembers(deformer)
+        weights = np.asarray(weights, dtype=np.float64)
 
-            meshVertIt.next()
+        if smoothIterations:
+            # cached adjacency
+            adjacency = MeshOp.getAdjacency(dagPathComponents)
+            mask = np.zeros(adjacency.numVertices, dtype=bool)
+            mask[members] = True
+            weights = ARTopology.smoothValues(adjacency, weights, smoothIterations, method, factor, mask)
 
         # set new weights
-        weightGeometryFilter.setWeight(dagPathComponents, components, newWeights)
+        weightGeometryFilter.setWeight(dagPathComponents, components, APIHelp.numpyToMArray(weights[members]))
 
 
     @staticmethod
-    def setWireDeformer(joints, mesh=None, nameInfo=None, curve=None, weights=None):
+    def setWireDeformer(joints, mesh=None, nameInfo=None, curve=None, weights=None, falloff=None, smoothIterations=4):
         """
         Create a curve and wire deformer using joint position as reference
         :param joints(pm or str): joints
             mesh(list): list of meshes wire will affect
+            weights(np.array): one weight per vertex, None -> vertices inside the curve cylinder
+            falloff(str): None, 1 inside the cylinder. linear or smooth, weight by distance to the curve,
+                see ARWeights.distanceFalloff
+            smoothIterations(int): laplacian smooth iterations of the weights
         :return: wire deformer and created curve
         nameInfo: characterName_zone_side
+        the weights are calculated and smoothed in memory, and written at once
         """
         # create pm objects from list
         joints = [pm.PyNode(joint) if isinstance(joint, str) else joint for joint in joints]
 
         # get points
         points = [joint.getTranslation('world') for joint in joints]
-        logger.debug('Wire Deformer curve points: %s' % points)
+        logger.debug('Wire Deformer curve points: %s', points)
 
         # If curve arg is None, create a two point curve
         if not curve:
@@ -946,19 +1266,18 @@ class DeformerOp:
                 mesh = mesh.getShape()
 
         # get affected vertex
-        affectedVertex = vertexIntoCurveCilinder(str(mesh), str(curve.getShape()), 15, .05, .98)
+        if weights is None:
+            radius = 15
+            affectedVertex, vertexDistance = vertexIntoCurveCilinder(str(mesh), str(curve.getShape()), radius, .05, .98)
+            weights = ARWeights.distanceFalloff(mesh.numVertices(), affectedVertex, vertexDistance, radius, falloff)
 
         # create wire deformer
         wire, wireCurve = pm.wire(mesh, gw=False, w=curve, dds=(0, 40))
-        logger.debug('wire curve: %s' % wireCurve)
-        pm.percent(wire, mesh, v=0)
-        for index in affectedVertex:
-            pm.percent(wire, mesh.vtx[index], v=1)
+        logger.debug('wire curve: %s', wireCurve)
 
         # copyDeformerWeights  ->  command for copy, mirror deformer weights
-        # smooth weights
-        for i in range(4):
-            DeformerOp.smoothDeformerWeights(str(wire))
+        # smooth and set weights
+        DeformerOp.setDeformerWeights(str(wire), weights, smoothIterations)
 
         return wire, curve
 
@@ -997,11 +1316,11 @@ class DeformerOp:
         # lattice bbox
         latticeTransform = lattice.getTransform()
         latBbox = latticeTransform.boundingBox()
-        logger.debug('LatBboc: %s' % latBbox)
+        logger.debug('LatBboc: %s', latBbox)
 
         # Util transform  data
         centerPoint = (latBbox[0] + latBbox[1]) / 2
-        logger.debug('Lattice center point: %s, %s' % (centerPoint, type(centerPoint)))
+        logger.debug('Lattice center point: %s, %s', centerPoint, type(centerPoint))
         # min and max centered points
         minPoint = pm.datatypes.Point(centerPoint[0], latBbox[0][1], centerPoint[2])
         maxPoint = pm.datatypes.Point(centerPoint[0], latBbox[1][1], centerPoint[2])
@@ -1131,173 +1450,144 @@ class DeformerOp:
         return [scaleGrp, referenceBase, referenceController, bendTransform, controllerRoot]
 
 
+    class WeightTransfer(object):
+        """
+        Closest point weight transfer from a mesh of a deformer to other meshes.
+        The source mesh is read and indexed once: a vertex -> weight array, its triangles and
+        a triangle bvh. So the same object can add several meshes to the deformer.
+        """
+        def __init__(self, deformer, source=None):
+            """
+            :param deformer(str): deformer name
+            :param source(str): mesh in the deformer with the weights, if None, the last member of the set
+            """
+            self.deformer = str(deformer)
+
+            mSelection = OpenMaya.MSelectionList()
+            mSelection.add(self.deformer)
+            deformerMObject = OpenMaya.MObject()
+            mSelection.getDependNode(0, deformerMObject)
+
+            # documentation: https://groups.google.com/forum/#!topic/python_inside_maya/E7QirW4Z0Nw
+            self._weightGeometryFilter = OpenMayaAnim.MFnWeightGeometryFilter(deformerMObject)
+            self._fnSet = OpenMaya.MFnSet(self._weightGeometryFilter.deformerSet())  # set components affected
+            membersSelList = OpenMaya.MSelectionList()
+            self._fnSet.getMembers(membersSelList, False)
+            dagPathComponents = OpenMaya.MDagPath()
+            components = OpenMaya.MObject()
+            memberSelLength = membersSelList.length()
+            if source:
+                for i in range(memberSelLength):
+                    membersSelList.getDagPath(i, dagPathComponents, components)
+                    if dagPathComponents.partialPathName() == str(source):
+                        break
+            else:
+                # get the last member, it should be the first object deformed
+                membersSelList.getDagPath(memberSelLength-1, dagPathComponents, components)
+
+            self.source = dagPathComponents.partialPathName()
+            logger.debug('Mesh with weights: %s', self.source)
+
+            # vertex id -> weight, no member vertices have no weight
+            originalWeight = OpenMaya.MFloatArray()
+            self._weightGeometryFilter.getWeights(0, components, originalWeight)
+            members = OpenMaya.MIntArray()
+            OpenMaya.MFnSingleIndexedComponent(components).getElements(members)
+            members = APIHelp.mArrayToNumpy(members)
+
+            counts, connects, numVertices = MeshOp.getTopology(dagPathComponents)
+            self._vertexWeights = np.zeros(numVertices, dtype=np.float64)
+            self._vertexWeights[members] = APIHelp.mArrayToNumpy(originalWeight)
+            isMember = np.zeros(numVertices, dtype=bool)
+            isMember[members] = True
+            # faces with any vertex in the deformer
+            faceIds = np.repeat(np.arange(counts.size), counts)
+            self._faceHasMember = np.bincount(faceIds, weights=isMember[connects], minlength=counts.size) > 0
+
+            # source triangles, triangle row -> face
+            sourceDagPath = MeshOp.getDagPath2(self.source)
+            sourceMFn = OpenMaya2.MFnMesh(sourceDagPath)
+            triangleCounts, triangleVertices = sourceMFn.getTriangles()
+            triangleCounts = np.array(triangleCounts, dtype=np.int64)
+            self._triangles = np.array(triangleVertices, dtype=np.int64).reshape(-1, 3)
+            self._triangleFaces = np.repeat(np.arange(triangleCounts.size), triangleCounts)
+            self._points = MeshOp.getPoints(sourceDagPath)
+
+            # spatial index, object space
+            self._bvh = ARSpatial.TriangleBVH(self._points, self._triangles)
+
+
+        def closestWeights(self, mesh):
+            """
+            Calculate the transferred weights for the vertices of mesh.
+            Each vertex gets the barycentric interpolation of the weights of its closest source triangle.
+            Only vertices whose closest face has a vertex in the deformer are returned.
+            All the vertices are solved in one batch query of the source bvh.
+            :param mesh(str): target mesh
+            :return(np.array, np.array): vertex ids, weights
+            """
+            targetPoints = MeshOp.getPoints(str(mesh))
+            closestPoints, triangles, barycentric = self._bvh.closestPoints(targetPoints)
+
+            triangleVertices = self._triangles[triangles]
+            weights = (barycentric * self._vertexWeights[triangleVertices]).sum(axis=1)
+
+            valid = self._faceHasMember[self._triangleFaces[triangles]]
+            return np.nonzero(valid)[0], weights[valid]
+
+
+        def addMesh(self, mesh):
+            """
+            Add the mesh vertices close to the deformer to the deformer set, and set their weights
+            :param mesh(str): target mesh
+            """
+            mesh = str(mesh)
+            vertexIds, weights = self.closestWeights(mesh)
+            if not vertexIds.size:
+                logger.info('%s has not vertices close to %s deformer', mesh, self.deformer)
+                return
+
+            mSelection = OpenMaya.MSelectionList()
+            mSelection.add(mesh)
+            targetDPath = OpenMaya.MDagPath()
+            mSelection.getDagPath(0, targetDPath)
+            if targetDPath.apiType() == OpenMaya.MFn.kTransform:
+                targetDPath.extendToShape()  # if is ktransform type. get the shape
+
+            # vertex component
+            fnComponent = OpenMaya.MFnSingleIndexedComponent()
+            components = fnComponent.create(OpenMaya.MFn.kMeshVertComponent)
+            fnComponent.addElements(APIHelp.numpyToMArray(vertexIds, OpenMaya.MIntArray))
+
+            # add to mfnSet
+            targetSelList = OpenMaya.MSelectionList()
+            targetSelList.add(targetDPath, components)
+            self._fnSet.addMembers(targetSelList)
+
+            self._weightGeometryFilter.setWeight(targetDPath, components, APIHelp.numpyToMArray(weights))
+
+
     @staticmethod
-    def addToDeformer(deformer, mesh, source=None):
-        # TODO: move to ARCore necessary to
-        # documentation: https://groups.google.com/forum/#!topic/python_inside_maya/E7QirW4Z0Nw
-        # documentation: https://help.autodesk.com/view/MAYAUL/2018/ENU/?guid=__cpp_ref_class_m_fn_set_html  # mfnSet
-        # documentation: https://help.autodesk.com/view/MAYAUL/2018/ENU/?guid=__cpp_ref_class_m_fn_weight_geometry_filter_html  # geometryFilter
+    @ARProfiler.profiled
+    def addToDeformer(deformer, mesh, source=None, transfer=None):
         """
         Add a mesh to the deformer, and copy weights between the new mesh and the existent mesh in the deformer
         :param deformer(str): deformer name
-        :param mesh2(str): mesh shape where copy weights
+        :param mesh(str): mesh shape where copy weights
         :param source (str): mesh with weights
-        :return:
+        :param transfer(DeformerOp.WeightTransfer): reuse the source index of a previous call with the same deformer
+        :return(DeformerOp.WeightTransfer): pass it to next calls that add meshes to the same deformer
         """
         # check if is pymel node, if it is, convert to str
         deformer = str(deformer) if isinstance(deformer, pm.general.PyNode) else deformer
         mesh = str(mesh) if isinstance(mesh, pm.general.PyNode) else mesh
 
-        # get cluster
-        mSelection = OpenMaya.MSelectionList()
-        mSelection.add(deformer)
-        mSelection.add(mesh)
-        # deformer
-        deformerMObject = OpenMaya.MObject()
-        mSelection.getDependNode(0, deformerMObject)
+        if transfer is None or transfer.deformer != deformer:
+            transfer = DeformerOp.WeightTransfer(deformer, source)
 
-        # weight mfn
-        weightGeometryFilter = OpenMayaAnim.MFnWeightGeometryFilter(deformerMObject)
-        membersSelList = OpenMaya.MSelectionList()
-        fnSet = OpenMaya.MFnSet(weightGeometryFilter.deformerSet())  # set components affected
-        fnSet.getMembers(membersSelList, False)  # add to selection list
-        dagPathComponents = OpenMaya.MDagPath()
-        components = OpenMaya.MObject()
-        memberSelLength = membersSelList.length()  # get the last member, it should be the first object deformed
-        if source:
-            for i in range(memberSelLength):
-                membersSelList.getDagPath(i, dagPathComponents, components)  # first element deformer set
-                if dagPathComponents.partialPathName() == source:
-                    print "Mesh with weights: %s" % dagPathComponents.partialPathName()
-                    break
-        else:
-            membersSelList.getDagPath(memberSelLength-1, dagPathComponents, components)  # first element deformer set
+        transfer.addMesh(mesh)
 
-        print "Mesh %s" % dagPathComponents.partialPathName()
-        # get original weights0
-        originalWeight = OpenMaya.MFloatArray()
-        weightGeometryFilter.getWeights(0, components, originalWeight)  # review documentation
-
-        # ## test components
-        # logger.debug("member set list: %s" % membersSelList.length())
-        # logger.debug("reference object: %s" % dagPathComponents.fullPathName())
-        # return
-
-        # get target mfn and all point positions
-        targetDPath = OpenMaya.MDagPath()
-        mSelection.getDagPath(1, targetDPath)
-        if targetDPath.apiType() is OpenMaya.MFn.kTransform:
-            targetDPath.extendToShape()  # if is ktransform type. get the shape
-        # target It
-        targetIt = OpenMaya.MItMeshVertex(targetDPath)
-
-        # deformer vertex iterator
-        sourceVertIt = OpenMaya.MItMeshVertex(dagPathComponents, components)
-        sourceMFn = OpenMaya.MFnMesh(dagPathComponents)
-        # list index on set fn
-        sourceVertexId = OpenMaya.MIntArray()
-        while not sourceVertIt.isDone():
-            sourceVertexId.append(sourceVertIt.index())
-            sourceVertIt.next()
-
-        sourceVertIt.reset()
-        logger.debug('source vertex id: %s' % sourceVertexId)
-
-        targetDeformVId = OpenMaya.MIntArray()
-        targetSelList = OpenMaya.MSelectionList()
-        newWeights = OpenMaya.MFloatArray()
-        lastLength = 0  # useful to find valid vertex
-        # closest vertex from target to source
-        # review, optimize
-        while not targetIt.isDone():
-            TVid = targetIt.index()
-            TargetPoint = targetIt.position()
-            closestPoint = OpenMaya.MPoint()
-            # util
-            util = OpenMaya.MScriptUtil()
-            ptr = util.asIntPtr()
-            sourceMFn.getClosestPoint(TargetPoint, closestPoint, OpenMaya.MSpace.kObject, ptr)  # review kworld
-            polyId = util.getInt(ptr)
-
-            # get vertices from face id
-            vertexId = OpenMaya.MIntArray()
-            # gives the vertex in non clock direction
-            sourceMFn.getPolygonVertices(polyId, vertexId)
-            vertexLength = vertexId.length()
-            weightList=[]
-            totalArea = 0
-            areaList=[]
-            totalWeight = 0
-            # polygonArea
-            # sourceVertIt.setIndex(polyId)
-            # iterate over the face vertex
-            # check if any vertex is in the list of source vertex
-            # TODO: review calculations, and try to optimize
-            if set(vertexId) & set(sourceVertexId):  # & intersection
-                for i, Vid in enumerate(vertexId):
-                    # check first if any vertex is in the list
-                    # calculate relative weight.
-                    DistPoint = OpenMaya.MPoint()
-                    sourceMFn.getPoint(Vid, DistPoint)  # get weighted vertex position
-                    DistVector = OpenMaya.MVector(closestPoint - DistPoint)
-                    vectorU = OpenMaya.MPoint()  # vectorA
-                    sourceMFn.getPoint(vertexId[i-1], vectorU)
-                    vectorV = OpenMaya.MPoint()  # vertorB
-                    sourceMFn.getPoint(vertexId[(i+1) % vertexLength], vectorV)
-                    # construct barycentricc vectors
-                    # documentation: http://blackpawn.com/texts/pointinpoly/
-                    vectorU = OpenMaya.MVector(vectorU - DistPoint)
-                    vectorV = OpenMaya.MVector(vectorV - DistPoint)
-
-                    # Barycentric coords
-                    u, v = VectorMath.barycentricCoords(vectorU, vectorV, DistVector)
-
-                    areaVector = (vectorU*(1-u) ^ vectorV*(1-v)).length()
-                    totalArea += areaVector
-                    areaList.append(areaVector)
-
-                    # get wheights
-                    if Vid in sourceVertexId:
-                        weightIndex = list(sourceVertexId).index(Vid)  # get the vertex list index, valid for the weight list
-                        sourceWeight = originalWeight[weightIndex]  # get weight value from the list
-                    else:
-                        sourceWeight = 0
-                    weightList.append(sourceWeight)
-
-                    # save valid vertex index. only once.
-                    if not TVid in targetDeformVId:
-                        targetDeformVId.append(TVid)
-                        # save components in a selection list. this way we can add it to our set
-                        targetSelList.add(targetDPath, targetIt.currentItem())
-
-            # now calculate and assign weight value
-            newLength = targetDeformVId.length()
-            if lastLength < newLength:
-                weightTarget = 0
-                for i, area in enumerate(areaList):
-                    weightTarget += (area/totalArea)*weightList[i]
-
-                newWeights.append(weightTarget)
-                lastLength = newLength
-
-            targetIt.next()
-
-        # add to mfnSet
-        fnSet.addMembers(targetSelList)
-        PaintSelList = OpenMaya.MSelectionList()
-        fnSet.getMembers(PaintSelList, False)
-
-        # calculate weights
-        # get from selection list
-        components = OpenMaya.MObject()
-        targetNewWDPath = OpenMaya.MDagPath()
-        for i in range(PaintSelList.length()):
-            # check we have desired dagpath
-            PaintSelList.getDagPath(i, targetNewWDPath, components)
-            if targetNewWDPath.partialPathName() == targetDPath.partialPathName():
-                break
-        logger.debug(newWeights)
-        weightGeometryFilter.setWeight(targetNewWDPath, components, newWeights)
+        return transfer
 
 
     @staticmethod
@@ -1338,7 +1628,7 @@ class DeformerOp:
                 setattr(symVec, axis, -1)
                 break
 
-        print symVec.x, symVec.y, symVec.z
+        logger.debug('symmetry vector: %s, %s, %s', symVec.x, symVec.y, symVec.z)
 
         defMesh = cluster.getGeometry()[0]
 
@@ -1379,64 +1669,94 @@ class DeformerOp:
         return symCluster, symClsterTrn, symClstrShp
 
 
+def sampleCurve(curve, samples=None, space=OpenMaya2.MSpace.kWorld):
+    """
+    Sample a nurbs curve in a dense polyline
+    :param curve(str): curve transform or shape
+    :param samples(int): number of samples, None -> 20 per span, at least 100
+    :param space: OpenMaya2.MSpace
+    :return(ARSpatial.Polyline): polyline with points, params and tangents
+    """
+    mSel = OpenMaya2.MSelectionList()
+    mSel.add(str(curve))
+    curveMFn = OpenMaya2.MFnNurbsCurve(mSel.getDagPath(0))
+
+    minValue, maxValue = curveMFn.knotDomain
+    samples = samples or max(100, curveMFn.numSpans * 20)
+    params = np.linspace(minValue, maxValue, samples)
+    points = np.array([tuple(curveMFn.getPointAtParam(param, space))[:3] for param in params])
+    tangents = np.array([tuple(curveMFn.tangent(param, space)) for param in params])
+
+    return ARSpatial.Polyline(points, params, tangents)
+
+
+def getCurveData(curve, space=OpenMaya2.MSpace.kWorld):
+    """
+    Read the cvs, knots and degree of a nurbs curve, for ARNurbs
+    :param curve(str): curve transform or shape
+    :param space: OpenMaya2.MSpace
+    :return(np.array, np.array, int): (n, 3) cvs, maya knots, degree
+    """
+    curveMFn = OpenMaya2.MFnNurbsCurve(MeshOp.getDagPath2(curve))
+    cvs = np.array([list(cv)[:3] for cv in curveMFn.cvPositions(space)])
+
+    return cvs, np.array(curveMFn.knots()), curveMFn.degree
+
+
+def createJointChain(positions, rotations, names=None):
+    """
+    Create a joint hierarchy in one pass with OpenMaya 2 modifiers, each joint is child of the previous one.
+    Rotations are stored in the joint orient, like a makeIdentity of the rotation.
+    :param positions(np.array): (n, 3) world positions
+    :param rotations(np.array): (n, 3, 3) world rotations, rows are the x, y and z axis
+    :param names(list(str)): joint names, None -> maya default names
+    :return(list): pymel joints
+    """
+    translations, localRotations = ARNurbs.localTransforms(positions, rotations)
+
+    dagModifier = OpenMaya2.MDagModifier()
+    joints = []
+    for i in range(len(translations)):
+        joint = dagModifier.createNode('joint', joints[-1] if joints else OpenMaya2.MObject.kNullObj)
+        if names:
+            dagModifier.renameNode(joint, names[i])
+        joints.append(joint)
+    dagModifier.doIt()
+
+    dgModifier = OpenMaya2.MDGModifier()
+    for joint, translation, rotation in zip(joints, translations, localRotations):
+        fnJoint = OpenMaya2.MFnDependencyNode(joint)
+        for attr, value in zip(('translateX', 'translateY', 'translateZ'), translation):
+            dgModifier.newPlugValueDouble(fnJoint.findPlug(attr, False), float(value))
+
+        matrix = np.identity(4)
+        matrix[:3, :3] = rotation
+        orient = OpenMaya2.MTransformationMatrix(OpenMaya2.MMatrix(matrix.ravel().tolist())).rotation()
+        for attr, value in zip(('jointOrientX', 'jointOrientY', 'jointOrientZ'), (orient.x, orient.y, orient.z)):
+            dgModifier.newPlugValueMAngle(fnJoint.findPlug(attr, False), OpenMaya2.MAngle(value))
+    dgModifier.doIt()
+
+    return [pm.PyNode(OpenMaya2.MDagPath.getAPathTo(joint).fullPathName()) for joint in joints]
+
+
 def vertexIntoCurveCilinder(mesh, curve, distance, minParam=0, maxParam=1):
     """
-    Return a list of vertex index inside cilinder defined by a curve
+    Return the vertex indexes inside cilinder defined by a curve, and their distance to the curve.
+    The curve is sampled once, and all the vertices are classified at once, see ARSpatial.Polyline
     :param mesh(str): mesh shape
     :param curve(str): curve shape
     :param distance(float):
-    :return: List with vertex indexes
-    """
-    # use the API, Faster for this type of operations
-    mSelection = OpenMaya.MSelectionList()
-    mSelection.add(mesh)
-    mSelection.add(curve)
-
-    # MDagObject to query worldSpace deforms
-    # mesh
-    meshDagPath = OpenMaya.MDagPath()
-    mSelection.getDagPath(0, meshDagPath)
-    meshVertIt = OpenMaya.MItMeshVertex(meshDagPath)  # vertexIterator
-    # curve
-    curveDagPath = OpenMaya.MDagPath()
-    mSelection.getDagPath(1, curveDagPath)
-    curveMFn = OpenMaya.MFnNurbsCurve(curveDagPath)
-
+    :return(np.array, np.array): vertex indexes, distances
+    """
     # minParam MaxParam adjust to maxValue of the curve
     maxParam = cmds.getAttr('%s.maxValue' % curve)*maxParam
     minParam = cmds.getAttr('%s.maxValue' % curve)*minParam + cmds.getAttr('%s.minValue' % curve)
 
-    # mscriptUtil
-    util = OpenMaya.MScriptUtil()
-    vertexIndexes = []  # store vertex indexes
-    while not meshVertIt.isDone():
-        # store vertex position
-        vertexPosition = meshVertIt.position(OpenMaya.MSpace.kWorld)
-        # point on curve
-        ptr = util.asDoublePtr()
-        curveMFn.closestPoint(vertexPosition, ptr, 0.1, OpenMaya.MSpace.kWorld)  # review param (False, ptr)
-        param = util.getDouble(ptr)
-        # param control
-        param = max(minParam, min(maxParam, param))
-
-        # recalculate from param
-        pointCurve = OpenMaya.MPoint()
-        curveMFn.getPointAtParam(param, pointCurve)
-
-        # define vector
-        vertexVector = OpenMaya.MVector(vertexPosition-pointCurve)
-        # check distance from the curve
-        if vertexVector.length() < distance:
-            tangent = curveMFn.tangent(param, OpenMaya.MSpace.kWorld)  # get param tangent
-            # dot product
-            dotProduct = vertexVector*tangent
-            # let some precision interval
-            if not (dotProduct > 0.1 or dotProduct < -0.1):
-                vertexIndexes.append(meshVertIt.index())
-
-        meshVertIt.next()
-
-    return vertexIndexes
+    polyline = sampleCurve(curve)
+    # world points
+    points = MeshOp.getPoints(mesh, OpenMaya2.MSpace.kWorld)
+
+    return polyline.cylinderQuery(points, distance, minParam, maxParam)
 
 
 def transformDriveNurbObjectCV(nurbObject, follow=False):
@@ -1453,8 +1773,15 @@ def transformDriveNurbObjectCV(nurbObject, follow=False):
 
     baseName = ('%s_cv') % str(nurbObject.getTransform())
 
+    cvPoints = nurbObject.getCVs()
+    if isinstance(nurbObject, pm.nodetypes.NurbsCurve) and follow:
+        # parallel transport frames at the closest point of each cv, they do not flip on straight segments
+        sampler = ARNurbs.CurveSampler(*getCurveData(nurbObject))
+        cvs = np.array([list(point) for point in cvPoints])[:, :3]
+        positions, tangents, normals, biNormals = sampler.frames(sampler.closestParams(cvs))
+
     transforms = []
-    for n, point in enumerate(nurbObject.getCVs()):
+    for n, point in enumerate(cvPoints):
         transform = pm.group(empty=True, name='%s%s_grp' % (baseName, n))
         transform.setTranslation(point)
         decomposeMatrix = pm.createNode('decomposeMatrix')
@@ -1462,24 +1789,10 @@ def transformDriveNurbObjectCV(nurbObject, follow=False):
         decomposeMatrix.outputTranslate.connect(nurbObject.controlPoints[n])
 
         if isinstance(nurbObject, pm.nodetypes.NurbsCurve) and follow:
-            closest = nurbObject.closestPoint(transform.getTranslation("world"), tolerance=0.1, space="world")
-            param = nurbObject.getParamAtPoint(closest, "world")
-
-            tangent = nurbObject.tangent(min(max(nurbObject.minValue.get()+0.0001, param),nurbObject.maxValue.get()-0.0001))
-            tangent.normalize()
-            normal = nurbObject.normal(min(max(nurbObject.minValue.get()+0.0001, param),nurbObject.maxValue.get()-0.0001))
-            normal.normalize()
-            biNormal = tangent ^ normal
-            biNormal.normalize()
-
             translation = transform.getTranslation("world")
-            matrix = pm.datatypes.Matrix([tangent.x,tangent.y, tangent.z, 0],
-                                         [biNormal.x, biNormal.y, biNormal.z, 0],
-                                         [normal.x, normal.y, normal.z, 0],
+            matrix = pm.datatypes.Matrix(list(tangents[n]) + [0], list(biNormals[n]) + [0], list(normals[n]) + [0],
                                          [translation.x, translation.y, translation.z, 1])
 
-            print "param"
-
             transform.setMatrix(matrix)
 
         transforms.append(transform)
@@ -1492,7 +1805,7 @@ def jointChain(length=None, joints=10, curve=None):
     create a joint chain
     :param distance(float): length of the chain, if curve arg is given, this param can be None
     :param joints(int): number of joints
-    :param curve(str or pm): if curve, adapt joints to curve
+    :param curve(str or pm): if curve, adapt joints to curve, evenly spaced along its length
     :return: joint list
     """
     # to avoid errors clear selection
@@ -1508,73 +1821,11 @@ def jointChain(length=None, joints=10, curve=None):
         if isinstance(curve, pm.nodetypes.Transform):
             curve = curve.getShape()
 
-        # dup the curve and rebuilt it, smoother results
-        curveDup = curve.duplicate()[0]
-        curveDup = curveDup.getShape()
-        pm.rebuildCurve(curveDup, ch=False, rpo=True, rt=False, end=True, kr=False, kep=True,
-                        kt=False, s=curveDup.numCVs(), d=2, tol=0.01)
-
-        # get max param value of the curve
-        maxValue = curveDup.maxValue.get()
-        incrValue = maxValue/(joints-1)  # distance increment per joint
-        for i in range(joints+1):
-            # create joint
-            if i < joints:
-                pm.select(cl=True)
-                joint = pm.createNode('joint')
-                joint.setTranslation(curveDup.getPointAtParam(incrValue * i, 'world'), 'world')
-                pm.select(cl=True)
-            if jointsList:
-                # first construct matrix
-                if i < joints:
-                    vectorX = pm.datatypes.Vector(joint.getTranslation('world') - jointsList[-1].getTranslation('world'))
-                    vectorX.normalize()
-                else:
-                    vectorX = curveDup.tangent(incrValue*(i-1), 'world')
-
-                # if the curve do not has curvature, normal method will give us an error
-                try:
-                    vectorY = curveDup.normal(incrValue*(i-1), 'world')
-                except:
-                    # if it is the case, construct a basic vector
-                    vectorY = pm.datatypes.Vector([0,1,0])
-                    # while dot != 0 the vector isn't perpendicular
-                    if vectorX * vectorY != 0:
-                        # so we force a zero dot. dot formula: v1.x*v2.x + v1.y*v2.y + v1.z*v2.z
-                        logger.debug('vectorY no perpendicular '+str(vectorY))
-                        vectorY.z = - (vectorX.y*vectorY.y / vectorX.z)
-
-                    # normalize vector
-                    vectorY.normalize()
-
-                vectorZ = vectorX ^ vectorY  # cross product
-                vectorZ.normalize()
-                # recalculate Y
-                vectorY =vectorZ ^ vectorX
-                vectorY.normalize()
-
-                # get position
-                position = curveDup.getPointAtParam(incrValue*(i-1), space='world')
-
-                # apply matrix
-                pm.xform(jointsList[-1], ws=True, m=[vectorX.x, vectorX.y, vectorX.z, 0,
-                                            vectorY.x, vectorY.y, vectorY.z, 0,
-                                            vectorZ.x, vectorZ.y, vectorZ.z, 0,
-                                            position.x, position.y, position.z, 1])
-
-                # freeze rotation
-                pm.makeIdentity(jointsList[-1], apply=True, t=False, r=True, s=False, n=False, pn=False)
-
-            # append new joint
-            if i < joints:
-                jointsList.append(joint)
-
-        # construct hierarchy
-        for i in range(joints-1):
-            jointsList[i].addChild(jointsList[i+1])
-
-        # delete duplicated curve
-        pm.delete(curveDup.getTransform())
+        # joints at even arc length steps, oriented with parallel transport frames, x aims to the next joint
+        sampler = ARNurbs.CurveSampler(*getCurveData(curve))
+        positions, tangents, normals, binormals = sampler.evenFrames(joints)
+        rotations = ARNurbs.aimFrames(positions, tangents[-1], normals)
+        jointsList = createJointChain(positions, rotations)
 
     # if not curve arg
     elif length:
@@ -1699,113 +1950,142 @@ class MeshOp():
     Class with static methods to manipulate mesh
     """
     @staticmethod
-    def barycentricSym(mesh, axis='x'):
+    def getTopology(mesh):
         """
-        Return a list with the vertex and their weight with symetrize vertex.
-        all in object space
-        [Vid,[Vid, W], [Vid, W] ... ]
-        :param mesh(str):
-        :return:
+        Get the mesh topology as numpy arrays
+        :param mesh(str or OpenMaya.MDagPath): mesh transform or shape
+        :return(np.array, np.array, int): polygon vertex counts, polygon vertex connects, number of vertices
         """
-        # get selection list
-        mSel = OpenMaya.MSelectionList()
-        mSel.add(str(mesh))
+        if isinstance(mesh, OpenMaya.MDagPath):
+            mDagPath = mesh
+        else:
+            mSel = OpenMaya.MSelectionList()
+            mSel.add(str(mesh))
+            mDagPath = OpenMaya.MDagPath()
+            mSel.getDagPath(0, mDagPath)
+
+        mFnMesh = OpenMaya.MFnMesh(mDagPath)
+        counts = OpenMaya.MIntArray()
+        connects = OpenMaya.MIntArray()
+        mFnMesh.getVertices(counts, connects)
+
+        return APIHelp.mArrayToNumpy(counts), APIHelp.mArrayToNumpy(connects), mFnMesh.numVertices()
 
-        # get depend node
-        mDagPath = OpenMaya.MDagPath()
-        mSel.getDagPath(0, mDagPath)
 
-        if mDagPath.apiType() == OpenMaya.MFn.kTransform:
-            # if we get the transform, descent to the shape
+    @staticmethod
+    def getDagPath2(mesh):
+        """
+        Get the OpenMaya 2 dag path of the mesh shape
+        :param mesh(str): mesh transform or shape
+        :return(OpenMaya2.MDagPath):
+        """
+        mSel = OpenMaya2.MSelectionList()
+        mSel.add(str(mesh))
+        mDagPath = mSel.getDagPath(0)
+        if mDagPath.apiType() == OpenMaya2.MFn.kTransform:
             mDagPath.extendToShape()
-        meshObj = mDagPath.node()
 
-        # mfnMesh
-        mFnMesh = OpenMaya.MFnMesh(mDagPath)
-        vertexCount = mFnMesh.numVertices()
-        #itterator
-        mItMesh = OpenMaya.MItMeshVertex(mDagPath)
-
-        # get all points
-        vPoints = OpenMaya.MFloatPointArray()
-        mFnMesh.getPoints(vPoints)
-
-        # build mesh intersection
-        meshPt = OpenMaya.MPointOnMesh()
-        meshIntersector = OpenMaya.MMeshIntersector()
-        meshIntersector.create(meshObj, OpenMaya.MMatrix.identity)
-
-        # to save info
-        # change to python types
-        arrayWeights = OpenMaya.MPointArray(vertexCount)  # groups of 3
-        arrayIndex = OpenMaya.MIntArray(vertexCount*3)  # every 3 is a new vertex
-        #arrayWeights=[]
-        #arrayIndex=[]
-        # getPolygonTriangleVertices(polygonId, triangleId, vertexList[3](mintArray))
-        # return (u >= 0) && (v >= 0) && (u + v < 1) point in the try
-
-        # the fastest way to iterate over a mesh
-        #it = 0
-        while not mItMesh.isDone():
-            vertID = mItMesh.index()
-            vertInvPos = mItMesh.position()
-            # inverVert.x to find the respective vertex
-            setattr(vertInvPos, axis, - getattr(vertInvPos, axis))
-
-            # use intersection to get closest info
-            meshIntersector.getClosestPoint(vertInvPos, meshPt, 0.1)
-            # get closes point
-            closestPoint = meshPt.getPoint()
-            faceID = meshPt.faceIndex()
-            triID = meshPt.triangleIndex()
-
-            # get vertex of the triangle
-            # util
-            # seems declaring here the util with an intarray of 3 elments works better
-            util = OpenMaya.MScriptUtil(OpenMaya.MIntArray(3))  # storage for 3 elements
-            ptr = util.asIntPtr()
-            mFnMesh.getPolygonTriangleVertices(faceID, triID, ptr)
-            # get ptr info
-            vID = [util.getIntArrayItem(ptr, i) for i in range(3)]
-            uvL = []
-
-            # get all barycentrics
-            for i in range(3):
-                uvL.append(VectorMath.barycentricCoords(vPoints[vID[(i+1) % 3]] - vPoints[vID[i]],
-                                            vPoints[vID[(i + 2) % 3]] - vPoints[vID[i]],
-                                            closestPoint - vPoints[vID[i]]))
+        return mDagPath
 
-            # save here the total area
-            totalWeight = 0.0
-            weightsList = []
-            for i in range(3):
-                # ub(c-b)+(b-a)"vB" - vA  // vc(b-c) + (v-a)"vC" - vA
-                vA = OpenMaya.MVector(closestPoint - vPoints[vID[i]])  # vector for reference
-                vB = (vPoints[vID[(i+2) % 3]] - (vPoints[vID[(i+1) % 3]])) * uvL[(i+1) % 3][0] + (vPoints[vID[(i+1)%3]] - vPoints[vID[i]])
-                vB = OpenMaya.MVector(vB) - vA
-                vC = (vPoints[vID[(i+1) % 3]] - (vPoints[vID[(i+2) % 3]])) * uvL[(i+2) % 3][1] + (vPoints[vID[(i+2)%3]] - vPoints[vID[i]])
-                vC = OpenMaya.MVector(vC) - vA
-
-                weight = (vB ^ vC).length()/2
-                totalWeight += weight
-                weightsList.append(weight)
-
-            # normalize weights
-            for i in range(3):
-                weightsList[i] = weightsList[i] / totalWeight
 
-            # save data
-            # vertex IDs
-            for i in range(3):
-                arrayIndex[vertID*3+i] = vID[i]
-                #arrayIndex.append(vID[i])
+    @staticmethod
+    def getRestDagPath(mesh):
+        """
+        Get the OpenMaya 2 dag path of the shape with the rest points: the intermediate original shape
+        if the mesh is deformed, else the mesh shape
+        :param mesh(str): mesh transform or shape
+        :return(OpenMaya2.MDagPath):
+        """
+        mDagPath = MeshOp.getDagPath2(mesh)
+        # p.e: [u'bodyShapeOrig.worldMesh'], [u''] without deformers
+        originalGeometry = cmds.deformableShape(mDagPath.fullPathName(), originalGeometry=True)
+        if originalGeometry and originalGeometry[0]:
+            return MeshOp.getDagPath2(originalGeometry[0].split('.')[0])
 
-            arrayWeights.set(OpenMaya.MPoint(weightsList[0], weightsList[1], weightsList[2]), vertID)
-            #arrayWeights.append([weightsList[0], weightsList[1], weightsList[2]])
+        return mDagPath
 
-            mItMesh.next()
 
-        return arrayWeights, arrayIndex
+    @staticmethod
+    def getPoints(mesh, space=OpenMaya2.MSpace.kObject):
+        """
+        Get the mesh points as a numpy array
+        :param mesh(str, OpenMaya2.MDagPath or OpenMaya2.MObject): mesh transform, shape or mesh data
+        :param space: OpenMaya2.MSpace
+        :return(np.array): (n, 3) points
+        """
+        if not isinstance(mesh, (OpenMaya2.MDagPath, OpenMaya2.MObject)):
+            mesh = MeshOp.getDagPath2(mesh)
+        points = OpenMaya2.MFnMesh(mesh).getPoints(space)
+
+        return np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+
+
+    @staticmethod
+    def getWorldMeshData(mesh, frame=None):
+        """
+        Get the world mesh data of the shape, evaluated at frame without changing the current time
+        :param mesh(str or OpenMaya2.MDagPath): mesh transform or shape
+        :param frame(float): None -> current time
+        :return(OpenMaya2.MObject): kMeshData, its points are in world space
+        """
+        mDagPath = mesh if isinstance(mesh, OpenMaya2.MDagPath) else MeshOp.getDagPath2(mesh)
+        fnNode = OpenMaya2.MFnDependencyNode(mDagPath.node())
+        plug = fnNode.findPlug('worldMesh', False).elementByLogicalIndex(mDagPath.instanceNumber())
+
+        if frame is None:
+            return plug.asMObject()
+
+        context = OpenMaya2.MDGContext(OpenMaya2.MTime(frame, OpenMaya2.MTime.uiUnit()))
+        return plug.asMObject(context)
+
+
+    @staticmethod
+    def getAdjacency(mesh):
+        """
+        Get the vertex adjacency of the mesh, cached by topology, see ARTopology.getAdjacency
+        :param mesh(str or OpenMaya.MDagPath): mesh transform or shape
+        :return(ARTopology.VertexAdjacency):
+        """
+        counts, connects, numVertices = MeshOp.getTopology(mesh)
+        return ARTopology.getAdjacency(counts, connects, numVertices)
+
+
+    @staticmethod
+    def barycentricSym(mesh, axis='x', useCache=True):
+        """
+        Return, for each vertex, the vertices of the triangle at its mirrored position and their barycentric weights.
+        all in object space, over the rest points of the mesh, so the pose does not change the map.
+        Maps are cached by topology and rest points, on disk in a symmetryCache folder next to the scene
+        if the scene is saved, so mirror clusters, wires and blendShapes of the same mesh reuse them.
+        :param mesh(str):
+        :param axis(str): x, y or z
+        :param useCache(bool): if False, the map is always calculated
+        :return(np.array, np.array): symWeights (n, 3), symID (n, 3)
+        """
+        mDagPath = MeshOp.getRestDagPath(mesh)
+        points = MeshOp.getPoints(mDagPath)
+        counts, connects, numVertices = MeshOp.getTopology(mDagPath.fullPathName())
+
+        key = ARSymmetry.symmetryKey(counts, connects, points, axis)
+        sceneName = cmds.file(q=True, sceneName=True)
+        cacheDir = os.path.join(os.path.dirname(sceneName), 'symmetryCache') if sceneName else None
+
+        cached = ARSymmetry.getCached(key, cacheDir) if useCache else None
+        if cached:
+            symID, symWeights = cached
+            return symWeights, symID
+
+        triangleVertices = OpenMaya2.MFnMesh(mDagPath).getTriangles()[1]
+        triangles = np.array(triangleVertices, dtype=np.int64).reshape(-1, 3)
+
+        # closest point to every mirrored vertex in one batch
+        bvh = ARSpatial.TriangleBVH(points, triangles)
+        closestPoints, closestTriangles = bvh.closestPoints(ARSymmetry.mirrorPoints(points, axis))[:2]
+        symID, symWeights = ARSymmetry.buildSymmetryMap(points, triangles, closestPoints, closestTriangles)
+        if useCache:
+            ARSymmetry.setCached(key, symID, symWeights, cacheDir)
+
+        return symWeights, symID
 
 
 ########################
@@ -2014,51 +2294,29 @@ class DGUtils:
 
 
     @staticmethod
-    def treeTracker(start, nodeType, inputs=True, maxNodes=0):
+    def treeTracker(start, nodeType, inputs=True, maxNodes=0, maxDepth=0, order='depth', snapshot=None):
         """
          Track since the start node all input graph or output graph, and return the
          desired nodetypes.
          :param start (str or pm):
-         :param nodeType (str):
+         :param nodeType (str, int or list): node type names or OpenMaya 2 MFn api types
          :param inputs (bool): true inputs, false outputs
          :param maxNodes: maximum of found nodes, 0 equal to no maximum
-        """
-        if isinstance(start, str):
-            start = pm.PyNode(start)
-        output = []  # store here the results
-        checkedNodes = set()
-
-        def treeTracker_Recursive(start, nodeType):
-            """
-             recursive func to run over the graph
-            """
-            # track the plug, if not, it can give us erratic results
-            if inputs:
-                connectedPlugs = start.inputs(p=True)
+         :param maxDepth (int): maximum of connections from the start node, 0 equal to no maximum
+         :param order (str): depth or breadth, breadth returns the closest nodes first
+         :param snapshot (ARGraph.GraphSnapshot): share the graph connections between several queries
+         :return (list): pymel nodes
+        """
+        typeFilter = nodeType if isinstance(nodeType, (list, tuple)) else [nodeType]
+        found = ARGraph.walk(start, inputs, typeFilter, maxDepth, maxNodes, order, snapshot)
+
+        # only the results are wrapped with pymel
+        output = []
+        for node in found:
+            if node.hasFn(OpenMaya2.MFn.kDagNode):
+                output.append(pm.PyNode(OpenMaya2.MDagPath.getAPathTo(node).fullPathName()))
             else:
-                connectedPlugs = start.outputs(p=True)
-
-            # transform all connectedInputs in connected nodes, and try to avoid duplicated nodes
-            # with set() delete duplicated nodes from the list
-            connectedNodes = set([plug.node() for plug in connectedPlugs])
-            connectedNodes.difference_update(checkedNodes)
-            checkedNodes.update(connectedNodes)
-
-            # iterate over the found nodes
-            for node in connectedNodes:
-                if maxNodes == 0 or maxNodes > len(output):
-                    # if the node is od the node type, save it
-                    if node.type() == nodeType:
-                        output.append(node)
-
-                    if maxNodes != 0 and maxNodes <= len(output):
-                        break
-                    else:
-                        # check the inputs or outputs of the node
-                        treeTracker_Recursive(node, nodeType)
-
-        # start recursive process
-        treeTracker_Recursive(start, nodeType)
+                output.append(pm.PyNode(OpenMaya2.MFnDependencyNode(node).absoluteName()))
 
         return output
 
@@ -2283,7 +2541,7 @@ class VectorMath_Nodes():
             if isinstance(argVal[i], str):
                 argVal[i] = pm.PyNode(argVal[i])
             if not (argVal[i].type() == 'double3' or argVal[i].type() == 'float3'):
-                logger.info('%s must be type double3 or float3' % argVal[i])
+                logger.info('%s must be type double3 or float3', argVal[i])
                 return
             # add to dictionary
             vectorList[argStr] = argVal[i]
@@ -2589,7 +2847,7 @@ class VectorMath_Nodes():
         for i in range(len(values)):
             if isinstance(values[i], str):
                 values[i] = pm.PyNode(values[i])
-                print values[i], type(values[i])
+                logger.debug('plusMinusAverage input: %s', values[i])
 
         # create node
         plusMinus = pm.createNode("plusMinusAverage")
@@ -2856,21 +3114,20 @@ class VectorMath():
         # proj vector onto normal
         projVec = VectorMath.projectVector(vector, normal)
 
-        print "Vectors"
-        print type(vector - projVec)
-
         return pm.datatypes.Vector(vector - projVec)
 
 
     @staticmethod
-    def reflectedMatrix(matrix, flip=False, refMatrix=pm.datatypes.Matrix([-1,0,0,0],[0,1,0,0],[0,0,1,0],[0,0,0,1])):
+    def reflectedMatrix(matrix, flip=False, refMatrix=None):
         """
         Return a reflected matrix. If flip is false, with no degative scales
         :param matrix:
-        :param refMatrix:
+        :param refMatrix: if None, mirror x axis
         :return:
         """
         # check types
+        if refMatrix is None:
+            refMatrix = pm.datatypes.Matrix([-1,0,0,0],[0,1,0,0],[0,0,1,0],[0,0,0,1])
         matrix = checkMatrixType(matrix)
         refMatrix = checkMatrixType(refMatrix)
 
@@ -2890,16 +3147,18 @@ class VectorMath():
 
 
     @ staticmethod
-    def reflectedVectorByMatrix(vector, matrix=pm.datatypes.Matrix([-1,0,0,0],[0,1,0,0],[0,0,1,0],[0,0,0,1])):
+    def reflectedVectorByMatrix(vector, matrix=None):
         """
         Return a Vector reflected by a reflection matrix
         default mirro x axis
         :param vector:
-        :param matrix:
+        :param matrix: if None, mirror x axis
         :return:
         """
         # check data type
         # vector
+        if matrix is None:
+            matrix = pm.datatypes.Matrix([-1,0,0,0],[0,1,0,0],[0,0,1,0],[0,0,0,1])
         vector = checkVectorType(vector)
         matrix = checkMatrixType(matrix)
 
@@ -0,0 +1,485 @@
+"""
+Controller library cache and storage backends.
+Controller libraries (<name>_controllers.json or <name>_controllers.bin) are read once, and each
+controller type is kept as packed numpy arrays. Entries are keyed by file path and invalidated
+when the file mtime or size change.
+Headless, ctrSaveLoadToJson builds the curves from this data.
+
+Binary format:
+    header: magic (8 bytes), index offset (uint64), index length (uint64)
+    data: packed blocks, 8 bytes aligned
+    index: utf-8 json, {typeController: {field: [offset, dtype, shape]}}
+The file is memory mapped, a lookup only reads the blocks of the requested type.
+
+Journal:
+    <library>.journal keeps the changes saved after the last full write, one json record per line.
+    Readers apply it over the library. compact writes a new library and removes the journal.
+"""
+import os
+import mmap
+import json
+import struct
+import numpy as np
+
+import logging
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARCtrLibrary', logging.INFO)
+
+# path -> (file version, {typeController: ControllerData})
+_LIBRARY_CACHE = {}
+_STATS = {'hits': 0, 'misses': 0}
+
+
+class ControllerData(object):
+    """
+    Packed data of a controller type, all its shapes in contiguous arrays.
+    json format: [[[[cv],[knots], degree, form], [[cv],[knots], degree, form]], [matrixTransform]]
+    """
+    def __init__(self, cvs, cvOffsets, knots, knotOffsets, degrees, forms, matrix):
+        """
+        :param cvs(np.array): (n, 3) float64, cvs of all the shapes
+        :param cvOffsets(np.array): (shapes + 1) int, cvs of shape i are cvs[cvOffsets[i]:cvOffsets[i+1]]
+        :param knots(np.array): float64, knots of all the shapes
+        :param knotOffsets(np.array): (shapes + 1) int
+        :param degrees(np.array): (shapes) int
+        :param forms(np.array): (shapes) int
+        :param matrix(np.array): (16) float64 transform matrix
+        """
+        self.cvs = cvs
+        self.cvOffsets = cvOffsets
+        self.knots = knots
+        self.knotOffsets = knotOffsets
+        self.degrees = degrees
+        self.forms = forms
+        self.matrix = matrix
+
+    @classmethod
+    def fromJson(cls, value):
+        """
+        :param value(list): controller entry of the json library
+        :return(ControllerData):
+        """
+        shapes, matrix = value
+        cvs = [np.asarray(shape[0], dtype=np.float64).reshape(-1, 3) for shape in shapes]
+        knots = [np.asarray(shape[1], dtype=np.float64) for shape in shapes]
+
+        return cls(np.concatenate(cvs) if cvs else np.zeros((0, 3)),
+                   np.concatenate(([0], np.cumsum([len(cv) for cv in cvs]))).astype(np.int64),
+                   np.concatenate(knots) if knots else np.zeros(0),
+                   np.concatenate(([0], np.cumsum([len(knot) for knot in knots]))).astype(np.int64),
+                   np.array([shape[2] for shape in shapes], dtype=np.int64),
+                   np.array([shape[3] for shape in shapes], dtype=np.int64),
+                   np.asarray(matrix, dtype=np.float64))
+
+    def toJson(self):
+        """
+        :return(list): controller entry in the json library format
+        """
+        shapes = [[cvs.tolist(), knots.tolist(), int(degree), int(form)]
+                  for cvs, knots, degree, form in self.shapes()]
+
+        return [shapes, self.matrix.tolist()]
+
+    def __len__(self):
+        return len(self.degrees)
+
+    def shapes(self):
+        """
+        :return(list): (cvs, knots, degree, form) of each shape
+        """
+        return [(self.cvs[self.cvOffsets[i]:self.cvOffsets[i + 1]],
+                 self.knots[self.knotOffsets[i]:self.knotOffsets[i + 1]],
+                 self.degrees[i], self.forms[i]) for i in range(len(self))]
+
+
+def readJsonLibrary(path):
+    """
+    Parse a json controller library
+    :param path(str): file path
+    :return(dict): {typeController: ControllerData}
+    """
+    with open(path, 'r') as f:
+        controllerDict = json.load(f)
+
+    return dict((key, ControllerData.fromJson(value)) for key, value in controllerDict.items())
+
+
+BINARY_MAGIC = b'ARCTL001'
+_HEADER = struct.Struct('<8sQQ')
+# ControllerData fields stored in the binary blocks
+_BINARY_FIELDS = ('cvs', 'cvOffsets', 'knots', 'knotOffsets', 'degrees', 'forms', 'matrix')
+_BINARY_TYPES = {'cvs': '<f8', 'cvOffsets': '<i8', 'knots': '<f8', 'knotOffsets': '<i8',
+                 'degrees': '<i4', 'forms': '<i4', 'matrix': '<f8'}
+
+
+class BinaryLibrary(object):
+    """
+    Read only view of a binary controller library.
+    Only the index is parsed when it is opened, controller types are read on demand from the mapped file.
+    """
+    def __init__(self, path):
+        """
+        :param path(str): binary library path
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, indexOffset, indexLength = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != BINARY_MAGIC:
+                raise ValueError('%s is not a binary controller library' % path)
+            f.seek(indexOffset)
+            self._index = json.loads(f.read(indexLength).decode('utf-8'))
+
+        self._file = None
+        self._map = None
+        # typeController -> ControllerData, already read types
+        self._loaded = {}
+
+    def _mapFile(self):
+        if self._map is None:
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._map
+
+    def close(self):
+        """
+        Release the mapped file
+        """
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = None
+        self._file = None
+
+    def keys(self):
+        return list(self._index.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, typeController):
+        return typeController in self._index
+
+    def __getitem__(self, typeController):
+        if typeController in self._loaded:
+            return self._loaded[typeController]
+
+        fileMap = self._mapFile()
+        arrays = {}
+        for field in _BINARY_FIELDS:
+            offset, dtype, shape = self._index[typeController][field]
+            count = int(np.prod(shape))
+            # copy, arrays must survive the mapped file
+            arrays[field] = np.frombuffer(fileMap, dtype=dtype, count=count, offset=offset).reshape(shape).copy()
+
+        self._loaded[typeController] = ControllerData(**arrays)
+        return self._loaded[typeController]
+
+
+def writeBinaryLibrary(path, library):
+    """
+    Write a binary controller library
+    :param path(str): file path
+    :param library(dict): {typeController: ControllerData or json entry}
+    """
+    index = {}
+    blocks = []
+    offset = _HEADER.size
+    for typeController in sorted(library.keys()):
+        data = library[typeController]
+        data = data if isinstance(data, ControllerData) else ControllerData.fromJson(data)
+        index[typeController] = {}
+        for field in _BINARY_FIELDS:
+            array = np.ascontiguousarray(getattr(data, field), dtype=_BINARY_TYPES[field])
+            block = array.tobytes()
+            # 8 bytes alignment
+            block += b'\0' * (-len(block) % 8)
+            index[typeController][field] = [offset, _BINARY_TYPES[field], list(array.shape)]
+            blocks.append(block)
+            offset += len(block)
+
+    indexBytes = json.dumps(index, sort_keys=True).encode('utf-8')
+    def writeFunc(f):
+        f.write(_HEADER.pack(BINARY_MAGIC, offset, len(indexBytes)))
+        for block in blocks:
+            f.write(block)
+        f.write(indexBytes)
+
+    atomicWrite(path, writeFunc, 'wb')
+
+
+def isBinaryLibrary(path):
+    """
+    :param path(str): file path
+    :return(bool): True if the file is a binary controller library
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def readLibrary(path):
+    """
+    Read a controller library of any backend, with its journal changes
+    :param path(str): file path
+    :return(dict, BinaryLibrary or JournaledLibrary): {typeController: ControllerData}
+    """
+    library = BinaryLibrary(path) if isBinaryLibrary(path) else readJsonLibrary(path)
+
+    records = readJournal(path)
+    if records:
+        library = JournaledLibrary(library, records)
+
+    return library
+
+
+#############
+## Journal ##
+#############
+def atomicWrite(path, writeFunc, mode='w'):
+    """
+    Write a file through a temp file in the same folder, and replace the original when it is complete.
+    If the process dies while writing, the original file is intact.
+    :param path(str): file path
+    :param writeFunc(func): function that receives the open temp file
+    :param mode(str): open mode, w or wb
+    """
+    tempPath = '%s.tmp' % path
+    with open(tempPath, mode) as f:
+        writeFunc(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    replaceFunc = getattr(os, 'replace', None)
+    if replaceFunc:
+        replaceFunc(tempPath, path)
+    elif os.name == 'nt' and os.path.exists(path):
+        # python 2 on windows can not rename over an existing file
+        os.remove(path)
+        os.rename(tempPath, path)
+    else:
+        os.rename(tempPath, path)
+
+
+def journalPath(path):
+    """
+    :param path(str): library path
+    :return(str): journal path of the library
+    """
+    return '%s.journal' % path
+
+
+def appendJournal(path, records):
+    """
+    Append change records to the library journal, one json line each.
+    :param path(str): library path
+    :param records(list): (typeController, value) value is a json entry, None for a removed controller
+    """
+    lines = [json.dumps({'key': key, 'value': value}) + '\n' for key, value in records]
+    journal = journalPath(path)
+    _truncateIncompleteRecord(journal)
+    with open(journal, 'a') as f:
+        f.write(''.join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _truncateIncompleteRecord(journal):
+    """
+    Remove a last record not completely written, so new records start in a new line
+    :param journal(str): journal path
+    """
+    if not os.path.exists(journal) or not os.path.getsize(journal):
+        return
+
+    with open(journal, 'rb+') as f:
+        # only the end of the file is read, appends do not depend on the journal size
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b'\n':
+            return
+
+        # incomplete record, look back for the end of the previous one
+        end = f.tell()
+        position = end
+        blockSize = 4096
+        while position > 0:
+            start = max(0, position - blockSize)
+            f.seek(start)
+            block = f.read(position - start)
+            index = block.rfind(b'\n')
+            if index != -1:
+                f.truncate(start + index + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+def readJournal(path):
+    """
+    Read the journal records of a library.
+    A last line without end is a record not completely written, and it is ignored.
+    :param path(str): library path
+    :return(list): (typeController, value)
+    """
+    journal = journalPath(path)
+    if not os.path.exists(journal):
+        return []
+
+    records = []
+    with open(journal, 'r') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                logger.info('readJournal: incomplete record ignored in %s', journal)
+                break
+            record = json.loads(line)
+            records.append((record['key'], record['value']))
+
+    return records
+
+
+def removeJournal(path):
+    """
+    :param path(str): library path
+    """
+    journal = journalPath(path)
+    if os.path.exists(journal):
+        os.remove(journal)
+
+
+class JournaledLibrary(object):
+    """
+    Library with the journal records applied over it
+    """
+    def __init__(self, library, records):
+        """
+        :param library(dict or BinaryLibrary): base library
+        :param records(list): (typeController, value) journal records, in order
+        """
+        self._library = library
+        self._changes = {}  # typeController -> ControllerData, None if removed
+        for key, value in records:
+            self._changes[key] = None if value is None else ControllerData.fromJson(value)
+
+    def close(self):
+        if isinstance(self._library, BinaryLibrary):
+            self._library.close()
+
+    def keys(self):
+        keys = set(self._library.keys())
+        for key, value in self._changes.items():
+            if value is None:
+                keys.discard(key)
+            else:
+                keys.add(key)
+        return list(keys)
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, typeController):
+        if typeController in self._changes:
+            return self._changes[typeController] is not None
+        return typeController in self._library
+
+    def __getitem__(self, typeController):
+        if typeController in self._changes:
+            if self._changes[typeController] is None:
+                raise KeyError(typeController)
+            return self._changes[typeController]
+        return self._library[typeController]
+
+
+def _fileVersion(path):
+    """
+    :return(tuple): mtime and size of the library and its journal
+    """
+    fileStat = os.stat(path)
+    journal = journalPath(path)
+    journalStat = os.stat(journal) if os.path.exists(journal) else None
+
+    return (fileStat.st_mtime, fileStat.st_size,
+            journalStat.st_mtime if journalStat else None, journalStat.st_size if journalStat else None)
+
+
+def jsonToBinary(jsonPath, binaryPath):
+    """
+    Convert a json library to the binary format, lossless
+    """
+    writeBinaryLibrary(binaryPath, readLibrary(jsonPath))
+
+
+def binaryToJson(binaryPath, jsonPath):
+    """
+    Export a binary library to json, for review and diffs
+    """
+    library = readLibrary(binaryPath)
+    try:
+        controllerDict = dict((key, data.toJson()) for key, data in library.items())
+    finally:
+        library.close()
+
+    atomicWrite(jsonPath, lambda f: json.dump(controllerDict, f, indent=4, sort_keys=True))
+
+
+def getLibrary(path):
+    """
+    Return the parsed library, parse the file only if it is not cached or it has changed
+    :param path(str): file path
+    :return(dict, BinaryLibrary or JournaledLibrary): {typeController: ControllerData}
+    """
+    path = os.path.normpath(path)
+    version = _fileVersion(path)
+    cached = _LIBRARY_CACHE.get(path)
+    if cached and cached[0] == version:
+        _STATS['hits'] += 1
+        return cached[1]
+
+    _STATS['misses'] += 1
+    logger.debug('getLibrary: read %s', path)
+    invalidate(path)
+    library = readLibrary(path)
+    _LIBRARY_CACHE[path] = (version, library)
+
+    return library
+
+
+def getController(path, typeController):
+    """
+    :param path(str): library file path
+    :param typeController(str): controller type
+    :return(ControllerData):
+    """
+    return getLibrary(path)[typeController]
+
+
+def invalidate(path=None):
+    """
+    Remove a library from the cache, or all if path is None
+    :param path(str): library file path
+    """
+    paths = list(_LIBRARY_CACHE.keys()) if path is None else [os.path.normpath(path)]
+    for cachePath in paths:
+        cached = _LIBRARY_CACHE.pop(cachePath, None)
+        # release mapped files
+        if cached and isinstance(cached[1], (BinaryLibrary, JournaledLibrary)):
+            cached[1].close()
+
+
+def cacheStats():
+    """
+    :return(dict): hits, misses and cached libraries
+    """
+    stats = dict(_STATS)
+    stats['libraries'] = len(_LIBRARY_CACHE)
+
+    return stats
+
+
+def resetStats():
+    _STATS['hits'] = 0
+    _STATS['misses'] = 0
@@ -0,0 +1,178 @@
+"""
+Dependency graph traversal with OpenMaya 2.
+Iterative walk over the connections of a node, with an explicit stack or queue of MObjects,
+so deep rigs do not reach the python recursion limit and no pymel object is built on the way.
+A GraphSnapshot keeps the connections of the visited nodes, so repeated walks of one build share the work.
+It listens the connection and node removed messages of the scene and forgets the changed nodes.
+
+p.e: ARGraph.walk(node, typeFilter=[OpenMaya.MFn.kSkinClusterFilter], maxNodes=1)
+"""
+from collections import deque
+import maya.api.OpenMaya as OpenMaya
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARGraph')
+
+
+def getMObject(node):
+    """
+    :param node(str, pm or OpenMaya.MObject):
+    :return(OpenMaya.MObject):
+    """
+    if isinstance(node, OpenMaya.MObject):
+        return node
+    mSel = OpenMaya.MSelectionList()
+    mSel.add(str(node))
+
+    return mSel.getDependNode(0)
+
+
+def connectedNodes(mObject, inputs=True):
+    """
+    Nodes connected to the plugs of a node
+    :param mObject(OpenMaya.MObject):
+    :param inputs(bool): True source nodes, False destination nodes
+    :return(list(OpenMaya.MObject)): without duplicates, in connection order
+    """
+    result = []
+    found = set()
+    for plug in OpenMaya.MFnDependencyNode(mObject).getConnections():
+        for connected in plug.connectedTo(inputs, not inputs):
+            node = connected.node()
+            key = OpenMaya.MObjectHandle(node).hashCode()
+            if key not in found:
+                found.add(key)
+                result.append(node)
+
+    return result
+
+
+class GraphSnapshot(object):
+    """
+    Memoized adjacency of the dependency graph, built on demand while walking.
+    Use one for a group of walks over the same graph, p.e. during a build, and close it after.
+    """
+    def __init__(self):
+        self._adjacency = {}  # (hashCode, inputs) -> [MObjectHandle]
+        self._callbacks = [OpenMaya.MDGMessage.addConnectionCallback(self._connectionChanged),
+                           OpenMaya.MDGMessage.addNodeRemovedCallback(self._nodeRemoved, 'dependNode')]
+        self.hits = 0
+        self.misses = 0
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def _forget(self, mObject):
+        key = OpenMaya.MObjectHandle(mObject).hashCode()
+        self._adjacency.pop((key, True), None)
+        self._adjacency.pop((key, False), None)
+
+    def _connectionChanged(self, srcPlug, dstPlug, made, *args):
+        self._forget(srcPlug.node())
+        self._forget(dstPlug.node())
+
+    def _nodeRemoved(self, node, *args):
+        self._forget(node)
+
+    def neighbours(self, mObject, inputs=True):
+        """
+        :param mObject(OpenMaya.MObject):
+        :param inputs(bool): True source nodes, False destination nodes
+        :return(list(OpenMaya.MObject)):
+        """
+        key = (OpenMaya.MObjectHandle(mObject).hashCode(), inputs)
+        handles = self._adjacency.get(key)
+        if handles is not None and all(handle.isValid() for handle in handles):
+            self.hits += 1
+            return [handle.object() for handle in handles]
+
+        self.misses += 1
+        nodes = connectedNodes(mObject, inputs)
+        self._adjacency[key] = [OpenMaya.MObjectHandle(node) for node in nodes]
+
+        return nodes
+
+    def clear(self):
+        self._adjacency.clear()
+
+    def close(self):
+        """
+        Remove the scene callbacks and the stored connections
+        """
+        for callback in self._callbacks:
+            try:
+                OpenMaya.MMessage.removeCallback(callback)
+            except RuntimeError:
+                pass
+        self._callbacks = []
+        self._adjacency.clear()
+
+
+def _matches(mObject, typeFilter):
+    # ints are MFn api types, strings are node type names
+    apiType = mObject.apiType()
+    typeName = None
+    for nodeType in typeFilter:
+        if isinstance(nodeType, int):
+            if apiType == nodeType:
+                return True
+        else:
+            if typeName is None:
+                typeName = OpenMaya.MFnDependencyNode(mObject).typeName
+            if typeName == nodeType:
+                return True
+
+    return False
+
+
+def walk(start, inputs=True, typeFilter=None, maxDepth=0, maxNodes=0, order='depth', snapshot=None):
+    """
+    Walk the graph from the start node and return the found nodes of the filter types.
+    The start node is not included, each node is visited once.
+    :param start(str, pm or OpenMaya.MObject): start node
+    :param inputs(bool): True walks the input connections, False the outputs
+    :param typeFilter(list): OpenMaya.MFn api types, or node type names. None returns all the visited nodes
+    :param maxDepth(int): max number of connections from the start node, 0 no limit
+    :param maxNodes(int): stop when this number of nodes are found, 0 no limit
+    :param order(str): depth, depth first, or breadth, breadth first. breadth returns the closest nodes first
+    :param snapshot(GraphSnapshot): reuse the connections read by previous walks
+    :return(list(OpenMaya.MObject)):
+    """
+    if order not in ('depth', 'breadth'):
+        raise ValueError('walk: unknown order %s, use depth or breadth' % order)
+    neighbours = snapshot.neighbours if snapshot else connectedNodes
+
+    start = getMObject(start)
+    visited = set([OpenMaya.MObjectHandle(start).hashCode()])
+    pending = deque([(start, 0)])
+    pop = pending.pop if order == 'depth' else pending.popleft
+    output = []
+
+    while pending:
+        node, depth = pop()
+        children = []
+        for child in neighbours(node, inputs):
+            key = OpenMaya.MObjectHandle(child).hashCode()
+            if key in visited:
+                continue
+            visited.add(key)
+
+            if typeFilter is None or _matches(child, typeFilter):
+                output.append(child)
+                if maxNodes and len(output) >= maxNodes:
+                    return output
+
+            if not maxDepth or depth + 1 < maxDepth:
+                children.append((child, depth + 1))
+
+        # depth first pops the last one, reverse to visit in connection order
+        pending.extend(reversed(children) if order == 'depth' else children)
+
+    return output
@@ -1,6 +1,7 @@
 from pymel import core as pm
 
 from ARCore import DGUtils, createController, jointPointToController
+import ARMatrixCache
 
 
 def stretchIkFkSetup(fkObjList, fkDistances, nodeAttr, ikObjList, ikDistance, ikJoints, mainJoints, twsitMainJoints, nameInfo, main, poleVector=None):
@@ -245,7 +246,7 @@ def twistJointsConnect(twistMainJoints, trackMain, nameInfo, pointCnstr=None):
     # group that will be used for store orientation, with a orientConstraint
     trackGroup = pm.group(empty=True, name='%s_twistOri_grp' % nameInfo)
 
-    pm.xform(trackGroup, ws=True, m=pm.xform(twistMainJoints[0], ws=True, q=True, m=True))
+    pm.xform(trackGroup, ws=True, m=ARMatrixCache.worldMatrix(twistMainJoints[0]))
     twistMainJoints[0].addChild(trackGroup)  # parent first joint of the chain
 
     # constraint to main
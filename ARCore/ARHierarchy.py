@@ -0,0 +1,111 @@
+"""
+DAG hierarchy helpers over full path strings, p.e: |akona_grp|akona_foot_left_toe1_joint.
+Parents are found by the path prefixes, in a dict, so everything runs in linear time over the
+length of the paths, and without maya.
+"""
+import numpy as np
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARHierarchy')
+
+
+def depth(path):
+    """
+    :param path(str): full dag path
+    :return(int): number of ancestors, 0 for world children
+    """
+    return path.count('|') - 1
+
+
+def parentIndices(paths):
+    """
+    Closest listed ancestor of each path, intermediate nodes that are not in the list are skipped
+    :param paths(list(str)): full dag paths
+    :return(list(int)): index of the parent in paths, -1 if no ancestor is listed
+    """
+    indexByPath = dict((path, i) for i, path in enumerate(paths))
+    parents = []
+    for path in paths:
+        parent = -1
+        ancestor = path.rpartition('|')[0]
+        while ancestor:
+            if ancestor in indexByPath:
+                parent = indexByPath[ancestor]
+                break
+            ancestor = ancestor.rpartition('|')[0]
+        parents.append(parent)
+
+    return parents
+
+
+def topologicalOrder(paths, parents=None):
+    """
+    Order where each parent comes before its children, by depth and then by list order
+    :param paths(list(str)): full dag paths
+    :param parents(list(int)): parentIndices of paths, calculated if None
+    :return(list(int)): indices of paths
+    """
+    parents = parentIndices(paths) if parents is None else parents
+    # depth in the listed hierarchy, counting only listed ancestors
+    levels = [None] * len(paths)
+    for i in range(len(paths)):
+        chain = []
+        node = i
+        while node != -1 and levels[node] is None:
+            chain.append(node)
+            node = parents[node]
+        level = -1 if node == -1 else levels[node]
+        for node in reversed(chain):
+            level += 1
+            levels[node] = level
+
+    # bucket by level, list order inside each level
+    buckets = [[] for i in range(max(levels) + 1)] if levels else []
+    for i, level in enumerate(levels):
+        buckets[level].append(i)
+
+    return [i for bucket in buckets for i in bucket]
+
+
+def groupByHierarchy(paths):
+    """
+    Group the paths by their top listed ancestor, p.e: toes of a foot, one group per toe
+    :param paths(list(str)): full dag paths
+    :return(list(list(int))): groups of indices, in topological order. groups are sorted by
+            the list position of their first item
+    """
+    parents = parentIndices(paths)
+    order = topologicalOrder(paths, parents)
+    roots = list(range(len(paths)))
+    for i in order:
+        if parents[i] != -1:
+            roots[i] = roots[parents[i]]
+
+    # group order: first appearance in the list
+    groups = {}
+    rootOrder = []
+    for root in roots:
+        if root not in groups:
+            groups[root] = []
+            rootOrder.append(root)
+    for i in order:
+        groups[roots[i]].append(i)
+
+    return [groups[root] for root in rootOrder]
+
+
+def localMatrices(matrices, parents):
+    """
+    Matrices relative to the listed parent, maya row vector convention: world = local * parentWorld
+    :param matrices(np.array): (n, 4, 4) world matrices
+    :param parents(list(int)): parentIndices, -1 keeps the world matrix
+    :return(np.array): (n, 4, 4) local matrices
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    parents = np.asarray(parents, dtype=np.int64)
+    result = matrices.copy()
+    children = np.nonzero(parents != -1)[0]
+    if len(children):
+        result[children] = np.matmul(matrices[children], np.linalg.inv(matrices[parents[children]]))
+
+    return result
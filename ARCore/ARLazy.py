@@ -0,0 +1,81 @@
+"""
+Lazy package loading.
+A package __init__ replaces itself with a LazyPackage, submodules and names are imported
+the first time they are accessed, so importing the package does not load maya, pymel or Qt modules.
+py2 modules have no __getattr__, so the package module is replaced in sys.modules.
+
+p.e, in a package __init__.py:
+    from ..ARCore import ARLazy
+    ARLazy.lazyPackage(__name__, ['_autoRig_Abstract', '_autoRig_Body', '_autoRig_Face'],
+                       {'ARAutoRig_Body': '_autoRig_Body', 'ARAutoRig_Face': '_autoRig_Face'})
+"""
+import sys
+import types
+import importlib
+
+
+class LazyPackage(types.ModuleType):
+    """
+    Module that imports its submodules on first attribute access
+    """
+    def __init__(self, module, submodules=(), attributes=None):
+        """
+        :param module(module): package module to replace, its namespace is copied
+        :param submodules(list(str)): submodule names, p.e: ARCore
+        :param attributes(dict): name -> submodule that defines it, p.e: {'ARAutoRig_Body': '_autoRig_Body'}
+        """
+        super(LazyPackage, self).__init__(module.__name__, module.__doc__)
+        self.__dict__.update(module.__dict__)
+        # keep the original module alive, its globals are used by functions defined in the __init__
+        self._lazyModule = module
+        self._lazySubmodules = set(submodules)
+        self._lazyAttributes = dict(attributes or {})
+
+    def __getattr__(self, name):
+        # only called when the name is not in the module dict
+        if name.startswith('_lazy'):
+            raise AttributeError(name)
+        if name in self._lazySubmodules:
+            module = importlib.import_module('%s.%s' % (self.__name__, name))
+            setattr(self, name, module)
+            return module
+        if name in self._lazyAttributes:
+            module = getattr(self, self._lazyAttributes[name])
+            value = getattr(module, name)
+            setattr(self, name, value)
+            return value
+
+        raise AttributeError("'module' object %s has no attribute '%s'" % (self.__name__, name))
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | self._lazySubmodules | set(self._lazyAttributes))
+
+    def reset(self):
+        """
+        Forget the names taken from the submodules, next access reads them again, p.e: after a reload
+        """
+        for name in self._lazyAttributes:
+            self.__dict__.pop(name, None)
+
+    def loaded(self):
+        """
+        :return(list(str)): submodules already imported
+        """
+        return sorted(name for name in self._lazySubmodules if '%s.%s' % (self.__name__, name) in sys.modules)
+
+
+def lazyPackage(name, submodules=(), attributes=None):
+    """
+    Replace the package module in sys.modules with a LazyPackage
+    :param name(str): package __name__
+    :param submodules(list(str)):
+    :param attributes(dict): name -> submodule
+    :return(LazyPackage):
+    """
+    module = sys.modules[name]
+    if isinstance(module, LazyPackage):
+        module = module._lazyModule
+    lazy = LazyPackage(module, submodules, attributes)
+    sys.modules[name] = lazy
+
+    return lazy
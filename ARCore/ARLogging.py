@@ -0,0 +1,93 @@
+"""
+Central logging configuration of the package.
+Every module takes its logger from here, loggers hang from the subsystem ones
+(autoRig_Tools.ARCore, autoRig_Tools.ARAutoRig, autoRig_Tools.ARTools), so one call sets the level of a whole subsystem.
+Log calls must pass the arguments to the logger instead of formatting the message,
+p.e: logger.debug('parent %s', node), so nothing is converted to string when the level is off.
+
+p.e:
+    ARLogging.configure('quiet')  # production builds, only warnings and errors
+    ARLogging.configure('debug', ARTools=logging.INFO)
+
+The profile at import can be chosen with the AR_LOG_PROFILE environment variable.
+"""
+import os
+import logging
+
+ROOT = 'autoRig_Tools'
+SUBSYSTEMS = ('ARCore', 'ARAutoRig', 'ARTools')
+
+PROFILES = {'debug': {'ARCore': logging.DEBUG, 'ARAutoRig': logging.DEBUG, 'ARTools': logging.DEBUG},
+            'info': {'ARCore': logging.INFO, 'ARAutoRig': logging.INFO, 'ARTools': logging.INFO},
+            'quiet': {'ARCore': logging.WARNING, 'ARAutoRig': logging.WARNING, 'ARTools': logging.WARNING}}
+
+DEFAULT_PROFILE = os.environ.get('AR_LOG_PROFILE', 'debug')
+
+# module logger name -> less verbose level allowed for the module
+_MODULE_LEVELS = {}
+
+# maya adds its own handler to the root logger, basicConfig only acts outside maya
+logging.basicConfig()
+
+
+def getLogger(name, level=None):
+    """
+    :param name(str): subsystem.module, p.e: ARCore.ARTopology
+    :param level(int): if set, the module never logs below this level, p.e: logging.INFO for chatty modules
+    :return(logging.Logger):
+    """
+    logger = logging.getLogger('%s.%s' % (ROOT, name))
+    if level is not None:
+        _MODULE_LEVELS[logger.name] = level
+        _applyModuleLevel(logger)
+
+    return logger
+
+
+def _applyModuleLevel(logger):
+    subsystem = logger.name.split('.')[1]
+    logger.setLevel(max(_MODULE_LEVELS[logger.name], getLogger(subsystem).getEffectiveLevel()))
+
+
+def setLevel(subsystem, level):
+    """
+    :param subsystem(str): ARCore, ARAutoRig or ARTools
+    :param level(int or str): logging level, p.e: logging.INFO or 'INFO'
+    """
+    if subsystem not in SUBSYSTEMS:
+        raise ValueError('setLevel: unknown subsystem %s, use one of %s' % (subsystem, ', '.join(SUBSYSTEMS)))
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    getLogger(subsystem).setLevel(level)
+
+    prefix = '%s.%s.' % (ROOT, subsystem)
+    for name in _MODULE_LEVELS:
+        if name.startswith(prefix):
+            _applyModuleLevel(logging.getLogger(name))
+
+
+def configure(profile=None, **levels):
+    """
+    Apply a level profile, then the per subsystem levels
+    :param profile(str): debug, info or quiet. None keeps the current levels
+    :param levels: subsystem=level, p.e: ARCore=logging.INFO
+    """
+    if profile is not None:
+        if profile not in PROFILES:
+            raise ValueError('configure: unknown profile %s, use one of %s' % (profile, ', '.join(sorted(PROFILES))))
+        for subsystem, level in PROFILES[profile].items():
+            setLevel(subsystem, level)
+
+    for subsystem, level in levels.items():
+        setLevel(subsystem, level)
+
+
+def getLevels():
+    """
+    :return(dict): subsystem -> level name
+    """
+    return dict((subsystem, logging.getLevelName(getLogger(subsystem).getEffectiveLevel()))
+                for subsystem in SUBSYSTEMS)
+
+
+configure(DEFAULT_PROFILE if DEFAULT_PROFILE in PROFILES else 'debug')
@@ -0,0 +1,273 @@
+"""
+Build scoped world matrix cache.
+The guide joints world matrices are read once, in bulk, into a (N, 4, 4) float64 array, and the builders
+read them from it instead of a pm.xform query per call.
+Each cached node has a world matrix modified callback, so the entries the build moves or reparents are
+marked dirty and read again from the scene on the next query.
+
+p.e:
+    with ARMatrixCache.build(cmds.ls(type='joint')) as cache:
+        akonaRigA_Body()
+    print(cache.stats())
+
+builders use the module funcs, they query the scene when there is not an active cache:
+    pm.xform(controller, ws=True, m=ARMatrixCache.worldMatrix(joint))
+"""
+import numpy as np
+import pymel.core as pm
+import maya.api.OpenMaya as OpenMaya
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARMatrixCache')
+
+
+def _dagPath(node):
+    """
+    :param node(str or pm):
+    :return(OpenMaya.MDagPath):
+    """
+    mSel = OpenMaya.MSelectionList()
+    mSel.add(str(node))
+
+    return mSel.getDagPath(0)
+
+
+def _readMatrix(dagPath):
+    """
+    :param dagPath(OpenMaya.MDagPath):
+    :return(list): 16 floats, row major like pm.xform(q=True, ws=True, m=True)
+    """
+    return list(dagPath.inclusiveMatrix())
+
+
+class MatrixCache(object):
+    """
+    World matrices of a group of dag nodes, read in bulk and served from memory.
+    Only the loaded nodes are cached, queries of other nodes read the scene.
+    """
+    def __init__(self, nodes=None):
+        """
+        :param nodes(list(str or pm)): nodes to load
+        """
+        self._rows = {}  # name -> row
+        self._paths = []  # row -> OpenMaya.MDagPath
+        self._handles = []  # row -> OpenMaya.MObjectHandle
+        self._names = []  # row -> [names]
+        self._matrices = np.empty((0, 4, 4), dtype=np.float64)
+        self._valid = np.empty(0, dtype=bool)
+        self._callbacks = [OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject(), self._nameChanged)]
+        # stats
+        self.hits = 0  # queries served from the cache
+        self.misses = 0  # queries that read the scene
+        self.invalidations = 0
+
+        if nodes:
+            self.load(nodes)
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def __len__(self):
+        return len(self._paths)
+
+    def load(self, nodes):
+        """
+        Read the world matrices of the nodes in one pass, and watch them
+        :param nodes(list(str or pm)):
+        """
+        paths = []
+        for node in nodes:
+            name = str(node)
+            if name in self._rows:
+                continue
+            dagPath = _dagPath(name)
+            paths.append((name, dagPath))
+
+        if not paths:
+            return
+
+        first = len(self._paths)
+        matrices = np.array([_readMatrix(dagPath) for name, dagPath in paths], dtype=np.float64)
+        self._matrices = np.concatenate((self._matrices, matrices.reshape(-1, 4, 4)))
+        self._valid = np.concatenate((self._valid, np.ones(len(paths), dtype=bool)))
+
+        for row, (name, dagPath) in enumerate(paths, first):
+            self._paths.append(dagPath)
+            self._handles.append(OpenMaya.MObjectHandle(dagPath.node()))
+            # pymel str is the partial path, index both
+            names = list(set([name, dagPath.partialPathName()]))
+            self._names.append(names)
+            for alias in names:
+                self._rows[alias] = row
+            self._callbacks.append(OpenMaya.MDagMessage.addWorldMatrixModifiedCallback(dagPath, self._matrixModified,
+                                                                                       row))
+
+        logger.debug('MatrixCache: %s world matrices loaded', len(paths))
+
+    def _matrixModified(self, node, modified, row):
+        if self._valid[row]:
+            self._valid[row] = False
+            self.invalidations += 1
+
+    def _nameChanged(self, node, prevName, *args):
+        # the old name can be reused by a new node
+        row = self._rows.get(prevName)
+        if row is not None and self._handles[row].object() == node:
+            self._forgetNames(row)
+
+    def _forgetNames(self, row):
+        for alias in self._names[row]:
+            if self._rows.get(alias) == row:
+                del self._rows[alias]
+        self._names[row] = []
+
+    def _row(self, node):
+        """
+        :return(int): row of a valid cached node, None if it is not cached
+        """
+        row = self._rows.get(str(node))
+        if row is None:
+            return None
+        if not self._handles[row].isValid():
+            # deleted node
+            self._forgetNames(row)
+            return None
+
+        if not self._valid[row]:
+            self.misses += 1
+            self._matrices[row] = np.reshape(_readMatrix(self._paths[row]), (4, 4))
+            self._valid[row] = True
+        else:
+            self.hits += 1
+
+        return row
+
+    def matrix(self, node):
+        """
+        :param node(str or pm):
+        :return(list): 16 floats, world matrix like pm.xform(q=True, ws=True, m=True)
+        """
+        row = self._row(node)
+        if row is None:
+            self.misses += 1
+            return _readMatrix(_dagPath(node))
+
+        return self._matrices[row].ravel().tolist()
+
+    def translation(self, node):
+        """
+        :param node(str or pm):
+        :return(pm.datatypes.Vector): world translation, like getTranslation('world')
+        """
+        row = self._row(node)
+        if row is None:
+            self.misses += 1
+            return pm.datatypes.Vector(_readMatrix(_dagPath(node))[12:15])
+
+        return pm.datatypes.Vector(self._matrices[row, 3, :3].tolist())
+
+    def matrices(self, nodes):
+        """
+        :param nodes(list(str or pm)):
+        :return(np.array): (len(nodes), 4, 4) world matrices
+        """
+        return np.array([self.matrix(node) for node in nodes], dtype=np.float64).reshape(-1, 4, 4)
+
+    def invalidate(self, node=None):
+        """
+        Mark a node as dirty, for changes the callbacks do not see
+        :param node(str or pm): None, all the nodes
+        """
+        if node is None:
+            self._valid[:] = False
+            return
+        row = self._rows.get(str(node))
+        if row is not None:
+            self._valid[row] = False
+
+    def stats(self):
+        """
+        :return(dict): nodes, hits (scene queries saved), misses (scene queries done) and invalidations
+        """
+        return {'nodes': len(self._paths), 'hits': self.hits, 'misses': self.misses,
+                'invalidations': self.invalidations}
+
+    def close(self):
+        """
+        Remove the scene callbacks
+        """
+        for callback in self._callbacks:
+            try:
+                OpenMaya.MMessage.removeCallback(callback)
+            except RuntimeError:
+                pass
+        self._callbacks = []
+
+
+# caches of the running builds, the last one is the active one
+_ACTIVE = []
+
+
+def active():
+    """
+    :return(MatrixCache): cache of the running build, None if there is not one
+    """
+    return _ACTIVE[-1] if _ACTIVE else None
+
+
+class build(object):
+    """
+    Context manager, cache the world matrices of the nodes while the build runs.
+    On exit the cache is closed, and the scene queries saved are logged.
+    """
+    def __init__(self, nodes):
+        """
+        :param nodes(list(str or pm)): guide nodes, p.e: cmds.ls(type='joint')
+        """
+        self._nodes = nodes
+        self.cache = None
+
+    def __enter__(self):
+        self.cache = MatrixCache(self._nodes)
+        _ACTIVE.append(self.cache)
+        return self.cache
+
+    def __exit__(self, *args):
+        if self.cache in _ACTIVE:
+            _ACTIVE.remove(self.cache)
+        self.cache.close()
+        stats = self.cache.stats()
+        logger.info('MatrixCache: %(hits)s scene queries saved, %(misses)s done, %(invalidations)s invalidations, '
+                    '%(nodes)s nodes', stats)
+        return False
+
+
+def worldMatrix(node):
+    """
+    :param node(str or pm):
+    :return(list): 16 floats, world matrix like pm.xform(q=True, ws=True, m=True)
+    """
+    cache = active()
+    if cache is None:
+        return pm.xform(node, q=True, ws=True, m=True)
+
+    return cache.matrix(node)
+
+
+def worldTranslation(node):
+    """
+    :param node(str or pm):
+    :return(pm.datatypes.Vector): like getTranslation('world')
+    """
+    cache = active()
+    if cache is None:
+        return pm.PyNode(node).getTranslation('world')
+
+    return cache.translation(node)
@@ -0,0 +1,160 @@
+"""
+Scene name index.
+Keeps the names of the scene joints in a list, so builders can find joints by regex without
+scanning and wrapping every node of the scene with pm.ls().
+The index is rebuilt lazily after a joint is added, removed or renamed.
+Close it when the build ends, or use it as a context manager, to remove its scene callbacks.
+"""
+import re
+import weakref
+import pymel.core as pm
+import maya.cmds as cmds
+from maya import OpenMaya
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARNameIndex')
+
+
+def _weakCallback(instance, methodName):
+    """
+    Scene callback that does not keep the instance alive, so an index that is not closed can be collected
+    :param instance: object with the method
+    :param methodName(str):
+    :return(function):
+    """
+    reference = weakref.ref(instance)
+
+    def callback(*args):
+        obj = reference()
+        if obj is not None:
+            getattr(obj, methodName)(*args)
+
+    return callback
+
+
+class JointNameIndex(object):
+    """
+    Name index of the scene joints.
+    p.e: JointNameIndex().skinJoints('akona_leg', 'left') -> [akona_leg_left_upperLeg_skin_joint, ...]
+    """
+    def __init__(self, nodeType='joint', skinJointNaming='skin_joint'):
+        """
+        :param nodeType(str): node type to index
+        :param skinJointNaming(str): skin joints suffix
+        """
+        self._nodeType = nodeType
+        self._skinJointNaming = skinJointNaming
+        self._names = None  # None -> dirty
+        self._lowerNames = None
+        self._patterns = {}  # (pattern, flags) -> compiled regex
+        self._callbacks = []
+
+
+    def __del__(self):
+        self.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+
+    def _build(self):
+        """
+        Read the names from the scene and register the invalidation callbacks
+        """
+        self._names = cmds.ls(type=self._nodeType) or []
+        self._lowerNames = [name.lower() for name in self._names]
+        logger.debug('JointNameIndex: %s %s nodes indexed', len(self._names), self._nodeType)
+
+        if not self._callbacks:
+            nodeChanged = _weakCallback(self, '_nodeChanged')
+            self._callbacks.append(OpenMaya.MDGMessage.addNodeAddedCallback(nodeChanged, self._nodeType))
+            self._callbacks.append(OpenMaya.MDGMessage.addNodeRemovedCallback(nodeChanged, self._nodeType))
+            # null object, rename of any node
+            self._callbacks.append(OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject(),
+                                                                               _weakCallback(self, '_nameChanged')))
+
+
+    def _nodeChanged(self, node, *args):
+        self.invalidate()
+
+
+    def _nameChanged(self, node, prevName, *args):
+        # the index is dirty yet, nothing to check
+        if self._names is None:
+            return
+        if node.hasFn(OpenMaya.MFn.kJoint) or OpenMaya.MFnDependencyNode(node).typeName() == self._nodeType:
+            self.invalidate()
+
+
+    def invalidate(self):
+        """
+        Mark the index as dirty, next query rebuilds it
+        """
+        self._names = None
+        self._lowerNames = None
+
+
+    def close(self):
+        """
+        Remove the scene callbacks, the next query registers them again
+        """
+        self.invalidate()
+        for callback in self._callbacks:
+            try:
+                OpenMaya.MMessage.removeCallback(callback)
+            except RuntimeError:
+                pass
+        self._callbacks = []
+
+
+    def names(self):
+        """
+        :return(list): indexed names, in scene order
+        """
+        if self._names is None:
+            self._build()
+
+        return self._names
+
+
+    def query(self, pattern, lower=False, exclude=None):
+        """
+        Find the indexed nodes whose name matches the pattern
+        :param pattern(str): regex, matched from the start of the name
+        :param lower(bool): match against the lower case names
+        :param exclude(list(str)): discard names that contain any of these strings
+        :return(list): pymel nodes
+        """
+        names = self.names()
+        matchNames = self._lowerNames if lower else names
+
+        key = (pattern, lower)
+        if key not in self._patterns:
+            self._patterns[key] = re.compile(pattern)
+        regex = self._patterns[key]
+
+        exclude = exclude or []
+        result = [names[i] for i, name in enumerate(matchNames)
+                  if regex.match(name) and not any(word in names[i] for word in exclude)]
+
+        return [pm.PyNode(name) for name in result]
+
+
+    def skinJoints(self, zone, side='', exclude=None):
+        """
+        Skin joints of a zone and side
+        :param zone(str): name start, p.e akona_spine
+        :param side(str): left, right or empty
+        :param exclude(list(str)): discard names that contain any of these strings
+        :return(list): pymel joints
+        """
+        pattern = '^%s.*%s.*%s$' % (zone, side, self._skinJointNaming) if side else \
+            '^%s.*%s$' % (zone, self._skinJointNaming)
+
+        return self.query(pattern, exclude=exclude)
@@ -0,0 +1,60 @@
+"""
+Name matching helpers over plain strings, without maya.
+Secondary names are reduced once to a canonical key, the name without the keyword and the digits and
+underscores that follow it, p.e: akona_upperArm_twist1_left_joint -> akona_upperArm_left_joint.
+Keys are bucketed in a dict, so matching two lists is linear.
+"""
+import re
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARNaming')
+
+FILTER_CHARS = '1234567890_'
+_DIGITS = re.compile('[0-9]')
+
+
+def detectKeyword(primaryNames, secondaryNames):
+    """
+    Find the word that is in all the secondary names and not in the first primary name, digits are ignored.
+    p.e: twist for akona_upperArm_left_joint and akona_upperArm_twist1_left_joint
+    :param primaryNames(list(str)):
+    :param secondaryNames(list(str)):
+    :return(str): keyword, None if there is not one and only one candidate
+    """
+    count = {}
+    for name in secondaryNames:
+        for word in name.split('_'):
+            word = _DIGITS.sub('', word)
+            count[word] = count.get(word, 0) + 1
+
+    # key word must not be in primary list
+    primaryName = primaryNames[0] if primaryNames else ''
+    candidates = [word for word in count if count[word] == len(secondaryNames) and word not in primaryName]
+
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def keywordKey(name, keyword):
+    """
+    :param name(str): p.e: akona_upperArm_twist1_left_joint
+    :param keyword(str): p.e: twist
+    :return(str): name without the first keyword and the digits and underscores after it,
+            p.e: akona_upperArm_left_joint. names without the keyword are returned as they are
+    """
+    head, found, tail = name.partition(keyword)
+    return head + tail.lstrip(FILTER_CHARS)
+
+
+def groupByKeyword(primaryNames, secondaryNames, keyword):
+    """
+    Group the secondary names by the primary name they match once the keyword is removed
+    :param primaryNames(list(str)):
+    :param secondaryNames(list(str)):
+    :param keyword(str):
+    :return(list(list(int))): one group per primary name, indices of secondaryNames in list order
+    """
+    buckets = {}
+    for i, name in enumerate(secondaryNames):
+        buckets.setdefault(keywordKey(name, keyword), []).append(i)
+
+    return [list(buckets.get(name, [])) for name in primaryNames]
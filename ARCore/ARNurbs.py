@@ -0,0 +1,403 @@
+"""
+Non rational b-spline curves over numpy arrays.
+Knots follow the maya convention, MFnNurbsCurve.knots(): numCVs + degree - 1 values,
+without the first and last knot of the textbook knot vector.
+Headless, so it can run and be benchmarked outside maya.
+"""
+import numpy as np
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARNurbs')
+
+
+def fullKnots(knots):
+    """
+    :param knots(np.array): maya knots
+    :return(np.array): textbook knot vector, numCVs + degree + 1 values
+    """
+    knots = np.asarray(knots, dtype=np.float64)
+
+    return np.concatenate(([knots[0]], knots, [knots[-1]]))
+
+
+def domain(knots, degree):
+    """
+    :param knots(np.array): maya knots
+    :param degree(int):
+    :return(float, float): min and max param of the curve
+    """
+    return float(knots[degree - 1]), float(knots[len(knots) - degree])
+
+
+def basisMatrix(knots, degree, params, derivative=False):
+    """
+    Cox de Boor recursion, for all the params at once
+    :param knots(np.array): maya knots
+    :param degree(int):
+    :param params(np.array): (m) params inside the curve domain
+    :param derivative(bool): return the first derivative of the basis functions too
+    :return(np.array): (m, numCVs) basis, and (m, numCVs) derivatives if derivative
+    """
+    full = fullKnots(knots)
+    params = np.clip(np.asarray(params, dtype=np.float64).ravel(), *domain(knots, degree))
+    numCVs = len(full) - degree - 1
+
+    # degree 0: the span that contains each param, the domain end belongs to the last span
+    lower = full[:-1][None, :]
+    upper = full[1:][None, :]
+    u = params[:, None]
+    basis = ((lower <= u) & (u < upper)).astype(np.float64)
+    lastSpan = np.nonzero(full[:-1] < full[1:])[0][-1]
+    basis[params >= full[lastSpan + 1], lastSpan] = 1.0
+
+    previous = basis
+    for p in range(1, degree + 1):
+        previous = basis
+        size = len(full) - p - 1
+        left = full[p:p + size] - full[:size]
+        right = full[p + 1:p + 1 + size] - full[1:1 + size]
+        # 0/0 is 0 in the recursion
+        leftFactor = np.where(left > 0, (u - full[:size]) / np.where(left > 0, left, 1.0), 0.0)
+        rightFactor = np.where(right > 0, (full[p + 1:p + 1 + size] - u) / np.where(right > 0, right, 1.0), 0.0)
+        basis = leftFactor * previous[:, :size] + rightFactor * previous[:, 1:size + 1]
+
+    if not derivative:
+        return basis
+
+    # N'i,p = p / (Ui+p - Ui) Ni,p-1 - p / (Ui+p+1 - Ui+1) Ni+1,p-1
+    left = full[degree:degree + numCVs] - full[:numCVs]
+    right = full[degree + 1:degree + 1 + numCVs] - full[1:1 + numCVs]
+    leftFactor = np.where(left > 0, degree / np.where(left > 0, left, 1.0), 0.0)
+    rightFactor = np.where(right > 0, degree / np.where(right > 0, right, 1.0), 0.0)
+    derivatives = leftFactor * previous[:, :numCVs] - rightFactor * previous[:, 1:numCVs + 1]
+
+    return basis, derivatives
+
+
+def evaluate(cvs, knots, degree, params):
+    """
+    :param cvs(np.array): (n, 3) control points
+    :param knots(np.array): maya knots
+    :param degree(int):
+    :param params(np.array): (m) params
+    :return(np.array): (m, 3) points
+    """
+    return basisMatrix(knots, degree, params).dot(np.asarray(cvs, dtype=np.float64))
+
+
+def parameterize(points, method='chord', start=0.0, end=1.0):
+    """
+    Params for a group of ordered points, distributed between start and end
+    :param points(np.array): (m, 3) ordered points
+    :param method(str): chord, proportional to the distance between points, or
+            centripetal, proportional to its square root, better with sharp turns
+    :param start(float): param of the first point
+    :param end(float): param of the last point
+    :return(np.array): (m) params
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    distances = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    if method == 'centripetal':
+        distances = np.sqrt(distances)
+    elif method != 'chord':
+        raise ValueError('parameterize: unknown method %s, use chord or centripetal' % method)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(distances)))
+    if cumulative[-1] <= 0:
+        return np.linspace(start, end, len(points))
+
+    return start + (end - start) * cumulative / cumulative[-1]
+
+
+def correctParams(cvs, knots, degree, points, params, iterations=2):
+    """
+    Newton steps that move each param to the closest point of the curve
+    :param cvs(np.array): (n, 3) control points
+    :param knots(np.array): maya knots
+    :param degree(int):
+    :param points(np.array): (m, 3) points
+    :param params(np.array): (m) initial params
+    :param iterations(int): newton steps
+    :return(np.array): (m) params
+    """
+    cvs = np.asarray(cvs, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    params = np.asarray(params, dtype=np.float64).copy()
+    uMin, uMax = domain(knots, degree)
+    for i in range(iterations):
+        basis, derivatives = basisMatrix(knots, degree, params, True)
+        curvePoints = basis.dot(cvs)
+        tangents = derivatives.dot(cvs)
+        lengths = np.einsum('ij,ij->i', tangents, tangents)
+        step = np.einsum('ij,ij->i', points - curvePoints, tangents) / np.where(lengths > 0, lengths, 1.0)
+        params = np.clip(params + step, uMin, uMax)
+
+    return params
+
+
+def fitCVs(cvs, knots, degree, points, params, fixEnds=True):
+    """
+    Least squares fit of the control points to the points.
+    Solves the smallest displacement of the cvs that places the curve over the points, so with less
+    points than free cvs, the cvs that do not affect the points keep their position.
+    :param cvs(np.array): (n, 3) current control points
+    :param knots(np.array): maya knots
+    :param degree(int):
+    :param points(np.array): (m, 3) target points
+    :param params(np.array): (m) curve param of each point
+    :param fixEnds(bool): keep the first and last cvs, the curve ends do not move
+    :return(np.array): (n, 3) new control points
+    """
+    cvs = np.array(cvs, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    basis = basisMatrix(knots, degree, params)
+    residual = points - basis.dot(cvs)
+
+    free = slice(1, len(cvs) - 1) if fixEnds else slice(0, len(cvs))
+    delta = np.linalg.lstsq(basis[:, free], residual, rcond=None)[0]
+    cvs[free] += delta
+
+    return cvs
+
+
+def fitCurve(cvs, knots, degree, points, params=None, method='chord', iterations=2, precision=None, fixEnds=True):
+    """
+    Fit the curve to the points: fit the cvs, move the params to the closest point of the new curve and fit again
+    :param cvs(np.array): (n, 3) current control points
+    :param knots(np.array): maya knots
+    :param degree(int):
+    :param points(np.array): (m, 3) ordered target points
+    :param params(np.array): (m) initial params, if None, parameterize between the curve domain ends
+    :param method(str): chord or centripetal, used if params is None
+    :param iterations(int): param corrections after the first fit
+    :param precision(float): stop when all the points are closer than precision
+    :param fixEnds(bool): keep the first and last cvs
+    :return(np.array, np.array, float): new cvs, params, max distance between points and curve
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if params is None:
+        params = parameterize(points, method, *domain(knots, degree))
+
+    cvs = fitCVs(cvs, knots, degree, points, params, fixEnds)
+    for i in range(iterations + 1):
+        params = correctParams(cvs, knots, degree, points, params)
+        error = np.linalg.norm(evaluate(cvs, knots, degree, params) - points, axis=1).max()
+        if i == iterations or (precision is not None and error < precision):
+            break
+        cvs = fitCVs(cvs, knots, degree, points, params, fixEnds)
+
+    return cvs, params, float(error)
+
+
+# 5 point gauss legendre quadrature in [0, 1]
+_GAUSS_NODES = (np.array([-0.9061798459386640, -0.5384693101056831, 0.0, 0.5384693101056831, 0.9061798459386640])
+                + 1.0) / 2.0
+_GAUSS_WEIGHTS = np.array([0.2369268850561891, 0.4786286704993665, 0.5688888888888889, 0.4786286704993665,
+                           0.2369268850561891]) / 2.0
+
+
+def _normalize(vectors):
+    lengths = np.linalg.norm(vectors, axis=-1)[..., None]
+    return vectors / np.where(lengths > 1e-12, lengths, 1.0)
+
+
+class CurveSampler(object):
+    """
+    Arc length sampler of a curve.
+    Builds once a table of params and arc lengths, gauss legendre integration of the speed between
+    the table params, and a parallel transport of the normal along the table.
+    p.e: positions, tangents, normals, binormals = CurveSampler(cvs, knots, 3).evenFrames(10)
+    """
+    def __init__(self, cvs, knots, degree, samplesPerSpan=16):
+        """
+        :param cvs(np.array): (n, 3) control points
+        :param knots(np.array): maya knots
+        :param degree(int):
+        :param samplesPerSpan(int): table params per span
+        """
+        self.cvs = np.asarray(cvs, dtype=np.float64).reshape(-1, 3)
+        self.knots = np.asarray(knots, dtype=np.float64)
+        self.degree = degree
+
+        uMin, uMax = domain(self.knots, degree)
+        spanKnots = np.unique(self.knots[(self.knots >= uMin) & (self.knots <= uMax)])
+        steps = np.linspace(0.0, 1.0, samplesPerSpan + 1)[:-1]
+        self.params = np.concatenate([start + (end - start) * steps for start, end in zip(spanKnots[:-1], spanKnots[1:])]
+                                     + [[uMax]])
+        self.lengths = np.concatenate(([0.0], np.cumsum(self._segmentLengths(self.params[:-1], self.params[1:]))))
+        self.length = float(self.lengths[-1])
+        self._transport = {}  # up vector -> table normals
+
+    def _segmentLengths(self, starts, ends):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        params = starts[:, None] + (ends - starts)[:, None] * _GAUSS_NODES[None, :]
+        speed = self.speed(params.ravel()).reshape(params.shape)
+
+        return (speed * _GAUSS_WEIGHTS[None, :]).sum(axis=1) * (ends - starts)
+
+    def points(self, params):
+        """
+        :param params(np.array): (m) params
+        :return(np.array): (m, 3) points
+        """
+        return evaluate(self.cvs, self.knots, self.degree, params)
+
+    def derivatives(self, params):
+        """
+        :param params(np.array): (m) params
+        :return(np.array): (m, 3) first derivatives, not normalized
+        """
+        return basisMatrix(self.knots, self.degree, params, True)[1].dot(self.cvs)
+
+    def speed(self, params):
+        return np.linalg.norm(self.derivatives(params), axis=1)
+
+    def tangents(self, params):
+        """
+        :param params(np.array): (m) params
+        :return(np.array): (m, 3) unit tangents
+        """
+        return _normalize(self.derivatives(params))
+
+    def lengthAtParams(self, params):
+        """
+        :param params(np.array): (m) params
+        :return(np.array): (m) arc length from the curve start
+        """
+        params = np.clip(np.asarray(params, dtype=np.float64), self.params[0], self.params[-1])
+        rows = np.clip(np.searchsorted(self.params, params, side='right') - 1, 0, len(self.params) - 2)
+
+        return self.lengths[rows] + self._segmentLengths(self.params[rows], params)
+
+    def paramsAtLengths(self, lengths, iterations=2):
+        """
+        :param lengths(np.array): (m) arc lengths from the curve start
+        :param iterations(int): newton steps after the table interpolation
+        :return(np.array): (m) params
+        """
+        lengths = np.clip(np.asarray(lengths, dtype=np.float64), 0.0, self.length)
+        params = np.interp(lengths, self.lengths, self.params)
+        for i in range(iterations):
+            speed = self.speed(params)
+            params = params - (self.lengthAtParams(params) - lengths) / np.where(speed > 1e-12, speed, 1.0)
+            params = np.clip(params, self.params[0], self.params[-1])
+
+        return params
+
+    def evenParams(self, count):
+        """
+        :param count(int): number of params, the first and last ones are the curve ends
+        :return(np.array): params at even arc length steps
+        """
+        return self.paramsAtLengths(np.linspace(0.0, self.length, count))
+
+    def closestParams(self, points):
+        """
+        :param points(np.array): (m, 3) points
+        :return(np.array): (m) params of the closest curve points
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        tablePoints = self.points(self.params)
+        distances = np.linalg.norm(points[:, None, :] - tablePoints[None, :, :], axis=2)
+        params = self.params[np.argmin(distances, axis=1)]
+
+        return correctParams(self.cvs, self.knots, self.degree, points, params, 3)
+
+    def _transportNormals(self, up):
+        """
+        Double reflection parallel transport (Wang 2008) of the up vector along the table params
+        """
+        key = tuple(np.round(up, 9)) if up is not None else None
+        if key in self._transport:
+            return self._transport[key]
+
+        positions = self.points(self.params)
+        tangents = self.tangents(self.params)
+        # first normal: up without its tangent component. if up is the tangent, the world axis less aligned with it
+        up = np.array((0.0, 1.0, 0.0) if up is None else up, dtype=np.float64)
+        if abs(np.dot(_normalize(up), tangents[0])) > 0.999:
+            up = np.eye(3)[np.argmin(np.abs(tangents[0]))]
+        normals = np.empty_like(tangents)
+        normals[0] = _normalize(up - np.dot(up, tangents[0]) * tangents[0])
+
+        for i in range(len(positions) - 1):
+            normal = normals[i]
+            v1 = positions[i + 1] - positions[i]
+            c1 = np.dot(v1, v1)
+            if c1 > 1e-18:
+                normal = normal - (2.0 / c1) * np.dot(v1, normal) * v1
+                reflectedTangent = tangents[i] - (2.0 / c1) * np.dot(v1, tangents[i]) * v1
+            else:
+                reflectedTangent = tangents[i]
+            v2 = tangents[i + 1] - reflectedTangent
+            c2 = np.dot(v2, v2)
+            if c2 > 1e-18:
+                normal = normal - (2.0 / c2) * np.dot(v2, normal) * v2
+            # remove float drift
+            normal = normal - np.dot(normal, tangents[i + 1]) * tangents[i + 1]
+            normals[i + 1] = _normalize(normal)
+
+        self._transport[key] = normals
+        return normals
+
+    def frames(self, params, up=None):
+        """
+        Rotation minimizing frames, no flips on straight segments
+        :param params(np.array): (m) params
+        :param up(tuple): initial normal direction at the curve start, None -> world Y
+        :return(np.array, np.array, np.array, np.array): (m, 3) positions, tangents, normals, binormals
+        """
+        params = np.asarray(params, dtype=np.float64)
+        tableNormals = self._transportNormals(up)
+        tangents = self.tangents(params)
+        normals = np.stack([np.interp(params, self.params, tableNormals[:, axis]) for axis in range(3)], axis=1)
+        normals = _normalize(normals - np.einsum('ij,ij->i', normals, tangents)[:, None] * tangents)
+        binormals = np.cross(tangents, normals)
+
+        return self.points(params), tangents, normals, binormals
+
+    def evenFrames(self, count, up=None):
+        """
+        :param count(int): number of frames, the first and last ones are the curve ends
+        :param up(tuple): initial normal direction, None -> world Y
+        :return(np.array, np.array, np.array, np.array): (count, 3) positions, tangents, normals, binormals
+        """
+        return self.frames(self.evenParams(count), up)
+
+
+def aimFrames(positions, lastTangent, normals):
+    """
+    Joint chain orientations, x axis aims to the next position, the last one follows lastTangent.
+    y axis is the normal without its x component
+    :param positions(np.array): (n, 3)
+    :param lastTangent(np.array): (3) x axis of the last position
+    :param normals(np.array): (n, 3) up vectors
+    :return(np.array): (n, 3, 3) rotation matrices, rows are the x, y and z axis
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    xAxis = np.concatenate((np.diff(positions, axis=0), np.asarray(lastTangent, dtype=np.float64).reshape(1, 3)))
+    xAxis = _normalize(xAxis)
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    yAxis = _normalize(normals - np.einsum('ij,ij->i', normals, xAxis)[:, None] * xAxis)
+    zAxis = np.cross(xAxis, yAxis)
+
+    return np.stack((xAxis, yAxis, zAxis), axis=1)
+
+
+def localTransforms(positions, rotations):
+    """
+    Local values of a chain where each element is the child of the previous one, the first one at world
+    :param positions(np.array): (n, 3) world positions
+    :param rotations(np.array): (n, 3, 3) world rotations, rows are the axis
+    :return(np.array, np.array): (n, 3) local translations, (n, 3, 3) local rotations
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    rotations = np.asarray(rotations, dtype=np.float64)
+    translations = positions.copy()
+    localRotations = rotations.copy()
+    # row vectors: world = local * parentWorld
+    translations[1:] = np.einsum('ij,ikj->ik', positions[1:] - positions[:-1], rotations[:-1])
+    localRotations[1:] = np.einsum('ijk,ilk->ijl', rotations[1:], rotations[:-1])
+
+    return translations, localRotations
@@ -0,0 +1,229 @@
+"""
+Build profiler.
+Nested timing spans for the rig builders, p.e: spine_auto > createController.
+Each span records wall time and the nodes created in the scene while it was open.
+Disabled by default, a decorated function only pays a flag check until enable() is called.
+
+p.e:
+    ARProfiler.enable()
+    akona_AutoRig.main()
+    ARProfiler.disable()
+    print(ARProfiler.textReport())
+    ARProfiler.exportChromeTrace('D:/build_trace.json')  # open it in chrome://tracing
+"""
+import sys
+import json
+import time
+import functools
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARProfiler')
+
+# wall clock. py2 has no perf_counter, time.clock is only wall time on windows
+if hasattr(time, 'perf_counter'):
+    _clock = time.perf_counter
+elif sys.platform == 'win32':
+    _clock = time.clock
+else:
+    _clock = time.time
+
+
+class _State(object):
+    """
+    Profiler state, a single instance per session
+    """
+    def __init__(self):
+        self.enabled = False
+        self.stack = []  # open spans
+        self.events = []  # closed spans: (path, name, start, duration, nodes)
+        self.nodesCreated = 0  # incremented by the node added callback
+        self.callbacks = []
+        self.origin = _clock()
+
+
+_STATE = _State()
+
+
+def _nodeAdded(*args):
+    _STATE.nodesCreated += 1
+
+
+def _addNodeCallbacks():
+    """
+    Count the nodes created in the scene, only inside maya
+    """
+    try:
+        from maya import OpenMaya
+    except ImportError:
+        return
+    _STATE.callbacks.append(OpenMaya.MDGMessage.addNodeAddedCallback(_nodeAdded, 'dependNode'))
+
+
+def _removeNodeCallbacks():
+    if not _STATE.callbacks:
+        return
+    from maya import OpenMaya
+    for callback in _STATE.callbacks:
+        try:
+            OpenMaya.MMessage.removeCallback(callback)
+        except RuntimeError:
+            pass
+    _STATE.callbacks = []
+
+
+def isEnabled():
+    """
+    :return(bool):
+    """
+    return _STATE.enabled
+
+
+def enable(reset=True):
+    """
+    Start recording spans
+    :param reset(bool): discard the spans of previous sessions
+    """
+    if reset:
+        clear()
+    if not _STATE.enabled:
+        _addNodeCallbacks()
+    _STATE.enabled = True
+
+
+def disable():
+    """
+    Stop recording spans, recorded ones are kept for the reports
+    """
+    _STATE.enabled = False
+    _removeNodeCallbacks()
+
+
+def clear():
+    """
+    Discard the recorded spans
+    """
+    _STATE.stack = []
+    _STATE.events = []
+    _STATE.origin = _clock()
+
+
+class span(object):
+    """
+    Context manager that records a nested span.
+    p.e:
+        with ARProfiler.span('mirror'):
+            ...
+    """
+    __slots__ = ('name', '_start', '_nodes', '_active')
+
+    def __init__(self, name):
+        """
+        :param name(str): span name
+        """
+        self.name = name
+        self._active = False
+
+    def __enter__(self):
+        if not _STATE.enabled:
+            return self
+        self._active = True
+        _STATE.stack.append(self.name)
+        self._nodes = _STATE.nodesCreated
+        self._start = _clock()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if not self._active:
+            return False
+        duration = _clock() - self._start
+        path = ' > '.join(_STATE.stack)
+        if _STATE.stack:
+            _STATE.stack.pop()
+        _STATE.events.append((path, self.name, self._start - _STATE.origin, duration,
+                              _STATE.nodesCreated - self._nodes))
+        self._active = False
+        return False
+
+
+def profiled(func):
+    """
+    Decorator, record each call of the function as a span with the function name
+    :param func(function):
+    :return(function):
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _STATE.enabled:
+            return func(*args, **kwargs)
+        with span(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def summary():
+    """
+    Aggregate the recorded spans by path
+    :return(list(dict)): path, calls, total, self, nodes. Sorted by total time
+    """
+    stats = {}
+    for path, name, start, duration, nodes in _STATE.events:
+        stat = stats.setdefault(path, {'path': path, 'calls': 0, 'total': 0.0, 'self': 0.0, 'nodes': 0})
+        stat['calls'] += 1
+        stat['total'] += duration
+        stat['self'] += duration
+        stat['nodes'] += nodes
+
+    # self time: remove the time of the direct children
+    for path, name, start, duration, nodes in _STATE.events:
+        parent = path.rpartition(' > ')[0]
+        if parent in stats:
+            stats[parent]['self'] -= duration
+
+    return sorted(stats.values(), key=lambda stat: stat['total'], reverse=True)
+
+
+def textReport(limit=None):
+    """
+    Flat text report, one line per span path
+    :param limit(int): max number of lines, None all of them
+    :return(str):
+    """
+    stats = summary()
+    if limit:
+        stats = stats[:limit]
+
+    lines = ['%10s %10s %8s %8s  %s' % ('total(s)', 'self(s)', 'calls', 'nodes', 'span')]
+    for stat in stats:
+        lines.append('%10.4f %10.4f %8d %8d  %s' % (stat['total'], stat['self'], stat['calls'],
+                                                     stat['nodes'], stat['path']))
+
+    return '\n'.join(lines)
+
+
+def chromeTrace():
+    """
+    Recorded spans in chrome trace event format, complete events in microseconds
+    :return(dict):
+    """
+    events = []
+    for path, name, start, duration, nodes in _STATE.events:
+        events.append({'name': name, 'cat': 'ARAutoRig', 'ph': 'X', 'pid': 0, 'tid': 0,
+                       'ts': start * 1e6, 'dur': duration * 1e6,
+                       'args': {'path': path, 'nodes': nodes}})
+    # parents before children when they start at the same time
+    events.sort(key=lambda event: (event['ts'], -event['dur']))
+
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def exportChromeTrace(path):
+    """
+    Save the recorded spans as chrome trace json, for chrome://tracing or perfetto
+    :param path(str): json file path
+    """
+    with open(path, 'w') as f:
+        json.dump(chromeTrace(), f)
+    logger.info('exportChromeTrace: %s spans saved in %s', len(_STATE.events), path)
@@ -0,0 +1,532 @@
+"""
+Spatial queries over numpy arrays of points and triangles.
+Headless, so it can run and be benchmarked outside maya.
+"""
+import numpy as np
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARSpatial')
+
+
+def barycentricCoords(points, a, b, c):
+    """
+    Barycentric coords of a group of points, each one with its own triangle.
+    Points are projected on the triangle plane.
+    :param points(np.array): (n, 3) points
+    :param a(np.array): (n, 3) first vertex of each triangle
+    :param b(np.array): (n, 3) second vertex of each triangle
+    :param c(np.array): (n, 3) third vertex of each triangle
+    :return(np.array): (n, 3) weights of a, b and c, every row sums 1
+    """
+    points, a, b, c = [np.asarray(array, dtype=np.float64).reshape(-1, 3) for array in (points, a, b, c)]
+    v0 = b - a
+    v1 = c - a
+    v2 = points - a
+
+    d00 = np.einsum('ij,ij->i', v0, v0)
+    d01 = np.einsum('ij,ij->i', v0, v1)
+    d11 = np.einsum('ij,ij->i', v1, v1)
+    d20 = np.einsum('ij,ij->i', v2, v0)
+    d21 = np.einsum('ij,ij->i', v2, v1)
+    denom = d00 * d11 - d01 * d01
+
+    # degenerated triangles give all the weight to the first vertex
+    degenerated = np.abs(denom) < 1e-12
+    denom[degenerated] = 1.0
+
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    v[degenerated] = 0.0
+    w[degenerated] = 0.0
+    weights = np.stack((1.0 - v - w, v, w), axis=1)
+
+    # closest points are inside the triangle, clip float errors
+    np.clip(weights, 0.0, 1.0, out=weights)
+    weights /= weights.sum(axis=1)[:, None]
+
+    return weights
+
+
+class KDTree(object):
+    """
+    Static kd-tree over a group of points.
+    Nodes are stored in arrays, each node splits its points by the median of the widest axis.
+    Leaves keep up to leafSize points, and are solved as a numpy batch.
+    """
+    def __init__(self, points, leafSize=16):
+        """
+        :param points(np.array): (n, 3) points
+        :param leafSize(int): max number of points in a leaf
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.leafSize = max(1, leafSize)
+        # point indices, reordered so each node owns a contiguous range
+        self.order = np.arange(len(self.points))
+
+        # node arrays: range start, range end, split axis (-1 leaf), split value, children
+        self._start = []
+        self._end = []
+        self._axis = []
+        self._split = []
+        self._left = []
+        self._right = []
+        # node bounding boxes, used to prune the search
+        self._min = []
+        self._max = []
+
+        if len(self.points):
+            self._build()
+
+    def _newNode(self, start, end):
+        nodePoints = self.points[self.order[start:end]]
+        self._start.append(start)
+        self._end.append(end)
+        self._axis.append(-1)
+        self._split.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._min.append(nodePoints.min(axis=0))
+        self._max.append(nodePoints.max(axis=0))
+        return len(self._start) - 1
+
+    def _build(self):
+        # iterative, deep trees do not hit the recursion limit
+        stack = [self._newNode(0, len(self.points))]
+        while stack:
+            node = stack.pop()
+            start, end = self._start[node], self._end[node]
+            if end - start <= self.leafSize:
+                continue
+
+            axis = int(np.argmax(self._max[node] - self._min[node]))
+            indices = self.order[start:end]
+            middle = (end - start) // 2
+            # partial sort, median split
+            partition = np.argpartition(self.points[indices, axis], middle)
+            self.order[start:end] = indices[partition]
+
+            self._axis[node] = axis
+            self._split[node] = self.points[self.order[start + middle], axis]
+            self._left[node] = self._newNode(start, start + middle)
+            self._right[node] = self._newNode(start + middle, end)
+            stack.extend((self._left[node], self._right[node]))
+
+    def _boxDistance(self, node, point):
+        # distance from the point to the node bounding box, 0 inside
+        delta = np.maximum(self._min[node] - point, 0.0) + np.maximum(point - self._max[node], 0.0)
+        return np.sqrt(np.dot(delta, delta))
+
+    def queryRadius(self, point, radius):
+        """
+        Points inside a sphere
+        :param point(np.array): (3) center
+        :param radius(float):
+        :return(np.array, np.array): point indices, distances. sorted by distance
+        """
+        point = np.asarray(point, dtype=np.float64)
+        foundIndices = []
+        foundDistances = []
+        stack = [0] if len(self.points) else []
+        while stack:
+            node = stack.pop()
+            if self._boxDistance(node, point) > radius:
+                continue
+
+            if self._axis[node] == -1:
+                indices = self.order[self._start[node]:self._end[node]]
+                distances = np.sqrt(((self.points[indices] - point) ** 2).sum(axis=1))
+                inside = distances <= radius
+                foundIndices.append(indices[inside])
+                foundDistances.append(distances[inside])
+            else:
+                stack.extend((self._left[node], self._right[node]))
+
+        if not foundIndices:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        foundIndices = np.concatenate(foundIndices)
+        foundDistances = np.concatenate(foundDistances)
+        sort = np.argsort(foundDistances, kind='mergesort')
+        return foundIndices[sort], foundDistances[sort]
+
+    def query(self, point, maxDistance=np.inf):
+        """
+        Nearest point
+        :param point(np.array): (3) point
+        :param maxDistance(float): ignore points further than this
+        :return(int, float): index and distance, (-1, inf) if there is no point
+        """
+        point = np.asarray(point, dtype=np.float64)
+        bestIndex, bestDistance = -1, maxDistance
+        stack = [0] if len(self.points) else []
+        while stack:
+            node = stack.pop()
+            if self._boxDistance(node, point) > bestDistance:
+                continue
+
+            if self._axis[node] == -1:
+                indices = self.order[self._start[node]:self._end[node]]
+                distances = np.sqrt(((self.points[indices] - point) ** 2).sum(axis=1))
+                nearest = int(np.argmin(distances))
+                if distances[nearest] <= bestDistance:
+                    bestIndex, bestDistance = int(indices[nearest]), float(distances[nearest])
+            else:
+                # visit first the side of the point, pushed last
+                if point[self._axis[node]] < self._split[node]:
+                    stack.extend((self._right[node], self._left[node]))
+                else:
+                    stack.extend((self._left[node], self._right[node]))
+
+        if bestIndex == -1:
+            return -1, np.inf
+        return bestIndex, bestDistance
+
+
+def closestPointsOnTriangles(points, a, b, c):
+    """
+    Closest point of each point on its own triangle, by the voronoi regions of the triangle
+    :param points(np.array): (n, 3) points
+    :param a(np.array): (n, 3) first vertex of each triangle
+    :param b(np.array): (n, 3) second vertex of each triangle
+    :param c(np.array): (n, 3) third vertex of each triangle
+    :return(np.array, np.array): (n, 3) closest points, (n, 3) barycentric weights of a, b and c
+    """
+    points, a, b, c = [np.asarray(array, dtype=np.float64).reshape(-1, 3) for array in (points, a, b, c)]
+    ab = b - a
+    ac = c - a
+    ap = points - a
+    bp = points - b
+    cp = points - c
+    d1 = np.einsum('ij,ij->i', ab, ap)
+    d2 = np.einsum('ij,ij->i', ac, ap)
+    d3 = np.einsum('ij,ij->i', ab, bp)
+    d4 = np.einsum('ij,ij->i', ac, bp)
+    d5 = np.einsum('ij,ij->i', ab, cp)
+    d6 = np.einsum('ij,ij->i', ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    def ratio(numerator, denominator):
+        # degenerated triangles divide by 0, they are solved by a vertex region
+        return numerator / np.where(denominator == 0.0, 1.0, denominator)
+
+    # inside the triangle, then the edge and vertex regions. first region that matches wins,
+    # so they are written from the last to the first
+    barycentric = np.empty((len(points), 3), dtype=np.float64)
+    denom = ratio(1.0, va + vb + vc)
+    barycentric[:, 1] = vb * denom
+    barycentric[:, 2] = vc * denom
+    barycentric[:, 0] = 1.0 - barycentric[:, 1] - barycentric[:, 2]
+
+    edgeBC = ratio(d4 - d3, (d4 - d3) + (d5 - d6))
+    edgeAC = ratio(d2, d2 - d6)
+    edgeAB = ratio(d1, d1 - d3)
+    zeros = np.zeros(len(points))
+    # edge bc, edge ac, vertex c, edge ab, vertex b, vertex a
+    regions = [
+        ((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0), np.stack((zeros, 1.0 - edgeBC, edgeBC), axis=1)),
+        ((vb <= 0) & (d2 >= 0) & (d6 <= 0), np.stack((1.0 - edgeAC, zeros, edgeAC), axis=1)),
+        ((d6 >= 0) & (d5 <= d6), (0.0, 0.0, 1.0)),
+        ((vc <= 0) & (d1 >= 0) & (d3 <= 0), np.stack((1.0 - edgeAB, edgeAB, zeros), axis=1)),
+        ((d3 >= 0) & (d4 <= d3), (0.0, 1.0, 0.0)),
+        ((d1 <= 0) & (d2 <= 0), (1.0, 0.0, 0.0))]
+    for region, value in regions:
+        barycentric[region] = value[region] if isinstance(value, np.ndarray) else value
+
+    closest = barycentric[:, 0:1] * a + barycentric[:, 1:2] * b + barycentric[:, 2:3] * c
+
+    return closest, barycentric
+
+
+class TriangleBVH(KDTree):
+    """
+    Bounding volume hierarchy over the triangles of a mesh.
+    The tree is a KDTree of the triangle centroids, with the node boxes grown to hold the whole triangles.
+    closestPoints solves a batch of points at once, every tree level is one numpy pass over the
+    (point, node) pairs that can still have a closer triangle.
+    """
+    def __init__(self, vertices, triangles, leafSize=8):
+        """
+        :param vertices(np.array): (n, 3) mesh points
+        :param triangles(np.array): (t, 3) triangle vertices
+        :param leafSize(int): max number of triangles in a leaf
+        """
+        self.vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        corners = self.vertices[self.triangles]
+        self._triangleMin = corners.min(axis=1)
+        self._triangleMax = corners.max(axis=1)
+
+        super(TriangleBVH, self).__init__(corners.mean(axis=1), leafSize)
+
+        # triangle data in tree order, the triangles of a leaf are contiguous
+        self._corners = corners[self.order]
+        self._boxMin = self._triangleMin[self.order]
+        self._boxMax = self._triangleMax[self.order]
+
+        # node arrays, indexed by the batch queries
+        self._nodeStart = np.array(self._start, dtype=np.int64)
+        self._nodeEnd = np.array(self._end, dtype=np.int64)
+        self._nodeAxis = np.array(self._axis, dtype=np.int64)
+        self._nodeSplit = np.array(self._split, dtype=np.float64)
+        self._nodeLeft = np.array(self._left, dtype=np.int64)
+        self._nodeRight = np.array(self._right, dtype=np.int64)
+        self._nodeMin = np.array(self._min, dtype=np.float64).reshape(-1, 3)
+        self._nodeMax = np.array(self._max, dtype=np.float64).reshape(-1, 3)
+
+    def _newNode(self, start, end):
+        node = super(TriangleBVH, self)._newNode(start, end)
+        nodeTriangles = self.order[start:end]
+        self._min[node] = self._triangleMin[nodeTriangles].min(axis=0)
+        self._max[node] = self._triangleMax[nodeTriangles].max(axis=0)
+        return node
+
+    def _solveLeaves(self, points, queries, leaves, best):
+        # every (point, leaf) pair against the triangles of the leaf, keeps the nearest of each point.
+        # queries must be sorted
+        counts = self._nodeEnd[leaves] - self._nodeStart[leaves]
+        pairs = np.repeat(np.arange(len(queries)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        slots = self._nodeStart[leaves][pairs] + offsets
+        queries = queries[pairs]
+        queryPoints = points[queries]
+
+        # triangle box rejection, cheaper than the closest point
+        bestDistances, bestTriangles, bestPoints, bestBarycentric = best
+        delta = np.maximum(self._boxMin[slots] - queryPoints, 0.0) + np.maximum(queryPoints - self._boxMax[slots], 0.0)
+        near = (delta ** 2).sum(axis=1) < bestDistances[queries]
+        slots, queries, queryPoints = slots[near], queries[near], queryPoints[near]
+        if not slots.size:
+            return
+
+        corners = self._corners[slots]
+        closest, barycentric = closestPointsOnTriangles(queryPoints, corners[:, 0], corners[:, 1], corners[:, 2])
+        distances = ((closest - queryPoints) ** 2).sum(axis=1)
+
+        # nearest of each point in this batch, pairs come sorted by point
+        groupStart = np.ones(len(queries), dtype=bool)
+        groupStart[1:] = queries[1:] != queries[:-1]
+        groupIds = np.cumsum(groupStart) - 1
+        groupMin = np.minimum.reduceat(distances, np.nonzero(groupStart)[0])
+        candidates = np.nonzero(distances == groupMin[groupIds])[0]
+        first = np.ones(len(candidates), dtype=bool)
+        first[1:] = groupIds[candidates][1:] != groupIds[candidates][:-1]
+        nearest = candidates[first]
+
+        closer = distances[nearest] < bestDistances[queries[nearest]]
+        nearest = nearest[closer]
+        solved = queries[nearest]
+        bestDistances[solved] = distances[nearest]
+        bestTriangles[solved] = self.order[slots[nearest]]
+        bestPoints[solved] = closest[nearest]
+        bestBarycentric[solved] = barycentric[nearest]
+
+    def closestPoints(self, points, maxDistance=np.inf):
+        """
+        Closest point on the mesh of each point
+        :param points(np.array): (n, 3) points
+        :param maxDistance(float): triangles further than this are culled, points without a closer triangle
+                get the triangle row -1
+        :return(np.array, np.array, np.array): (n, 3) closest points, (n) triangle rows,
+                (n, 3) barycentric weights of the triangle vertices
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        best = (np.full(len(points), float(maxDistance) ** 2), np.full(len(points), -1, dtype=np.int64),
+                np.zeros((len(points), 3), dtype=np.float64), np.zeros((len(points), 3), dtype=np.float64))
+        if not len(self.triangles) or not len(points):
+            return best[2], best[1], best[3]
+
+        # first bound: the leaf of each point, descending by the split planes
+        queries = np.arange(len(points))
+        firstLeaves = np.zeros(len(points), dtype=np.int64)
+        inner = np.nonzero(self._nodeAxis[firstLeaves] != -1)[0]
+        while inner.size:
+            nodes = firstLeaves[inner]
+            left = points[inner, self._nodeAxis[nodes]] < self._nodeSplit[nodes]
+            firstLeaves[inner] = np.where(left, self._nodeLeft[nodes], self._nodeRight[nodes])
+            inner = inner[self._nodeAxis[firstLeaves[inner]] != -1]
+        self._solveLeaves(points, queries, firstLeaves, best)
+
+        # pruned traversal, one level of (point, node) pairs at a time
+        nodes = np.zeros(len(points), dtype=np.int64)
+        while queries.size:
+            queryPoints = points[queries]
+            delta = (np.maximum(self._nodeMin[nodes] - queryPoints, 0.0) +
+                     np.maximum(queryPoints - self._nodeMax[nodes], 0.0))
+            keep = (delta ** 2).sum(axis=1) < best[0][queries]
+            queries, nodes = queries[keep], nodes[keep]
+
+            leaf = self._nodeAxis[nodes] == -1
+            # the first leaf of each point is already solved
+            solve = leaf & (nodes != firstLeaves[queries])
+            if solve.any():
+                sort = np.argsort(queries[solve], kind='mergesort')
+                self._solveLeaves(points, queries[solve][sort], nodes[solve][sort], best)
+
+            queries, nodes = queries[~leaf], nodes[~leaf]
+            queries = np.concatenate((queries, queries))
+            nodes = np.concatenate((self._nodeLeft[nodes], self._nodeRight[nodes]))
+
+        return best[2], best[1], best[3]
+
+
+def mirrorPairs(points, mirrorVector=(-1, 1, 1), precision=0.01):
+    """
+    Pair each point with the nearest point to its reflected position.
+    Points are visited from the last to the first, each one pairs with the nearest free point
+    inside precision, and both are removed from the search.
+    :param points(np.array): (n, 3) points
+    :param mirrorVector(tuple): reflection scale per axis, p.e (-1, 1, 1) mirror in x
+    :param precision(float): max distance between the reflected point and its pair
+    :return(list, list, list): pairs [(i, j)], unpaired [i], ambiguous [(i, [candidates])]
+            ambiguous are the points with more than one free candidate inside precision.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    reflected = points * np.asarray(mirrorVector, dtype=np.float64)
+    tree = KDTree(points)
+
+    free = np.ones(len(points), dtype=bool)
+    pairs = []
+    unpaired = []
+    ambiguous = []
+    for i in range(len(points) - 1, -1, -1):
+        if not free[i]:
+            continue
+        free[i] = False
+
+        candidates, distances = tree.queryRadius(reflected[i], precision)
+        candidates = candidates[free[candidates]]
+        if not candidates.size:
+            unpaired.append(i)
+            continue
+
+        if candidates.size > 1:
+            ambiguous.append((i, candidates.tolist()))
+
+        # candidates are sorted by distance
+        pair = int(candidates[0])
+        free[pair] = False
+        pairs.append((i, pair))
+
+    return pairs, unpaired, ambiguous
+
+
+def boundingBox(points):
+    """
+    :param points(np.array): (n, 3) points
+    :return(np.array, np.array): min and max corners
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    return points.min(axis=0), points.max(axis=0)
+
+
+def boxesOverlap(minA, maxA, minB, maxB, padding=0.0):
+    """
+    Check if two axis aligned boxes overlap
+    :param padding(float): distance added to the boxes, p.e search distance
+    :return(bool):
+    """
+    return bool(np.all(np.asarray(minA) - padding <= maxB) and np.all(np.asarray(minB) - padding <= maxA))
+
+
+def pointsInBox(points, boxMin, boxMax, padding=0.0):
+    """
+    :param points(np.array): (n, 3) points
+    :param padding(float): distance added to the box
+    :return(np.array): bool array, True for the points inside the box
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    return np.all((points >= np.asarray(boxMin) - padding) & (points <= np.asarray(boxMax) + padding), axis=1)
+
+
+class Polyline(object):
+    """
+    Dense polyline sampled from a curve, with the curve parameter and tangent of each sample.
+    Closest point queries are solved for all the points at once, in a bvh of the segments.
+    """
+    def __init__(self, points, params, tangents):
+        """
+        :param points(np.array): (m, 3) samples
+        :param params(np.array): (m) curve parameter of each sample, increasing
+        :param tangents(np.array): (m, 3) curve tangent of each sample
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.params = np.asarray(params, dtype=np.float64)
+        self.tangents = np.asarray(tangents, dtype=np.float64).reshape(-1, 3)
+
+        # segment index, segments are degenerated triangles (a, b, b), their closest point is on the segment
+        segments = np.arange(len(self.points) - 1)
+        self._segments = TriangleBVH(self.points, np.stack((segments, segments + 1, segments + 1), axis=1))
+        self.boxMin, self.boxMax = boundingBox(self.points)
+
+    def pointAtParam(self, params):
+        """
+        Linear interpolation of the samples
+        :param params(np.array): (n) params
+        :return(np.array): (n, 3) points
+        """
+        return np.stack([np.interp(params, self.params, self.points[:, axis]) for axis in range(3)], axis=1)
+
+    def tangentAtParam(self, params):
+        """
+        :param params(np.array): (n) params
+        :return(np.array): (n, 3) normalized tangents
+        """
+        tangents = np.stack([np.interp(params, self.params, self.tangents[:, axis]) for axis in range(3)], axis=1)
+        length = np.sqrt((tangents ** 2).sum(axis=1))
+        length[length == 0.0] = 1.0
+        return tangents / length[:, None]
+
+    def closestParams(self, points, maxDistance=np.inf):
+        """
+        Curve parameter of the closest polyline point to each point
+        :param points(np.array): (n, 3) points
+        :param maxDistance(float): points further from the polyline get nan, their search is culled
+        :return(np.array): (n) params
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(self.points) < 2:
+            return np.full(len(points), self.params[0] if len(self.params) else 0.0)
+
+        segment, barycentric = self._segments.closestPoints(points, maxDistance)[1:]
+        found = segment != -1
+        segment = segment[found]
+        # weights of b and its copy c, position along the segment
+        segmentT = barycentric[found, 1] + barycentric[found, 2]
+
+        params = np.full(len(points), np.nan)
+        params[found] = self.params[segment] + segmentT * (self.params[segment + 1] - self.params[segment])
+        return params
+
+    def cylinderQuery(self, points, distance, minParam=None, maxParam=None, tangentTolerance=0.1):
+        """
+        Find the points inside the cylinder of radius distance around the curve.
+        Closest params are clamped to the param range, points beyond the range ends must lie
+        on the plane perpendicular to the curve at the ends, tangentTolerance from it.
+        :param points(np.array): (n, 3) points
+        :param distance(float): cylinder radius
+        :param minParam(float): None -> first param
+        :param maxParam(float): None -> last param
+        :param tangentTolerance(float): max projection of the point-curve vector on the tangent
+        :return(np.array, np.array): indices of the points inside, and their distance to the curve
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        minParam = self.params[0] if minParam is None else minParam
+        maxParam = self.params[-1] if maxParam is None else maxParam
+
+        # bounding box rejection
+        indices = np.nonzero(pointsInBox(points, self.boxMin, self.boxMax, distance))[0]
+        # radius culling, the clamped params can only be further than the closest ones
+        params = self.closestParams(points[indices], distance)
+        near = ~np.isnan(params)
+        indices, params = indices[near], params[near]
+        candidates = points[indices]
+
+        params = np.clip(params, minParam, maxParam)
+        vectors = candidates - self.pointAtParam(params)
+        distances = np.sqrt((vectors ** 2).sum(axis=1))
+        dots = np.einsum('ij,ij->i', vectors, self.tangentAtParam(params))
+
+        inside = (distances < distance) & (np.abs(dots) <= tangentTolerance)
+        return indices[inside], distances[inside]
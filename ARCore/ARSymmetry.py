@@ -0,0 +1,117 @@
+"""
+Barycentric symmetry maps.
+For each vertex, the triangle under its mirrored position and the barycentric weights of that triangle.
+Maps are cached in memory and in .npz files, keyed by mesh topology, rest points and axis.
+Headless, the closest point query is done by the caller, see ARCore.MeshOp.barycentricSym.
+"""
+import os
+import hashlib
+import numpy as np
+
+import ARTopology
+import ARSpatial
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARSymmetry')
+
+# key -> (symIndex, symWeights)
+_SYMMETRY_CACHE = {}
+
+AXIS_INDEX = {'x': 0, 'y': 1, 'z': 2}
+
+
+def symmetryKey(counts, connects, points, axis='x'):
+    """
+    Key of a symmetry map, a change in the topology or the rest points gives a new key
+    :param counts(np.array): polygon vertex counts
+    :param connects(np.array): polygon vertex connects
+    :param points(np.array): (n, 3) rest points, object space
+    :param axis(str): mirror axis
+    :return(str):
+    """
+    md5 = hashlib.md5()
+    # float32, small float noise of the double points should not change the key
+    md5.update(np.ascontiguousarray(points, dtype=np.float32).tobytes())
+
+    return '%s_%s_%s' % (ARTopology.topologyHash(counts, connects), md5.hexdigest(), axis)
+
+
+def mirrorPoints(points, axis='x'):
+    """
+    :param points(np.array): (n, 3) points
+    :param axis(str): mirror axis
+    :return(np.array): new array with the mirrored points
+    """
+    mirrored = np.array(points, dtype=np.float64).reshape(-1, 3)
+    mirrored[:, AXIS_INDEX[axis]] *= -1
+
+    return mirrored
+
+
+def buildSymmetryMap(points, triangles, closestPoints, closestTriangles):
+    """
+    Build the map from the closest point of each mirrored vertex
+    :param points(np.array): (n, 3) mesh points
+    :param triangles(np.array): (t, 3) triangle vertices
+    :param closestPoints(np.array): (n, 3) closest point on the mesh to each mirrored vertex
+    :param closestTriangles(np.array): (n) triangle row of each closest point
+    :return(np.array, np.array): symIndex (n, 3) int32, symWeights (n, 3) float64
+    """
+    points = np.asarray(points, dtype=np.float64)
+    symIndex = np.asarray(triangles)[closestTriangles].astype(np.int32)
+    symWeights = ARSpatial.barycentricCoords(closestPoints, points[symIndex[:, 0]],
+                                             points[symIndex[:, 1]], points[symIndex[:, 2]])
+
+    return symIndex, symWeights
+
+
+def getCached(key, directory=None):
+    """
+    Find a symmetry map in memory, or on disk if directory
+    :param key(str): symmetryKey
+    :param directory(str): cache folder
+    :return(np.array, np.array): symIndex, symWeights or None
+    """
+    if key in _SYMMETRY_CACHE:
+        return _SYMMETRY_CACHE[key]
+
+    if directory:
+        path = os.path.join(directory, '%s.npz' % key)
+        if os.path.exists(path):
+            data = np.load(path)
+            _SYMMETRY_CACHE[key] = (data['symIndex'], data['symWeights'])
+            logger.debug('getCached: symmetry map loaded from %s', path)
+            return _SYMMETRY_CACHE[key]
+
+    return None
+
+
+def setCached(key, symIndex, symWeights, directory=None):
+    """
+    Save a symmetry map in memory, and on disk if directory
+    :param key(str): symmetryKey
+    :param symIndex(np.array): (n, 3)
+    :param symWeights(np.array): (n, 3)
+    :param directory(str): cache folder, created if it does not exist
+    """
+    _SYMMETRY_CACHE[key] = (symIndex, symWeights)
+    if not directory:
+        return
+
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    path = os.path.join(directory, '%s.npz' % key)
+    # write to a temp file and rename, a killed session does not leave half files
+    tempPath = path + '.tmp.npz'
+    np.savez(tempPath, symIndex=symIndex, symWeights=symWeights)
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(tempPath, path)
+    logger.debug('setCached: symmetry map saved in %s', path)
+
+
+def clearCache():
+    """
+    Remove all the symmetry maps from memory, disk files are kept
+    """
+    _SYMMETRY_CACHE.clear()
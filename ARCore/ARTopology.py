@@ -0,0 +1,158 @@
+"""
+Mesh topology helpers based on numpy.
+Topology is described as maya does with MFnMesh.getVertices: polygon vertex counts and
+polygon vertex connects. Everything here is headless, so it can run and be benchmarked outside maya.
+"""
+import hashlib
+import numpy as np
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARTopology')
+
+# (topology hash, numVertices) -> VertexAdjacency
+_ADJACENCY_CACHE = {}
+
+
+def topologyHash(counts, connects):
+    """
+    Hash that identifies a mesh topology, two meshes with the same counts and connects share it.
+    :param counts(np.array): polygon vertex counts
+    :param connects(np.array): polygon vertex connects
+    :return(str): md5 hex digest
+    """
+    md5 = hashlib.md5()
+    md5.update(np.ascontiguousarray(counts, dtype=np.int32).tobytes())
+    md5.update(b'|')
+    md5.update(np.ascontiguousarray(connects, dtype=np.int32).tobytes())
+
+    return md5.hexdigest()
+
+
+class VertexAdjacency(object):
+    """
+    Vertex adjacency of a mesh in CSR format.
+    The neighbours of vertex i are indices[indptr[i]:indptr[i+1]]
+    """
+    def __init__(self, counts, connects, numVertices=None):
+        """
+        :param counts(np.array): polygon vertex counts
+        :param connects(np.array): polygon vertex connects
+        :param numVertices(int): number of vertices, if None, max connect + 1
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        connects = np.asarray(connects, dtype=np.int64)
+        if numVertices is None:
+            numVertices = int(connects.max()) + 1 if connects.size else 0
+        self.numVertices = numVertices
+
+        # each face vertex is connected with the next one of the same face
+        offsets = np.cumsum(counts) - counts
+        faceIds = np.repeat(np.arange(counts.size), counts)
+        nextPos = np.arange(connects.size) + 1
+        faceEnd = nextPos == offsets[faceIds] + counts[faceIds]
+        nextPos[faceEnd] = offsets[faceIds[faceEnd]]
+
+        # both directions, without duplicated edges
+        rows = np.concatenate((connects, connects[nextPos]))
+        cols = np.concatenate((connects[nextPos], connects))
+        keys = np.unique(rows * numVertices + cols)
+        rows = keys // numVertices
+        cols = keys % numVertices
+
+        # keys are sorted, so rows are sorted too
+        self.indices = cols.astype(np.int32)
+        self.rows = rows.astype(np.int32)
+        self.degree = np.bincount(rows, minlength=numVertices).astype(np.int32)
+        self.indptr = np.concatenate(([0], np.cumsum(self.degree))).astype(np.int64)
+
+    def neighbours(self, index):
+        """
+        :param index(int): vertex index
+        :return(np.array): connected vertices
+        """
+        return self.indices[self.indptr[index]:self.indptr[index + 1]]
+
+    def neighbourSum(self, values):
+        """
+        Sparse matrix vector product, sum of the neighbour values of each vertex
+        :param values(np.array): one value per vertex
+        :return(np.array): float64 array
+        """
+        return np.bincount(self.rows, weights=values[self.indices], minlength=self.numVertices)
+
+    def laplacianStep(self, values, factor=None, mask=None):
+        """
+        One umbrella laplacian step: v + factor * (neighbourAverage - v)
+        :param values(np.array): one value per vertex
+        :param factor(float): step size, negative values inflate. if None, each vertex uses
+                degree / (degree + 1), that is the average of the vertex and its neighbours.
+        :param mask(np.array): bool array, only True vertices are modified
+        :return(np.array): float64 array with the new values
+        """
+        values = np.asarray(values, dtype=np.float64)
+        degree = np.maximum(self.degree, 1)
+        delta = self.neighbourSum(values) / degree - values
+        if factor is None:
+            factor = self.degree / (self.degree + 1.0)
+        # isolated vertices do not move
+        delta[self.degree == 0] = 0.0
+
+        result = values + factor * delta
+        if mask is not None:
+            result = np.where(mask, result, values)
+
+        return result
+
+
+def smoothValues(adjacency, values, iterations=1, method='laplacian', factor=None, mask=None, passBand=0.1):
+    """
+    Smooth a per vertex map over the mesh adjacency.
+    :param adjacency(VertexAdjacency):
+    :param values(np.array): one value per vertex
+    :param iterations(int): number of iterations, with taubin each one is a shrink and an inflate step
+    :param method(str): laplacian or taubin. taubin keeps the volume of the map, with less shrink
+    :param factor(float): laplacian step, if None, average of the vertex and its neighbours.
+            taubin needs a value, 0.5 by default
+    :param mask(np.array): bool array, only True vertices are modified
+    :param passBand(float): taubin pass band, used to calculate the inflate step
+    :return(np.array): float64 array with the new values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if method == 'laplacian':
+        for i in range(iterations):
+            values = adjacency.laplacianStep(values, factor, mask)
+
+    elif method == 'taubin':
+        shrink = 0.5 if factor is None else factor
+        inflate = 1.0 / (passBand - 1.0 / shrink)
+        for i in range(iterations):
+            values = adjacency.laplacianStep(values, shrink, mask)
+            values = adjacency.laplacianStep(values, inflate, mask)
+
+    else:
+        raise ValueError('smoothValues: unknown method %s, use laplacian or taubin' % method)
+
+    return values
+
+
+def getAdjacency(counts, connects, numVertices=None):
+    """
+    Return the vertex adjacency of a topology, build it only the first time
+    :param counts(np.array): polygon vertex counts
+    :param connects(np.array): polygon vertex connects
+    :param numVertices(int): number of vertices
+    :return(VertexAdjacency):
+    """
+    key = (topologyHash(counts, connects), numVertices)
+    if key not in _ADJACENCY_CACHE:
+        logger.debug('getAdjacency: build adjacency for topology %s', key[0])
+        _ADJACENCY_CACHE[key] = VertexAdjacency(counts, connects, numVertices)
+
+    return _ADJACENCY_CACHE[key]
+
+
+def clearCache():
+    """
+    Remove all the cached adjacencies
+    """
+    _ADJACENCY_CACHE.clear()
@@ -0,0 +1,211 @@
+"""
+Array based weight maps.
+This module only needs numpy, so it can run and be benchmarked outside maya.
+Weights are stored as contiguous float32 arrays, one value per vertex, and every
+operation works over the whole array at once.
+"""
+import numpy as np
+
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ARWeights')
+
+
+class WeightBuffer(object):
+    """
+    Weight map buffer with numpy storage.
+    It is the array backend of ARCore.DeformerOp.WeightsOP
+    """
+    def __init__(self, weights=None, size=0, value=0.0):
+        """
+        :param weights(list or np.array): initial weights, if None, create a buffer of size elements
+        :param size(int): number of elements when weights is None
+        :param value(float): initial value when weights is None
+        """
+        if weights is None:
+            weights = np.full(size, value, dtype=np.float32)
+
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+
+    def __len__(self):
+        return self.weights.size
+
+    def __getitem__(self, index):
+        return self.weights[index]
+
+    def __setitem__(self, index, value):
+        self.weights[index] = value
+
+    def copy(self):
+        """
+        :return(WeightBuffer): new buffer with a copy of the weights
+        """
+        return WeightBuffer(self.weights.copy())
+
+    def shrink(self):
+        """
+        shrink the weight values, w*w
+        """
+        np.multiply(self.weights, self.weights, out=self.weights)
+
+    def invert(self):
+        """
+        Invert weight values, 1-w
+        """
+        np.subtract(1.0, self.weights, out=self.weights)
+
+    def mirror(self, symIndex, symWeights):
+        """
+        Mirror the weights using barycentric symmetry data.
+        each vertex gets the weights of the three vertices of its mirror triangle.
+        :param symIndex(np.array): (n, 3) int array, vertices of the mirror triangle
+        :param symWeights(np.array): (n, 3) float array, barycentric weights of each vertex of the triangle
+        """
+        symIndex = np.asarray(symIndex).reshape(-1, 3)
+        symWeights = np.asarray(symWeights).reshape(-1, 3)
+
+        # gather the triangle weights and dot with the barycentric coords
+        gathered = self.weights[symIndex]
+        self.weights = np.einsum('ij,ij->i', gathered, symWeights).astype(np.float32)
+
+    def clamp(self, minValue=0.0, maxValue=1.0):
+        """
+        clamp the weight values between minValue and maxValue
+        """
+        np.clip(self.weights, minValue, maxValue, out=self.weights)
+
+    def normalize(self):
+        """
+        Remap the weights to the 0-1 range
+        """
+        minValue = self.weights.min() if self.weights.size else 0.0
+        maxValue = self.weights.max() if self.weights.size else 0.0
+        if maxValue - minValue <= 0.0:
+            logger.info('normalize: flat weight map, nothing to normalize')
+            return
+
+        self.weights -= minValue
+        self.weights /= (maxValue - minValue)
+
+    def blend(self, other, factor=0.5):
+        """
+        Blend between this map and other. factor 0 -> this map, factor 1 -> other map
+        :param other(WeightBuffer or np.array): weights to blend with, same size
+        :param factor(float or np.array): blend value, or a per vertex blend map
+        """
+        other = other.weights if isinstance(other, WeightBuffer) else np.asarray(other, dtype=np.float32)
+        if other.size != self.weights.size:
+            raise ValueError('blend: weight maps must have the same size, %s != %s' % (other.size, self.weights.size))
+
+        factor = factor.weights if isinstance(factor, WeightBuffer) else factor
+        self.weights += (other - self.weights) * np.asarray(factor, dtype=np.float32)
+
+
+def normalizeBuffers(buffers):
+    """
+    Normalize a group of weight maps, so the sum of each vertex is 1.
+    Vertices with no weight in any map are left at 0.
+    :param buffers(list(WeightBuffer)): maps of the same size
+    """
+    stack = np.vstack([buffer.weights for buffer in buffers])
+    total = stack.sum(axis=0)
+    total[total == 0.0] = 1.0
+    for buffer in buffers:
+        buffer.weights /= total
+
+
+########################
+## sparse array utils ##
+########################
+def denseFromSparse(indices, values, size, default=0.0):
+    """
+    Build a dense weight array from the elements of a sparse multi attribute.
+    p.e: the existing elements of blendShape.inputTarget[0].baseWeights
+    :param indices(list(int)): existing logical indices
+    :param values(list(float)): values of the existing indices
+    :param size(int): total of elements, generally the number of vertices
+    :param default(float): value of the non existing elements
+    :return(np.array): float32 array of size elements
+    """
+    dense = np.full(size, default, dtype=np.float32)
+    if indices is None or not len(indices):
+        return dense
+
+    indices = np.asarray(indices, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float32).ravel()
+    # ignore indices out of the range of the mesh
+    valid = indices < size
+    dense[indices[valid]] = values[valid]
+
+    return dense
+
+
+def contiguousRuns(indices):
+    """
+    Group sorted indices in contiguous runs
+    p.e [0, 1, 2, 5, 6, 9] -> [(0, 2), (5, 6), (9, 9)]
+    :param indices(np.array): sorted indices
+    :return(list(tuple)): (first, last) index of each run, both included
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    if not indices.size:
+        return []
+
+    # a new run starts where the step between indices is bigger than 1
+    breaks = np.nonzero(np.diff(indices) > 1)[0]
+    starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    ends = np.concatenate((indices[breaks], [indices[-1]]))
+
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def sparseWriteRuns(weights, existing=None, skipValue=1.0):
+    """
+    Find the elements that must be written to a sparse multi attribute.
+    Elements with the skip value (the attribute default) are skipped, unless they exist yet,
+    in that case they must be overwritten.
+    :param weights(np.array): dense weights
+    :param existing(list(int)): logical indices that exist yet in the attribute
+    :param skipValue(float): value that does not need to be written, generally the attribute default
+    :return(list(tuple)): contiguous runs (first, last) of indices to write
+    """
+    weights = np.asarray(weights)
+    write = weights != skipValue
+    if existing is not None and len(existing):
+        existing = np.asarray(existing, dtype=np.int64)
+        write[existing[existing < weights.size]] = True
+
+    return contiguousRuns(np.nonzero(write)[0])
+
+
+#############
+## falloff ##
+#############
+def distanceFalloff(size, indices, distances, radius, falloff=None):
+    """
+    Dense weights from the distance of some vertices to a deformer influence, p.e a wire curve.
+    :param size(int): number of vertices
+    :param indices(np.array): affected vertices
+    :param distances(np.array): distance of each affected vertex
+    :param radius(float): distance where the weight reaches 0
+    :param falloff(str): None, 1 for the affected vertices. linear or smooth, from 1 on the influence to 0 at radius
+    :return(np.array): float32 array of size elements, not affected vertices are 0
+    """
+    weights = np.zeros(size, dtype=np.float32)
+    indices = np.asarray(indices, dtype=np.int64)
+    if not indices.size:
+        return weights
+
+    if falloff is None:
+        weights[indices] = 1.0
+        return weights
+
+    t = np.clip(np.asarray(distances, dtype=np.float64) / float(radius), 0.0, 1.0)
+    if falloff == 'linear':
+        values = 1.0 - t
+    elif falloff == 'smooth':
+        values = 1.0 - t * t * (3.0 - 2.0 * t)
+    else:
+        raise ValueError('distanceFalloff: unknown falloff %s, use linear or smooth' % falloff)
+    weights[indices] = values
+
+    return weights
@@ -1,6 +1,8 @@
 """
 Auto rig core Funcs and classes
+Submodules are imported on first access, p.e: ARCore.ARCore
 """
-import ARCore
-import ARHelper
-import ctrSaveLoadToJson
\ No newline at end of file
+import ARLazy
+ARLazy.lazyPackage(__name__, ['ARCore', 'ARHelper', 'ctrSaveLoadToJson', 'ARCtrLibrary', 'ARWeights', 'ARTopology',
+                              'ARSpatial', 'ARSymmetry', 'ARNurbs', 'ARGraph', 'ARHierarchy', 'ARNaming',
+                              'ARNameIndex', 'ARMatrixCache', 'ARProfiler', 'ARLogging'])
@@ -1,57 +1,196 @@
 import pymel.core as pm
 import json
 import os
+import contextlib
 from maya.api import OpenMaya
+import ARCtrLibrary
 
 import logging
-logging.basicConfig()
-logger = logging.getLogger('CtrSaveLoadToJson:')
-logger.setLevel(logging.INFO)
+import ARLogging
+logger = ARLogging.getLogger('ARCore.ctrSaveLoadToJson', logging.INFO)
+
+# library file extension of each backend
+BACKEND_EXTENSIONS = {'json': 'json', 'binary': 'bin'}
+
+
+def controllerFile(name, path, backend=None):
+    """
+    Path of a controller library
+    Args:
+        name: file name
+        path: path of file
+        backend: json or binary. None -> binary if the binary library exists, else json.
+            SaveLoadControls keeps both files in sync when both exist, so the detected one is up to date
+
+    Returns: file path
+    """
+    if backend is None:
+        binaryFile = '%s/%s_controllers.%s' % (path, name, BACKEND_EXTENSIONS['binary'])
+        backend = 'binary' if os.path.exists(binaryFile) else 'json'
+
+    return '%s/%s_controllers.%s' % (path, name, BACKEND_EXTENSIONS[backend])
+
 
 # TODO: class type dict. better control and editing
 # A method to save the actual state of dict
 class SaveLoadControls(dict):
 
-    def __init__(self, name, path):
+    def __init__(self, name, path, backend=None, journaled=False, compactThreshold=200):
+        """
+        Args:
+            name: file name
+            path: path of file
+            backend: json or binary storage, see ARCtrLibrary. None -> binary if the binary library exists, else json
+            journaled: if True, stored controllers are appended to a journal instead of rewriting the library
+            compactThreshold: journal records that trigger a compact
+        """
         self.name = name
         self.path = path
-        controllerKey = 'controllers'
-        self._controllerFile = ('%s/%s_%s.json' % (path, name, controllerKey))
+        self._controllerFile = controllerFile(name, path, backend)
+        self.backend = 'binary' if self._controllerFile.endswith(BACKEND_EXTENSIONS['binary']) else 'json'
+        self.journaled = journaled
+        self.compactThreshold = compactThreshold
+        self._journalRecords = 0  # records in the journal file
+        self._batchDepth = 0
+        self._pending = []  # controllers changed inside a batch
 
         super(SaveLoadControls, self).__init__()
 
-        # check if json exists
-        # if file not exist, create
-        if not os.path.exists(self._controllerFile):
-            with open(self._controllerFile, 'w') as f:
-                json.dump(self, f, indent=4)
-        else:
+        # check if the library exists
+        if os.path.exists(self._controllerFile):
             # if exists, load
             self.load()
-
-    def load(self):
+        else:
+            # if file not exist, create it from the library of the other backend if it exists,
+            # an empty library must not replace it
+            otherFiles = self._libraryFiles()[1:]
+            if otherFiles:
+                self.load(*otherFiles[0])
+                logger.info('%s library created from %s', self._controllerFile, otherFiles[0][1])
+            self.save()
+
+    def load(self, backend=None, libraryFile=None):
         """
-        Load json and overwrite the class values
+        Load the library and overwrite the class values
+        :param backend(str): json or binary, None -> backend of the class
+        :param libraryFile(str): library to read, None -> library of the class
         :return:
         """
-        # load json
-        with open(self._controllerFile, 'r') as f:
-            # json to dictionary
-            tempDic = json.load(f)
+        backend = backend or self.backend
+        libraryFile = libraryFile or self._controllerFile
+        if backend == 'binary':
+            library = ARCtrLibrary.BinaryLibrary(libraryFile)
+            try:
+                tempDic = dict((key, data.toJson()) for key, data in library.items())
+            finally:
+                library.close()
+        else:
+            # load json
+            with open(libraryFile, 'r') as f:
+                # json to dictionary
+                tempDic = json.load(f)
 
         # clear and reconstruct dictionary
         self.clear()
         for key, value in tempDic.items():
             self[key] = value
 
+        # changes saved after the last full write
+        records = ARCtrLibrary.readJournal(libraryFile)
+        for key, value in records:
+            if value is None:
+                self.pop(key, None)
+            else:
+                self[key] = value
+        self._journalRecords = len(records)
+
+    def _libraryFiles(self):
+        """
+        Library files to write: the one of this backend, and the ones of the other backends that exist,
+        so readers that detect the backend never read an old library
+        :return(list): (backend, file path)
+        """
+        files = [(self.backend, self._controllerFile)]
+        for backend in BACKEND_EXTENSIONS:
+            if backend != self.backend:
+                otherFile = controllerFile(self.name, self.path, backend)
+                if os.path.exists(otherFile):
+                    files.append((backend, otherFile))
+
+        return files
+
     def save(self):
         """
-        save actual class dictionary to json
+        save actual class dictionary to the library file, and to the library of the other backend if it exists.
+        The files are replaced only when they are completely written, and the journals are removed.
         :return:
         """
-        # save to json
-        with open(self._controllerFile, 'w') as f:
-            json.dump(self, f, indent=4)
+        for backend, libraryFile in self._libraryFiles():
+            # cached data is old now, and mapped files must be released before writing
+            ARCtrLibrary.invalidate(libraryFile)
+
+            if backend == 'binary':
+                ARCtrLibrary.writeBinaryLibrary(libraryFile, self)
+            else:
+                # save to json
+                ARCtrLibrary.atomicWrite(libraryFile, lambda f: json.dump(self, f, indent=4))
+
+            # the library has all the changes now
+            ARCtrLibrary.removeJournal(libraryFile)
+        self._journalRecords = 0
+
+    def compact(self):
+        """
+        Write the journal changes in the library file
+        :return:
+        """
+        self.save()
+
+    def store(self, typeControllers):
+        """
+        Save the changes of some controllers.
+        Inside a batch, changes wait until the batch ends. If journaled, they are appended to the journal,
+        else the whole library is saved.
+        Args:
+            typeControllers: list of controller names
+        """
+        if self._batchDepth:
+            self._pending.extend(typeControllers)
+            return
+
+        if not self.journaled:
+            self.save()
+            return
+
+        records = [(key, self.get(key)) for key in typeControllers]
+        for backend, libraryFile in self._libraryFiles():
+            ARCtrLibrary.appendJournal(libraryFile, records)
+        self._journalRecords += len(typeControllers)
+        if self._journalRecords >= self.compactThreshold:
+            self.compact()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Group several ctrSaveJson calls in one flush
+        p.e:
+            with saveCtr.batch():
+                for sel in selection:
+                    saveCtr.ctrSaveJson(sel)
+        """
+        self._batchDepth += 1
+        try:
+            yield self
+        finally:
+            self._batchDepth -= 1
+            if not self._batchDepth and self._pending:
+                # unique, in order
+                pending = []
+                for key in self._pending:
+                    if key not in pending:
+                        pending.append(key)
+                self._pending = []
+                self.store(pending)
 
     def ctrSaveJson(self, typeController):
         """
@@ -73,14 +212,14 @@ class SaveLoadControls(dict):
             confirmDialog = pm.confirmDialog(m=('%s is already stored, do you want to replace?' % typeController).capitalize(), button=['Replace','Cancel'])
 
             if confirmDialog != 'Replace':
-                logger.info(('%s %s controller not saved' % (self.name, typeController)).capitalize())
+                logger.info('%s %s controller not saved', self.name.capitalize(), typeController)
                 return
 
         # here save list attributes
         controllerAttr = []
         curveShapes = selection.listRelatives(s=True, c=True, type='nurbsCurve')
         for curveShape in curveShapes:
-            print curveShape
+            logger.debug('ctrSaveJson: shape %s', curveShape)
             if not isinstance(curveShape, pm.nodetypes.NurbsCurve):
                 raise ValueError('Controller must be a nurbs curve')
             shapeAttr = []
@@ -98,42 +237,36 @@ class SaveLoadControls(dict):
         # save controller to dictionary
         self[typeController] = controllerAttr, matrixTransform
 
-        # save to json
-        self.save()
+        # save to the library
+        self.store([typeController])
 
-        logger.info('%s %s controller saved at: %s' % (self.name, typeController, self._controllerFile))
+        logger.info('%s %s controller saved at: %s', self.name, typeController, self._controllerFile)
 
 
     @staticmethod
-    def ctrLoadJson(typeController, name, path, SFactor=1, ColorIndex = 4):
+    def ctrLoadJson(typeController, name, path, SFactor=1, ColorIndex = 4, backend=None):
         """
-        Load saved controllers from json
+        Load saved controllers from the library
         Args:
             typeController: controller name
             name: file name
             path: path of file
             SFactor: scale factor
             ColorIndex: color index
+            backend: json or binary. None -> binary if the binary library exists, else json
         Returns: fullPathName of createdController, transform matrix
         """
-        controllerFile = ('%s/%s_controllers.json' % (path, name))
-
-        # load json
-        with open(controllerFile, 'r') as f:
-            # json to dictionary
-            controllerDict = json.load(f)
-
-        # list with controller parameters
-        ctrParameters = controllerDict[typeController][0]
+        # parsed once per file version, see ARCtrLibrary
+        controllerData = ARCtrLibrary.getController(controllerFile(name, path, backend), typeController)
         transform = OpenMaya.MObject()
-        for n, ctrParam in enumerate(ctrParameters):
+        for n, (cvs, knots, degree, form) in enumerate(controllerData.shapes()):
             curveFn = OpenMaya.MFnNurbsCurve()
             # create controller
-            form = curveFn.kOpen if ctrParam[3] == 0 else curveFn.kPeriodic
+            form = curveFn.kOpen if form == 0 else curveFn.kPeriodic
             # multiplyFactor
-            CVPoints = [(i[0]*SFactor, i[1]*SFactor, i[2]*SFactor) for i in ctrParam[0]]
+            CVPoints = (cvs * SFactor).tolist()
             # create curve
-            curveFn.create(CVPoints, ctrParam[1], ctrParam[2], form, False, True,
+            curveFn.create(CVPoints, knots.tolist(), int(degree), form, False, True,
                            transform if isinstance(transform, OpenMaya.MObject) else transform.node())
             # set color
             enhableColorsPlug = curveFn.findPlug('overrideEnabled', False)
@@ -145,7 +278,7 @@ class SaveLoadControls(dict):
                 transform = OpenMaya.MDagPath.getAPathTo(newControllerDagPath.transform())
 
         # return controller name, and saved matrix transform
-        return transform.fullPathName(), controllerDict[typeController][1]
+        return transform.fullPathName(), controllerData.matrix.tolist()
 
 
     @staticmethod
@@ -208,15 +341,17 @@ import pymel.core as pm
 def saveControllersSelection():
     selection = cmds.ls(sl=True)
     cmds.select(cl=True)
-    for sel in selection:
-        cmds.select(sel, r=True)
-        try:
-            saveCtr = autoRig_Tools.ARCore.ctrSaveLoadToJson.SaveLoadControls('akona', 'D:\_docs\_Animum\Akona')
-            saveCtr.ctrSaveJson(sel)
-        except:
-            print "error writing"
-            pass
-        cmds.select(cl=True)
+    saveCtr = autoRig_Tools.ARCore.ctrSaveLoadToJson.SaveLoadControls('akona', 'D:\_docs\_Animum\Akona', journaled=True)
+    # one flush for all the selection
+    with saveCtr.batch():
+        for sel in selection:
+            cmds.select(sel, r=True)
+            try:
+                saveCtr.ctrSaveJson(sel)
+            except:
+                print "error writing"
+                pass
+            cmds.select(cl=True)
 
 saveControllersSelection()
 
@@ -1,13 +1,17 @@
 import pymel.core as pm
 from maya import OpenMaya
 
+import logging
+from ..ARCore import ARLogging
+logger = ARLogging.getLogger('ARTools.ARCallbackSingleton', logging.INFO)
+
 ## callback selection change singleton ##
 def callbackPrint(attr):
     """
     SelectionChanged
     """
     selection = pm.ls(sl=True)
-    print "selection changed", selection, attr
+    logger.info('selection changed %s %s', selection, attr)
 
 if not "mSelEventsSing" in globals():
     mSelEventsSing = []
@@ -15,7 +19,7 @@ if not "mSelEventsSing" in globals():
 if not "createCallbackTemplate" in globals():
     def createCallbackTemplate(func):
         global mSelEventsSing
-        print "Defined createCallBack: ", mSelEventsSing
+        logger.info('Defined createCallBack: %s', mSelEventsSing)
         mEvId = OpenMaya.MEventMessage.addEventCallback("SelectionChanged", func)
         mSelEventsSing.append(mEvId)
 
@@ -9,10 +9,8 @@ import pymel.core as pm
 import math
 from ..ARCore import ARCore as ARC  # relative path ..
 
-import logging
-logging.basicConfig()
-logger = logging.getLogger('rigTools:')
-logger.setLevel(logging.DEBUG)
+from ..ARCore import ARLogging
+logger = ARLogging.getLogger('ARTools.ARTools')
 
 
 def twistBonesCreator(sections):
@@ -98,7 +96,7 @@ class PSDUtils(object):
             # create poseInterpolator
             poseInterpolator = pm.PyNode(pm.poseInterpolator(joint, name=str(joint) + '_poseInterpolator')[0])
             poseInterpolatorShape = poseInterpolator.getShape()
-            print poseInterpolator
+            logger.debug('poseInterpolator: %s', poseInterpolator)
 
             # create basic poses
             for i, pose in enumerate(['neutral', 'neutralSwing', 'neutralTwist']):
@@ -376,24 +374,24 @@ class PSDUtils(object):
         poseInterpolatorName = '_'.join(poseInterpolatorName[2:-3])
         # pose interpolator logic is in the shape
         poseInterpolatorName = '%s_%s_poseInterpolatorShape' % (charName, poseInterpolatorName)
-        logger.debug('poseInterpolator node: %s' % poseInterpolatorName)
+        logger.debug('poseInterpolator node: %s', poseInterpolatorName)
 
         # check if exists
         try:
             poseIntNode = pm.PyNode(poseInterpolatorName)
         except:
-            logger.info('Pose interpolator node %s do not exists' % poseInterpolatorName)
+            logger.info('Pose interpolator node %s do not exists', poseInterpolatorName)
             return
 
         # pose interpolator output values
         poseIntElements = poseIntNode.output.elements()
-        logger.debug('Pose interpolator elements: %s' % poseIntElements)
+        logger.debug('Pose interpolator elements: %s', poseIntElements)
         for intEl in poseIntElements:
             target = poseIntNode.attr(intEl).outputs(p=True)  # p => plug
 
             if target:
                 target = target[0]
-                logger.debug('%s.%s target: %s' % (str(poseIntNode), intEl, target.getAlias()))
+                logger.debug('%s.%s target: %s', poseIntNode, intEl, target.getAlias())
 
                 # target rotation name
                 targetRotation = '_'.join(target.getAlias().split('_')[-3:])
@@ -456,7 +454,7 @@ class CopyDeforms(object):
 
         # create skinCluster
         copySkinCluster = pm.skinCluster(mesh, jointList, mi=skinInf)
-        print copySkinCluster
+        logger.debug('copySkinCluster: %s', copySkinCluster)
         # copy skin weigths
         pm.copySkinWeights(ss=skinCluster, ds=copySkinCluster, noMirror=True, surfaceAssociation='closestPoint',
                            influenceAssociation=('closestJoint', 'closestJoint'))
@@ -496,7 +494,7 @@ class CopyDeforms(object):
         elements = parentAttr.elements()
         indexBS = blendShapeAttr.index()  # logical index of the blendShape
         connection = blendShapeAttr.inputs(p=True)
-        logger.debug('connections %s: %s' % (blendShapeAttr.getAlias(), connection))
+        logger.debug('connections %s: %s', blendShapeAttr.getAlias(), connection)
         connection = connection[0]
         connection.disconnect(blendShapeAttr)
 
@@ -620,11 +618,11 @@ class PickerTools(object):
         colorObject = selection[0]
         shape = cmds.listRelatives(colorObject, s=True)[0]
         color = cmds.getAttr('%s.overrideColorRGB' % shape)[0]
-        print color
+        logger.debug('color: %s', color)
 
         for sel in selection[1:]:
             selShape = cmds.listRelatives(sel, s=True)[0]
-            print selShape + " RGB"
+            logger.debug('%s RGB', selShape)
             cmds.setAttr('%s.overrideEnabled' % selShape, True)
             cmds.setAttr('%s.overrideRGBColors' % selShape, 1)
             cmds.setAttr('%s.overrideColorRGB' % selShape, *color)
@@ -769,7 +767,7 @@ def dupGeoEachFrame(mesh, animatedAttr):
 
     animNode = animatedAttr.inputs(type='animCurve')[0]
     if not animNode:
-        logger.info('%s has not animation' % animatedAttr)
+        logger.info('%s has not animation', animatedAttr)
         return
 
     KeyFrames = [animNode.getTime(i) for i in range(animNode.numKeys())]
@@ -6,10 +6,8 @@ import re
 import pymel.core as pm
 import math
 
-import logging
-logging.basicConfig()
-logger = logging.getLogger('RigUtils:')
-logger.setLevel(logging.DEBUG)
+from ..ARCore import ARLogging
+logger = ARLogging.getLogger('ARTools.ARUtils')
 
 def snapIkFk(controller):
     """
@@ -28,7 +26,7 @@ def snapIkFk(controller):
     # get locator shape, it is common in all ik and fk controllers.
     # also it has the ikFk info
     locatorS = ikCtr.listRelatives(s=True, type=pm.nodetypes.Locator)[0]
-    logger.debug('locatorS: %s' % locatorS)
+    logger.debug('locatorS: %s', locatorS)
     if not locatorS:
         logger.info('is not a ik fk chain')
         return
@@ -37,7 +35,7 @@ def snapIkFk(controller):
     ikFkAttr = locatorS.ikFk
 
     instances = locatorS.getInstances()
-    logger.debug('locator instances: %s' % instances)
+    logger.debug('locator instances: %s', instances)
     ikCtrList = []  # system ik controllers
     fkCtrList = []  # # system Fk controllers
     # get controllers from instances of locator
@@ -242,7 +240,7 @@ def neckHeadIsolateSnap(name, zone, controller, point, orient):
 
     # check if exist
     if not cmds.objExists(headControl):
-        print ('%s do not exists' % headControl)
+        logger.info('%s do not exists', headControl)
         return
 
     # save transforms
@@ -250,13 +248,13 @@ def neckHeadIsolateSnap(name, zone, controller, point, orient):
 
     if orient:
         # set orient
-        print ('set orient')
+        logger.debug('set orient')
         isolate = not cmds.getAttr('%s.isolateOrient' % headControl)
         cmds.setAttr('%s.isolateOrient' % headControl, isolate)
 
     if point:
         # set position
-        print ('set point')
+        logger.debug('set point')
         isolate = not cmds.getAttr('%s.isolatePoint' % headControl)
         cmds.setAttr('%s.isolatePoint' % headControl, isolate)
 
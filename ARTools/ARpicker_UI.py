@@ -8,9 +8,8 @@ import math
 from functools import partial
 
 import logging
-logging.basicConfig()
-logger = logging.getLogger('Picker UI:')
-logger.setLevel(logging.INFO)
+from ..ARCore import ARLogging
+logger = ARLogging.getLogger('ARTools.ARpicker_UI', logging.INFO)
 
 class dragButton(QtWidgets.QPushButton):
     """
@@ -80,7 +79,7 @@ class PickerUI(QtWidgets.QWidget):
             # add a layout
             dlgLayout = QtWidgets.QVBoxLayout(parent)
             dlgLayout.setMargin(0)
-            print ('no dock Window')
+            logger.debug('no dock Window')
 
         super(PickerUI, self).__init__(parent=parent)
 
@@ -155,14 +154,14 @@ class PickerUI(QtWidgets.QWidget):
         # combined keys
         controlShift = modifier == 5
 
-        logger.debug('Modifier value: %s' % modifier)
-        logger.debug('shift: %s' % shift)
-        logger.debug('control: %s' % control)
-        logger.debug('controlShift: %s' % controlShift)
+        logger.debug('Modifier value: %s', modifier)
+        logger.debug('shift: %s', shift)
+        logger.debug('control: %s', control)
+        logger.debug('controlShift: %s', controlShift)
 
         # select command
         cmds.select(object, r=noKey, tgl=shift, add=controlShift, d=control)
-        print 'Select %s' % object
+        logger.debug('Select %s', object)
 
 
 ## UTILS ##
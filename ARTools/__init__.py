@@ -3,7 +3,7 @@ Tools for Auto Rig system.
 ARTools: funcs to use directly in maya
 ARUtils: funcs and tools to use with an ended Rig
 picker_UI: UI picker for a ended Rig
+Submodules are imported on first access, the picker only loads PySide when it is used.
 """
-import ARTools
-import ARUtils
-import ARpicker_UI
\ No newline at end of file
+from ..ARCore import ARLazy
+ARLazy.lazyPackage(__name__, ['ARTools', 'ARUtils', 'ARpicker_UI', 'ARCallbackSingleton'])
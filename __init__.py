@@ -1,24 +1,32 @@
-# remove imports
-import ARAutoRig
-import ARCore
-import ARTools
+"""
+Auto rig tools for maya.
+Subpackages are imported on first access, so p.e the picker or ARTools.ARUtils.snapIkFk
+do not load the whole rigging stack.
+"""
+import sys
+from ARCore import ARLazy
 
-# remove #
-import akona_AutoRig
-import ARAutoRig._autoRig_Abstract
-import ARAutoRig._autoRig_Face
-import ARAutoRig._autoRig_Body
+# dependency order, core modules first
+_RELOAD_ORDER = ['ARCore.ARLogging', 'ARCore.ARProfiler', 'ARCore.ARWeights', 'ARCore.ARTopology',
+                 'ARCore.ARSpatial', 'ARCore.ARSymmetry', 'ARCore.ARNurbs', 'ARCore.ARCtrLibrary',
+                 'ARCore.ARNameIndex', 'ARCore.ARMatrixCache', 'ARCore.ARGraph', 'ARCore.ARHierarchy',
+                 'ARCore.ARNaming', 'ARCore.ctrSaveLoadToJson', 'ARCore.ARCore', 'ARCore.ARHelper',
+                 'ARAutoRig._autoRig_Abstract', 'ARAutoRig._autoRig_Face', 'ARAutoRig._autoRig_Body',
+                 'ARTools.ARUtils', 'ARTools.ARTools', 'ARTools.ARpicker_UI', 'akona_AutoRig']
 
-#### reloads ####
-reload(ARAutoRig._autoRig_Abstract)
-reload(ARAutoRig._autoRig_Face)
-reload(ARAutoRig._autoRig_Body)
-reload(ARAutoRig)
-reload(ARTools.ARpicker_UI)
-reload(ARTools.ARUtils)
-reload(ARTools.ARTools)
-reload(ARAutoRig)
-reload(akona_AutoRig)
-reload(ARCore.ARCore)
-reload(ARCore.ARHelper)
-reload(ARCore.ctrSaveLoadToJson)
\ No newline at end of file
+
+def reloadAll():
+    """
+    Reload the modules already imported, for development. Modules not loaded yet are not imported
+    """
+    for name in _RELOAD_ORDER:
+        module = sys.modules.get('%s.%s' % (__name__, name))
+        if module is not None:
+            reload(module)
+
+    for module in sys.modules.values():
+        if isinstance(module, ARLazy.LazyPackage) and module.__name__.startswith(__name__):
+            module.reset()
+
+
+ARLazy.lazyPackage(__name__, ['ARCore', 'ARAutoRig', 'ARTools', 'akona_AutoRig'])
@@ -0,0 +1,37 @@
+"""
+Shared helpers for the benchmark scripts.
+Benchmarks import the headless ARCore modules directly, so they can run
+without maya: python benchmarks/bench_weights.py
+"""
+import os
+import sys
+import time
+
+CORE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ARCore'))
+if CORE_PATH not in sys.path:
+    sys.path.insert(0, CORE_PATH)
+
+
+def timeIt(func, repeat=3):
+    """
+    Run func repeat times and return the best time in seconds
+    :param func: callable without args
+    :param repeat(int): number of runs
+    :return(float): best time
+    """
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def report(name, oldTime, newTime):
+    """
+    print a line comparing two timings
+    """
+    speedUp = oldTime / newTime if newTime else float('inf')
+    print('%-28s old: %9.4fs  new: %9.4fs  x%.1f' % (name, oldTime, newTime, speedUp))
@@ -0,0 +1,67 @@
+"""
+Benchmark blendShape weights I/O, bulk sparse array access against per plug pymel access.
+Needs maya, run with mayapy: mayapy benchmarks/bench_blendShapeWeights.py
+"""
+import maya.standalone
+maya.standalone.initialize()
+
+import pymel.core as pm
+import maya.cmds as cmds
+import numpy as np
+
+import benchUtils
+import ARCore
+
+SUBDIVISIONS = 200
+
+
+def perPlugGet(BSNode, arraySize):
+    weightAttr = pm.PyNode('%s.inputTarget[0].baseWeights' % BSNode)
+    return [weightAttr[i].get() for i in range(arraySize)]
+
+
+def perPlugSet(BSNode, weights):
+    weightAttr = pm.PyNode('%s.inputTarget[0].baseWeights' % BSNode)
+    for i in range(len(weights)):
+        weightAttr[i].set(float(weights[i]))
+
+
+def createBlendShape():
+    # sphere with a fresh blendShape, without baseWeights elements
+    base = cmds.polySphere(sx=SUBDIVISIONS, sy=SUBDIVISIONS, ch=False)[0]
+    target = cmds.duplicate(base)[0]
+    BSNode = cmds.blendShape(target, base)[0]
+
+    return BSNode, cmds.polyEvaluate(base, v=True)
+
+
+def main():
+    # one node per writer, the per plug write creates every element, and the sparse write would have
+    # nothing to skip on the same node
+    oldBSNode, arraySize = createBlendShape()
+    BSNode, arraySize = createBlendShape()
+    print('vertices: %s' % arraySize)
+
+    random = np.random.RandomState(0)
+    values = random.rand(arraySize).astype(np.float32)
+    # half of the map at the default value, so the sparse write has something to skip
+    values[::2] = 1.0
+
+    weightsOP = ARCore.DeformerOp.WeightsOP()
+    weightsOP._weights = ARCore.ARWeights.WeightBuffer(values)
+
+    oldSet = benchUtils.timeIt(lambda: perPlugSet(oldBSNode, values), repeat=1)
+    newSet = benchUtils.timeIt(lambda: weightsOP.setWeights(BSNode), repeat=1)
+    benchUtils.report('set baseWeights', oldSet, newSet)
+
+    # both reads on the node written by the sparse write
+    oldGet = benchUtils.timeIt(lambda: perPlugGet(BSNode, arraySize), repeat=1)
+    newGet = benchUtils.timeIt(lambda: weightsOP.getWeights(BSNode), repeat=1)
+    benchUtils.report('get baseWeights', oldGet, newGet)
+
+    error = np.abs(weightsOP._weights.weights - np.array(perPlugGet(BSNode, arraySize))).max()
+    print('max error: %s' % error)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark cloneWithHierarchy, one node, xform, list index search and makeIdentity per joint like the old code,
+against the single pass modifier clone.
+Needs maya, run with mayapy: mayapy benchmarks/bench_cloneHierarchy.py
+"""
+import maya.standalone
+maya.standalone.initialize()
+
+import maya.cmds as cmds
+import pymel.core as pm
+
+import benchUtils
+import ARCore
+
+BRANCHES = 60  # facial joint groups under the head
+CHAIN = 5
+
+
+def oldCloneWithHierarchy(root, type="transform", suffix="_dup"):
+    # old code, without the debug lines
+    root = pm.PyNode(root) if isinstance(root, str) else root
+    allChildren = [i for i in root.listRelatives(ad=True) if isinstance(i, pm.nodetypes.Transform) or isinstance(i, pm.nodetypes.Joint)]
+    allChildren.append(root)
+    suffix = "_"+suffix
+
+    if type == "transform":
+        dupFunc = lambda x: pm.group(empty=True, w=True, name=str(x) + suffix)
+    elif type == "locator":
+        dupFunc = lambda x: pm.spaceLocator(name=str(x) + suffix)
+    elif type == "joint":
+        dupFunc = lambda x: pm.createNode("joint", name=str(x) + suffix)
+
+    allDuplicated = []
+    for child in allChildren:
+        dup = dupFunc(child)
+        pm.xform(dup, ws=True, m=pm.xform(child, q=True, ws=True, m=True))
+        allDuplicated.append(dup)
+
+    for i, child in enumerate(allChildren):
+        pChild = child.firstParent()
+        if pChild in allChildren:
+            pChildId = allChildren.index(pChild)
+            allDuplicated[pChildId].addChild(allDuplicated[i])
+            if type == "joint":
+                pm.makeIdentity(allDuplicated[i], apply=True, r=True, t=False, s=False)
+                jointP = allDuplicated[i].firstParent()
+                if not jointP in allDuplicated:
+                    pm.ungroup(jointP)
+
+    return allDuplicated, allChildren
+
+
+def createHead(name):
+    # head joint with branches of oriented joint chains
+    cmds.select(clear=True)
+    head = cmds.joint(name='%s_head_skin_joint' % name, position=(0, 150, 0))
+    for b in range(BRANCHES):
+        cmds.select(head)
+        for c in range(CHAIN):
+            joint = cmds.joint(name='%s_face%s_%s_skin_joint' % (name, b, c),
+                               position=(b % 7 - 3 + c, 150 + b // 7, c * 0.5 + b % 3))
+            cmds.setAttr('%s.rotate' % joint, b * 3 % 40, c * 7, 5)
+    cmds.select(clear=True)
+
+    return head
+
+
+def sameResult(oldClones, newClones):
+    for old, new in zip(oldClones, newClones):
+        oldMatrix = cmds.xform(str(old), q=True, ws=True, m=True)
+        newMatrix = cmds.xform(str(new), q=True, ws=True, m=True)
+        if max(abs(a - b) for a, b in zip(oldMatrix, newMatrix)) > 1e-6:
+            return False
+        if old.getParent() is None and new.getParent() is not None:
+            return False
+        if max(abs(a - b) for a, b in zip(old.rotate.get(), new.rotate.get())) > 1e-6:
+            return False
+
+    return True
+
+
+def main():
+    oldHead = createHead('old')
+    newHead = createHead('new')
+    jointCount = BRANCHES * CHAIN + 1
+
+    result = []
+    for type in ('transform', 'joint'):
+        oldTime = benchUtils.timeIt(lambda: result.append(oldCloneWithHierarchy(oldHead, type, type)), repeat=1)
+        newTime = benchUtils.timeIt(lambda: result.append(ARCore.cloneWithHierarchy(newHead, type, type)), repeat=1)
+        benchUtils.report('clone %s joints, %s' % (jointCount, type), oldTime, newTime)
+        print('same result: %s' % sameResult(result[0][0], result[1][0]))
+        del result[:]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark ARSpatial.TriangleBVH queried one point at a time against one batch query of all the points.
+This is the batching gain of the bvh only, the old MMeshIntersector loop is timed by bench_weightTransfer.py
+with mayapy.
+Headless, uses a uv sphere and points close to its surface.
+"""
+import numpy as np
+
+import benchUtils
+import ARSpatial
+
+SUBDIVISIONS = 80
+POINTS = 20000
+LOOP_POINTS = 2000  # the loop is timed on a subset
+
+
+def sphereMesh(subdivisions):
+    """
+    points and triangles of a uv sphere, without the poles
+    """
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, subdivisions, endpoint=False),
+                       np.linspace(0.1, np.pi - 0.1, subdivisions))
+    points = np.stack((np.cos(u) * np.sin(v), np.sin(u) * np.sin(v), np.cos(v)), axis=-1).reshape(-1, 3)
+    rows, cols = np.meshgrid(np.arange(subdivisions - 1), np.arange(subdivisions), indexing='ij')
+    a = (rows * subdivisions + cols).ravel()
+    b = (rows * subdivisions + (cols + 1) % subdivisions).ravel()
+    triangles = np.concatenate((np.stack((a, b, b + subdivisions), axis=1),
+                                np.stack((a, b + subdivisions, a + subdivisions), axis=1)))
+    return points * (3, 1, 1), triangles
+
+
+def bruteForce(bvh, point):
+    # closest point against every triangle
+    corners = bvh.vertices[bvh.triangles]
+    points = np.repeat(point[None], len(corners), axis=0)
+    closest = ARSpatial.closestPointsOnTriangles(points, corners[:, 0], corners[:, 1], corners[:, 2])[0]
+    return np.sqrt(((closest - point) ** 2).sum(axis=1)).min()
+
+
+def main():
+    random = np.random.RandomState(0)
+    points, triangles = sphereMesh(SUBDIVISIONS)
+    queries = points[random.randint(0, len(points), POINTS)] * 1.05 + random.randn(POINTS, 3) * 0.02
+
+    buildTime = benchUtils.timeIt(lambda: ARSpatial.TriangleBVH(points, triangles), repeat=1)
+    bvh = ARSpatial.TriangleBVH(points, triangles)
+    print('%s triangles, bvh build %.4fs' % (len(triangles), buildTime))
+
+    subset = queries[:LOOP_POINTS]
+    oldTime = benchUtils.timeIt(lambda: [bvh.closestPoints(point[None]) for point in subset], repeat=1)
+    newTime = benchUtils.timeIt(lambda: bvh.closestPoints(subset))
+    benchUtils.report('per point vs batch bvh %s' % LOOP_POINTS, oldTime, newTime)
+    print('batch of %s points: %.4fs' % (POINTS, benchUtils.timeIt(lambda: bvh.closestPoints(queries))))
+
+    closest = bvh.closestPoints(queries)[0]
+    distances = np.sqrt(((closest - queries) ** 2).sum(axis=1))
+    error = max(abs(distances[i] - bruteForce(bvh, queries[i])) for i in range(0, POINTS, POINTS // 100))
+    print('max error against brute force: %.2e' % error)
+
+
+if __name__ == '__main__':
+    main()
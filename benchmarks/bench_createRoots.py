@@ -0,0 +1,93 @@
+"""
+Benchmark createRoots, one pm.group, xform and reparent per object like the old code,
+against the batched OpenMaya 2 modifiers version.
+Needs maya, run with mayapy: mayapy benchmarks/bench_createRoots.py
+"""
+import maya.standalone
+maya.standalone.initialize()
+
+import maya.cmds as cmds
+import pymel.core as pm
+
+import benchUtils
+import ARCore
+
+CONTROLLERS = 1000
+CHAIN = 5
+
+
+def oldCreateRoots(listObjects, suffix='root'):
+    # old code
+    roots = []
+    for arg in listObjects:
+        try:
+            parent = arg.firstParent()
+        except:
+            parent = None
+        rootGrp = pm.group(em=True, name='%s_%s' % (arg, suffix))
+        matrixTransform = pm.xform(arg, q=True, ws=True, m=True)
+        pm.xform(rootGrp, ws=True, m=matrixTransform)
+
+        if parent:
+            parent.addChild(rootGrp)
+        rootGrp.addChild(arg)
+
+        if isinstance(arg, pm.nodetypes.Joint):
+            for axis in ('X', 'Y', 'Z'):
+                arg.attr('jointOrient%s' % axis).set(0.0)
+
+            arg.setRotation((0, 0, 0), 'object')
+
+        roots.append(rootGrp)
+
+    return roots
+
+
+def createObjects(prefix, nodeType):
+    # chains of transforms or joints, rotated and scaled
+    nodes = []
+    for i in range(CONTROLLERS):
+        kwargs = {'parent': nodes[-1]} if i % CHAIN else {}
+        node = cmds.createNode(nodeType, name='%s%s_ctr' % (prefix, i), **kwargs)
+        cmds.setAttr('%s.translate' % node, 1 + i % 3, i % 2, 0.5)
+        cmds.setAttr('%s.rotate' % node, i % 45, 10, -i % 30)
+        if nodeType == 'joint':
+            cmds.setAttr('%s.jointOrient' % node, 5, i % 20, 0)
+        else:
+            cmds.setAttr('%s.scale' % node, 1, 1.2, 1)
+        nodes.append(node)
+
+    return [pm.PyNode(node) for node in nodes]
+
+
+def sameResult(oldNodes, oldRoots, newNodes, newRoots):
+    # world matrices, names and parents
+    for old, new in zip(oldNodes + oldRoots, newNodes + newRoots):
+        oldMatrix = cmds.xform(str(old), q=True, ws=True, m=True)
+        newMatrix = cmds.xform(str(new), q=True, ws=True, m=True)
+        if max(abs(a - b) for a, b in zip(oldMatrix, newMatrix)) > 1e-6:
+            return False
+        oldParent, newParent = old.getParent(), new.getParent()
+        if str(oldParent).replace('old', '') != str(newParent).replace('new', ''):
+            return False
+        for attr in ('translate', 'rotate', 'scale'):
+            if max(abs(a - b) for a, b in zip(old.attr(attr).get(), new.attr(attr).get())) > 1e-6:
+                return False
+
+    return True
+
+
+def main():
+    for nodeType in ('transform', 'joint'):
+        oldNodes = createObjects('old%s' % nodeType, nodeType)
+        newNodes = createObjects('new%s' % nodeType, nodeType)
+
+        result = []
+        oldTime = benchUtils.timeIt(lambda: result.append(oldCreateRoots(oldNodes)), repeat=1)
+        newTime = benchUtils.timeIt(lambda: result.append(ARCore.createRoots(newNodes)), repeat=1)
+        benchUtils.report('createRoots %s %ss' % (CONTROLLERS, nodeType), oldTime, newTime)
+        print('same result: %s' % sameResult(oldNodes, result[0], newNodes, result[1]))
+
+
+if __name__ == '__main__':
+    main()
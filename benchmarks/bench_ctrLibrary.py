@@ -0,0 +1,81 @@
+"""
+Benchmark the controller library loading of a full body build, json parse per controller
+against the ARCtrLibrary cache.
+Headless, uses a synthetic library, the curve creation is not timed.
+"""
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+
+import benchUtils
+import ARCtrLibrary
+
+CONTROLLER_TYPES = 300
+# controllers created by a full body build
+BUILD_CONTROLLERS = 250
+
+
+def createLibrary(path):
+    random = np.random.RandomState(0)
+    library = {}
+    for i in range(CONTROLLER_TYPES):
+        shapes = []
+        for s in range(random.randint(1, 4)):
+            numCvs = random.randint(8, 60)
+            shapes.append([random.rand(numCvs, 3).tolist(), list(range(numCvs + 2)), 3, int(random.randint(0, 2))])
+        library['ctr%s' % i] = shapes, random.rand(16).tolist()
+
+    with open(path, 'w') as f:
+        json.dump(library, f, indent=4)
+
+
+def loadParse(path, typeController):
+    # old path, ctrLoadJson parsed the file for each controller
+    with open(path, 'r') as f:
+        controllerDict = json.load(f)
+    return controllerDict[typeController]
+
+
+def build(loadFunc, path):
+    for i in range(BUILD_CONTROLLERS):
+        loadFunc(path, 'ctr%s' % (i % CONTROLLER_TYPES))
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'bench_controllers.json')
+        createLibrary(path)
+        print('library: %s types, %.1f MB' % (CONTROLLER_TYPES, os.path.getsize(path) / 1e6))
+
+        oldTime = benchUtils.timeIt(lambda: build(loadParse, path), repeat=1)
+        ARCtrLibrary.invalidate()
+        ARCtrLibrary.resetStats()
+        newTime = benchUtils.timeIt(lambda: build(ARCtrLibrary.getController, path), repeat=1)
+        benchUtils.report('build %s controllers' % BUILD_CONTROLLERS, oldTime, newTime)
+        print('cache stats: %s' % ARCtrLibrary.cacheStats())
+
+        same = ARCtrLibrary.getController(path, 'ctr7').toJson() == json.loads(json.dumps(loadParse(path, 'ctr7')))
+        print('same data: %s' % same)
+
+        # binary backend, cold lookup of one type
+        binaryPath = os.path.join(directory, 'bench_controllers.bin')
+        ARCtrLibrary.jsonToBinary(path, binaryPath)
+        print('binary library: %.1f MB' % (os.path.getsize(binaryPath) / 1e6))
+
+        def coldLookup(libraryPath):
+            ARCtrLibrary.invalidate()
+            ARCtrLibrary.getController(libraryPath, 'ctr7')
+
+        jsonTime = benchUtils.timeIt(lambda: coldLookup(path))
+        binaryTime = benchUtils.timeIt(lambda: coldLookup(binaryPath))
+        benchUtils.report('cold lookup, json -> binary', jsonTime, binaryTime)
+        ARCtrLibrary.invalidate()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
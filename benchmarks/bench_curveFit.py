@@ -0,0 +1,74 @@
+"""
+Benchmark snapCurveToPoints on a spine like setup, the iterative nearest cv method of
+the old code against the ARNurbs least squares fit.
+Headless, the closest point query of maya is replaced by a dense sampling and newton steps.
+"""
+import numpy as np
+
+import benchUtils
+import ARNurbs
+
+DEGREE = 3
+NUM_CVS = 8
+JOINTS = 7
+# spine_auto values
+ITERATIONS = 16
+PRECISION = 0.01
+
+
+def spineSetup():
+    random = np.random.RandomState(3)
+    height = np.linspace(0, 60, JOINTS)
+    joints = np.stack((np.zeros(JOINTS), height + 100, 3 * np.sin(height / 15.0)), axis=1) + random.rand(JOINTS, 3) * 0.5
+    # curve between the first and last joint, straight
+    cvs = np.linspace(joints[0], joints[-1], NUM_CVS)
+    spans = NUM_CVS - DEGREE
+    knots = np.concatenate(([0.0] * (DEGREE - 1), np.arange(spans + 1, dtype=np.float64), [float(spans)] * (DEGREE - 1)))
+
+    return joints, cvs, knots
+
+
+def closestPoint(cvs, knots, point):
+    uMin, uMax = ARNurbs.domain(knots, DEGREE)
+    samples = np.linspace(uMin, uMax, 200)
+    curvePoints = ARNurbs.evaluate(cvs, knots, DEGREE, samples)
+    param = samples[np.argmin(np.linalg.norm(curvePoints - point, axis=1))]
+    param = ARNurbs.correctParams(cvs, knots, DEGREE, point[None, :], [param], 3)
+
+    return ARNurbs.evaluate(cvs, knots, DEGREE, param)[0]
+
+
+def iterativeSnap(joints, cvs, knots):
+    # old code, each pass moves the nearest interior cv to each joint
+    cvs = cvs.copy()
+    for i in range(ITERATIONS):
+        for joint in joints:
+            vector = joint - closestPoint(cvs, knots, joint)
+            if np.linalg.norm(vector) < PRECISION:
+                continue
+            nearest = 1 + np.argmin(np.linalg.norm(cvs[1:-1] - joint, axis=1))
+            cvs[nearest] += vector
+
+    return cvs
+
+
+def maxError(joints, cvs, knots):
+    return max(np.linalg.norm(joint - closestPoint(cvs, knots, joint)) for joint in joints)
+
+
+def main():
+    joints, cvs, knots = spineSetup()
+
+    iterativeCVs = []
+    fitCVs = []
+    oldTime = benchUtils.timeIt(lambda: iterativeCVs.append(iterativeSnap(joints, cvs, knots)))
+    newTime = benchUtils.timeIt(lambda: fitCVs.append(
+        ARNurbs.fitCurve(cvs, knots, DEGREE, joints, iterations=2, precision=PRECISION)[0]))
+    benchUtils.report('snapCurveToPoints', oldTime, newTime)
+
+    print('max distance, iterative: %.5f  leastSquares: %.5f' % (maxError(joints, iterativeCVs[-1], knots),
+                                                               maxError(joints, fitCVs[-1], knots)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Joint spacing of jointChain sampling: uniform param steps like the old code, against the CurveSampler
+even arc length frames.
+Headless, the maya curve queries are replaced by single param ARNurbs evaluations, so the timings only show
+the sampler cost. The speedup of jointChain is timed by bench_jointChain.py with mayapy.
+"""
+import numpy as np
+
+import benchUtils
+import ARNurbs
+
+DEGREE = 3
+NUM_CVS = 12
+JOINTS = 60
+
+
+def tailCurve():
+    # uneven cvs, uniform params are far from uniform length steps
+    t = np.linspace(0, 1, NUM_CVS) ** 2 * 3 * np.pi
+    cvs = np.stack((np.cos(t) * 5, t * 4, np.sin(t) * 5), axis=1)
+    spans = NUM_CVS - DEGREE
+    knots = np.concatenate(([0.0] * (DEGREE - 1), np.arange(spans + 1, dtype=np.float64), [float(spans)] * (DEGREE - 1)))
+
+    return cvs, knots
+
+
+def uniformParamFrames(cvs, knots):
+    # old code, one query per joint and value
+    uMin, uMax = ARNurbs.domain(knots, DEGREE)
+    positions, tangents = [], []
+    for param in np.linspace(uMin, uMax, JOINTS):
+        basis, derivatives = ARNurbs.basisMatrix(knots, DEGREE, [param], True)
+        positions.append(basis.dot(cvs)[0])
+        tangents.append(derivatives.dot(cvs)[0])
+
+    return np.array(positions), np.array(tangents)
+
+
+def main():
+    cvs, knots = tailCurve()
+
+    frames = []
+    samplerTime = benchUtils.timeIt(lambda: frames.append(ARNurbs.CurveSampler(cvs, knots, DEGREE).evenFrames(JOINTS)))
+    print('sampler, %s even frames: %.4fs' % (JOINTS, samplerTime))
+
+    oldSteps = np.linalg.norm(np.diff(uniformParamFrames(cvs, knots)[0], axis=0), axis=1)
+    newSteps = np.linalg.norm(np.diff(frames[-1][0], axis=0), axis=1)
+    print('joint distance min/max, uniform params: %.3f/%.3f  arc length: %.3f/%.3f'
+          % (oldSteps.min(), oldSteps.max(), newSteps.min(), newSteps.max()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark ARSpatial.Polyline.cylinderQuery, every point against every segment like the first vectorized version,
+against the segment bvh with radius culling.
+Headless, uses a helix polyline and points around it.
+"""
+import numpy as np
+
+import benchUtils
+import ARSpatial
+
+SAMPLES = 2000
+POINTS = 50000
+RADIUS = 0.5
+CHUNK_SIZE = 4096
+
+
+def denseClosestParams(polyline, points):
+    # old code, projection of each point on each segment, in chunks
+    starts = polyline.points[:-1]
+    vectors = polyline.points[1:] - polyline.points[:-1]
+    lengthSq = np.maximum(np.einsum('ij,ij->i', vectors, vectors), 1e-20)
+    params = np.empty(len(points), dtype=np.float64)
+    for start in range(0, len(points), CHUNK_SIZE):
+        chunk = points[start:start + CHUNK_SIZE]
+        relative = chunk[:, None, :] - starts[None, :, :]
+        t = np.einsum('nmk,mk->nm', relative, vectors) / lengthSq
+        np.clip(t, 0.0, 1.0, out=t)
+        delta = relative - t[:, :, None] * vectors[None, :, :]
+        segment = np.argmin(np.einsum('nmk,nmk->nm', delta, delta), axis=1)
+
+        segmentT = t[np.arange(len(chunk)), segment]
+        params[start:start + len(chunk)] = polyline.params[segment] + \
+            segmentT * (polyline.params[segment + 1] - polyline.params[segment])
+
+    return params
+
+
+def denseCylinderQuery(polyline, points, distance, tangentTolerance=0.1):
+    # old code, without the param range
+    indices = np.nonzero(ARSpatial.pointsInBox(points, polyline.boxMin, polyline.boxMax, distance))[0]
+    candidates = points[indices]
+
+    params = denseClosestParams(polyline, candidates)
+    vectors = candidates - polyline.pointAtParam(params)
+    distances = np.sqrt((vectors ** 2).sum(axis=1))
+    dots = np.einsum('ij,ij->i', vectors, polyline.tangentAtParam(params))
+
+    inside = (distances < distance) & (np.abs(dots) <= tangentTolerance)
+    return indices[inside], distances[inside]
+
+
+def main():
+    random = np.random.RandomState(0)
+    params = np.linspace(0, 6 * np.pi, SAMPLES)
+    points = np.stack((np.cos(params) * 5, params, np.sin(params) * 5), axis=1)
+    polyline = ARSpatial.Polyline(points, params, np.gradient(points, axis=0))
+    queries = points[random.randint(0, SAMPLES, POINTS)] + random.randn(POINTS, 3) * 0.8
+
+    result = []
+    oldTime = benchUtils.timeIt(lambda: result.append(denseCylinderQuery(polyline, queries, RADIUS)), repeat=1)
+    newTime = benchUtils.timeIt(lambda: result.append(polyline.cylinderQuery(queries, RADIUS)), repeat=1)
+    benchUtils.report('cylinder query %s points' % POINTS, oldTime, newTime)
+    print('%s segments, same points: %s' % (SAMPLES - 1, np.array_equal(result[0][0], result[1][0])))
+
+
+if __name__ == '__main__':
+    main()
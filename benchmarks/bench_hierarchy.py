@@ -0,0 +1,57 @@
+"""
+Benchmark arrangeListByHierarchy on skirt like chains, the old list scans against ARHierarchy.
+Headless, works over path strings, listRelatives and fullPath are emulated with dicts.
+"""
+import benchUtils
+import ARHierarchy
+
+CHAINS = 40
+CHAIN_LENGTH = 25
+
+
+def skirtPaths():
+    paths = []
+    for c in range(CHAINS):
+        path = '|akona_rig_grp|akona_hip_joint'
+        for j in range(CHAIN_LENGTH):
+            path += '|akona_skirt%s_%s_joint' % (c, j)
+            paths.append(path)
+    return paths
+
+
+def oldArrange(itemList):
+    # old code, listRelatives(ad=True) emulated with a prefix scan
+    def hierarchySize(path):
+        return len(path.split('|'))
+
+    def listRelatives(path):
+        return [other for other in allPaths if other.startswith(path + '|')][::-1]
+
+    allPaths = list(itemList)
+    itemListCopy = list(itemList)
+    itemListArr = []
+    while len(itemListCopy):
+        toeJoint = []
+        firstJoint = itemListCopy.pop(0)
+        toeJoint.append(firstJoint)
+        for joint in listRelatives(firstJoint):
+            if joint in itemListCopy:
+                toeJoint.append(joint)
+                itemListCopy.remove(joint)
+        itemListArr.append(sorted(toeJoint, key=hierarchySize))
+
+    return itemListArr
+
+
+def main():
+    paths = skirtPaths()
+    oldTime = benchUtils.timeIt(lambda: oldArrange(paths))
+    newTime = benchUtils.timeIt(lambda: ARHierarchy.groupByHierarchy(paths))
+    benchUtils.report('arrangeListByHierarchy', oldTime, newTime)
+
+    newGroups = [[paths[i] for i in group] for group in ARHierarchy.groupByHierarchy(paths)]
+    print('same groups: %s' % (sorted(map(tuple, oldArrange(paths))) == sorted(map(tuple, newGroups))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark the import time of the package and of each module, every import runs in a new interpreter.
+Run with mayapy to time the maya modules, with python only the headless ones can be imported:
+
+    mayapy benchmarks/bench_import.py
+"""
+import os
+import sys
+import subprocess
+
+import benchUtils
+
+PACKAGE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PACKAGE = os.path.basename(PACKAGE_PATH)
+
+MODULES = ['ARCore.ARLogging', 'ARCore.ARProfiler', 'ARCore.ARWeights', 'ARCore.ARTopology', 'ARCore.ARSpatial',
+           'ARCore.ARNurbs', 'ARCore.ARSymmetry', 'ARCore.ARCtrLibrary', 'ARCore.ARNameIndex', 'ARCore.ARMatrixCache',
+           'ARCore.ARGraph', 'ARCore.ARHierarchy', 'ARCore.ARNaming', 'ARCore.ctrSaveLoadToJson', 'ARCore.ARCore',
+           'ARCore.ARHelper', 'ARAutoRig._autoRig_Body', 'ARAutoRig._autoRig_Face', 'ARTools.ARUtils',
+           'ARTools.ARTools', 'ARTools.ARpicker_UI', 'akona_AutoRig']
+
+# old package __init__, every subpackage and module at import
+EAGER_IMPORT = ['ARCore.ARCore', 'ARCore.ARHelper', 'ARCore.ctrSaveLoadToJson', 'ARAutoRig._autoRig_Body',
+                'ARAutoRig._autoRig_Face', 'ARTools.ARTools', 'ARTools.ARUtils', 'ARTools.ARpicker_UI',
+                'akona_AutoRig']
+
+# prints the import time, or the error
+TIMER = '''
+import sys, time
+sys.path.insert(0, %r)
+start = time.time()
+try:
+    for name in %r:
+        __import__(name)
+except Exception as e:
+    print('error %%s' %% e)
+else:
+    print(time.time() - start)
+'''
+
+
+def importTime(modules, repeat=3):
+    """
+    :param modules(list(str)): full module names
+    :param repeat(int): best of repeat runs
+    :return(float or str): seconds, or the import error
+    """
+    best = None
+    for i in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', TIMER % (os.path.dirname(PACKAGE_PATH), modules)])
+        output = output.decode().strip().splitlines()[-1]
+        if output.startswith('error'):
+            return output.split(' ', 1)[1]
+        best = float(output) if best is None else min(best, float(output))
+
+    return best
+
+
+def main():
+    lazy = importTime([PACKAGE])
+    print('%-32s %9.4fs' % (PACKAGE, lazy))
+    for module in MODULES:
+        result = importTime(['%s.%s' % (PACKAGE, module)])
+        if isinstance(result, float):
+            print('%-32s %9.4fs' % (module, result))
+        else:
+            print('%-32s not available: %s' % (module, result))
+
+    eager = importTime(['%s.%s' % (PACKAGE, module) for module in EAGER_IMPORT])
+    if isinstance(eager, float):
+        benchUtils.report('package import', eager, lazy)
+
+
+if __name__ == '__main__':
+    main()
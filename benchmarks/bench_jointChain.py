@@ -0,0 +1,130 @@
+"""
+Benchmark jointChain on a curve: duplicate and rebuild of the curve, and a select, xform and makeIdentity
+per joint like the old code, against the CurveSampler frames and the modifiers joint chain.
+Needs maya, run with mayapy: mayapy benchmarks/bench_jointChain.py
+"""
+import maya.standalone
+maya.standalone.initialize()
+
+import numpy as np
+import maya.cmds as cmds
+import pymel.core as pm
+
+import benchUtils
+import ARCore
+
+CHAINS = 20
+JOINTS = 30
+NUM_CVS = 12
+
+
+def oldJointChain(joints=10, curve=None):
+    # old code, curve branch without the debug lines
+    # to avoid errors clear selection
+    pm.select(cl=True)
+
+    jointsList = []  # to store joints
+
+    # if curve arg
+    if curve:
+        # check type
+        if isinstance(curve, str):
+            curve = pm.PyNode(curve)
+        if isinstance(curve, pm.nodetypes.Transform):
+            curve = curve.getShape()
+
+        # dup the curve and rebuilt it, smoother results
+        curveDup = curve.duplicate()[0]
+        curveDup = curveDup.getShape()
+        pm.rebuildCurve(curveDup, ch=False, rpo=True, rt=False, end=True, kr=False, kep=True,
+                        kt=False, s=curveDup.numCVs(), d=2, tol=0.01)
+
+        # get max param value of the curve
+        maxValue = curveDup.maxValue.get()
+        incrValue = maxValue/(joints-1)  # distance increment per joint
+        for i in range(joints+1):
+            # create joint
+            if i < joints:
+                pm.select(cl=True)
+                joint = pm.createNode('joint')
+                joint.setTranslation(curveDup.getPointAtParam(incrValue * i, 'world'), 'world')
+                pm.select(cl=True)
+            if jointsList:
+                # first construct matrix
+                if i < joints:
+                    vectorX = pm.datatypes.Vector(joint.getTranslation('world') - jointsList[-1].getTranslation('world'))
+                    vectorX.normalize()
+                else:
+                    vectorX = curveDup.tangent(incrValue*(i-1), 'world')
+
+                # if the curve do not has curvature, normal method will give us an error
+                try:
+                    vectorY = curveDup.normal(incrValue*(i-1), 'world')
+                except:
+                    # if it is the case, construct a basic vector
+                    vectorY = pm.datatypes.Vector([0,1,0])
+                    # while dot != 0 the vector isn't perpendicular
+                    if vectorX * vectorY != 0:
+                        # so we force a zero dot. dot formula: v1.x*v2.x + v1.y*v2.y + v1.z*v2.z
+                        vectorY.z = - (vectorX.y*vectorY.y / vectorX.z)
+
+                    # normalize vector
+                    vectorY.normalize()
+
+                vectorZ = vectorX ^ vectorY  # cross product
+                vectorZ.normalize()
+                # recalculate Y
+                vectorY =vectorZ ^ vectorX
+                vectorY.normalize()
+
+                # get position
+                position = curveDup.getPointAtParam(incrValue*(i-1), space='world')
+
+                # apply matrix
+                pm.xform(jointsList[-1], ws=True, m=[vectorX.x, vectorX.y, vectorX.z, 0,
+                                            vectorY.x, vectorY.y, vectorY.z, 0,
+                                            vectorZ.x, vectorZ.y, vectorZ.z, 0,
+                                            position.x, position.y, position.z, 1])
+
+                # freeze rotation
+                pm.makeIdentity(jointsList[-1], apply=True, t=False, r=True, s=False, n=False, pn=False)
+
+            # append new joint
+            if i < joints:
+                jointsList.append(joint)
+
+        # construct hierarchy
+        for i in range(joints-1):
+            jointsList[i].addChild(jointsList[i+1])
+
+        # delete duplicated curve
+        pm.delete(curveDup.getTransform())
+
+    return jointsList
+
+
+def createCurve(name):
+    # tail like curve, uneven cvs
+    t = np.linspace(0, 1, NUM_CVS) ** 2 * 3 * np.pi
+    cvs = np.stack((np.cos(t) * 5, t * 4, np.sin(t) * 5), axis=1)
+    return pm.curve(p=cvs.tolist(), d=3, name=name)
+
+
+def main():
+    curves = [createCurve('tail%s_curve' % i) for i in range(CHAINS)]
+
+    result = []
+    oldTime = benchUtils.timeIt(lambda: result.append([oldJointChain(JOINTS, curve) for curve in curves]), repeat=1)
+    newTime = benchUtils.timeIt(lambda: result.append([ARCore.jointChain(joints=JOINTS, curve=curve)
+                                                       for curve in curves]), repeat=1)
+    benchUtils.report('jointChain %s x %s joints' % (CHAINS, JOINTS), oldTime, newTime)
+
+    # joint spacing along the curve, even with the arc length sampler
+    for name, chains in zip(('old', 'new'), result):
+        positions = np.array([cmds.xform(str(joint), q=True, ws=True, t=True) for joint in chains[0]])
+        steps = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+        print('%s joint distance min/max: %.3f/%.3f' % (name, steps.min(), steps.max()))
+
+
+if __name__ == '__main__':
+    main()
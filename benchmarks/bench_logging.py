@@ -0,0 +1,74 @@
+"""
+Benchmark the debug logging of a full build, eager % formatting against the
+deferred ARLogging calls with the quiet profile.
+Headless, scene nodes are replaced by objects with a slow __str__, like a PyNode that queries its name.
+The call mix follows a full akona build: cloneWithHierarchy, auto_SDK and the builders debug lines.
+"""
+import os
+import logging
+
+import benchUtils
+import ARLogging
+
+# log calls of a full build
+NODE_LOGS = 6000  # cloneWithHierarchy, builders, one node per call
+SDK_LOGS = 4000  # auto_SDK, per axis lines with numbers
+
+
+class FakeNode(object):
+    """
+    str() costs like a PyNode name query
+    """
+    def __init__(self, name):
+        self._name = name
+
+    def __str__(self):
+        return '|'.join([self._name] * 20).split('|')[-1]
+
+
+NODES = [FakeNode('akona_node%s' % i) for i in range(NODE_LOGS)]
+
+
+def eagerBuild(logger):
+    # old code, the message is formatted before the level check
+    for node in NODES:
+        logger.debug('Parent %s' % str(node))
+    for i in range(SDK_LOGS):
+        logger.debug('Current axis SDK: %s, %s' % ('XYZ'[i % 3], i % 3))
+
+
+def deferredBuild(logger):
+    for node in NODES:
+        logger.debug('Parent %s', node)
+    for i in range(SDK_LOGS):
+        logger.debug('Current axis SDK: %s, %s', 'XYZ'[i % 3], i % 3)
+
+
+def main():
+    # keep the terminal clean, records are written to devnull
+    root = logging.getLogger(ARLogging.ROOT)
+    root.propagate = False
+    with open(os.devnull, 'w') as nullStream:
+        handler = logging.StreamHandler(nullStream)
+        root.addHandler(handler)
+        logger = ARLogging.getLogger('ARCore.bench')
+
+        ARLogging.configure('debug')
+        oldDebug = benchUtils.timeIt(lambda: eagerBuild(logger))
+        newDebug = benchUtils.timeIt(lambda: deferredBuild(logger))
+        benchUtils.report('debug profile', oldDebug, newDebug)
+
+        # the old modules were always at DEBUG, the quiet profile drops the records and the formatting
+        ARLogging.configure('quiet')
+        newQuiet = benchUtils.timeIt(lambda: deferredBuild(logger))
+        benchUtils.report('old debug vs quiet profile', oldDebug, newQuiet)
+
+        oldQuiet = benchUtils.timeIt(lambda: eagerBuild(logger))
+        benchUtils.report('quiet, eager vs deferred', oldQuiet, newQuiet)
+
+        root.removeHandler(handler)
+    root.propagate = True
+
+
+if __name__ == '__main__':
+    main()
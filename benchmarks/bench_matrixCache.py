@@ -0,0 +1,59 @@
+"""
+Benchmark guide joint world matrix queries, pm.xform per query like the builders,
+against a build scoped ARMatrixCache.
+Needs maya, run with mayapy: mayapy benchmarks/bench_matrixCache.py
+"""
+import maya.standalone
+maya.standalone.initialize()
+
+import maya.cmds as cmds
+import pymel.core as pm
+
+import benchUtils
+import ARMatrixCache
+
+JOINTS = 500
+QUERIES = 8  # queries of each joint during a build
+
+
+def createJoints():
+    # chains of 10 joints
+    joints = []
+    for i in range(JOINTS):
+        if i % 10:
+            cmds.select(joints[-1])
+        else:
+            cmds.select(clear=True)
+        joints.append(cmds.joint(position=(i % 10, i // 10, (i * 7) % 5), name='guide%s_joint' % i))
+    cmds.select(clear=True)
+
+    return [pm.PyNode(joint) for joint in joints]
+
+
+def main():
+    joints = createJoints()
+
+    oldTime = benchUtils.timeIt(lambda: [pm.xform(joint, q=True, ws=True, m=True)
+                                         for i in range(QUERIES) for joint in joints], repeat=1)
+
+    def cached():
+        with ARMatrixCache.build(joints) as cache:
+            result = [ARMatrixCache.worldMatrix(joint) for i in range(QUERIES) for joint in joints]
+        return cache
+
+    newTime = benchUtils.timeIt(cached, repeat=1)
+    benchUtils.report('%s joints x%s queries' % (JOINTS, QUERIES), oldTime, newTime)
+
+    # moves of the build are seen by the cache
+    with ARMatrixCache.build(joints) as cache:
+        ARMatrixCache.worldMatrix(joints[10])
+        joints[10].translateX.set(3)  # moves its chain
+        moved = [ARMatrixCache.worldMatrix(joint) for joint in joints[10:20]]
+        same = all(max(abs(a - b) for a, b in zip(matrix, pm.xform(joint, q=True, ws=True, m=True))) < 1e-9
+                   for matrix, joint in zip(moved, joints[10:20]))
+    print('same matrices after a move: %s' % same)
+    print('stats: %s' % cache.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark ARSpatial.mirrorPairs against the pairing loop of findMirrorPoints.
+Headless, uses random points mirrored in x.
+"""
+import numpy as np
+
+import benchUtils
+import ARSpatial
+
+POINTS = 2000
+PRECISION = 0.001
+
+
+def loopPairs(points, mirrorVector, precision):
+    # old algorithm, pop and scan the remaining list
+    listObjects = list(range(len(points)))
+    pairs = []
+    unpaired = []
+    while len(listObjects):
+        candidate = None
+        obj = listObjects.pop()
+        searchVector = points[obj] * mirrorVector
+        for mirrorObj in listObjects:
+            distance = np.linalg.norm(points[mirrorObj] - searchVector)
+            if distance <= precision:
+                if candidate is None or distance < np.linalg.norm(points[candidate] - searchVector):
+                    candidate = mirrorObj
+
+        if candidate is not None:
+            listObjects.remove(candidate)
+            pairs.append((obj, candidate))
+        else:
+            unpaired.append(obj)
+
+    return pairs, unpaired
+
+
+def main():
+    random = np.random.RandomState(0)
+    left = random.rand(POINTS // 2, 3) + (0.1, 0, 0)
+    right = left * (-1, 1, 1) + random.rand(POINTS // 2, 3) * PRECISION * 0.1
+    points = np.vstack((left, right))
+    random.shuffle(points)
+    mirrorVector = np.array((-1, 1, 1))
+
+    oldTime = benchUtils.timeIt(lambda: loopPairs(points, mirrorVector, PRECISION), repeat=1)
+    newTime = benchUtils.timeIt(lambda: ARSpatial.mirrorPairs(points, mirrorVector, PRECISION))
+    benchUtils.report('mirror pairs %s points' % POINTS, oldTime, newTime)
+
+    oldPairs = loopPairs(points, mirrorVector, PRECISION)[0]
+    newPairs = ARSpatial.mirrorPairs(points, mirrorVector, PRECISION)[0]
+    print('same pairs: %s' % (sorted(oldPairs) == sorted(newPairs)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark ARTopology smoothing against the per vertex loop of DeformerOp.smoothDeformerWeights.
+Headless, uses a quad grid as mesh.
+"""
+import numpy as np
+
+import benchUtils
+import ARTopology
+
+GRID = 300
+ITERATIONS = 4
+
+
+def gridTopology(size):
+    """
+    counts and connects of a quad grid of size x size faces
+    """
+    rows, cols = np.meshgrid(np.arange(size), np.arange(size), indexing='ij')
+    first = (rows * (size + 1) + cols).ravel()
+    connects = np.stack((first, first + 1, first + size + 2, first + size + 1), axis=1).ravel()
+    counts = np.full(size * size, 4)
+    return counts, connects
+
+
+def loopSmooth(counts, connects, weights, iterations):
+    # old path, the adjacency is rebuilt in each call
+    for it in range(iterations):
+        neighbours = [set() for i in range(len(weights))]
+        offset = 0
+        for count in counts:
+            face = connects[offset:offset + count]
+            for j in range(count):
+                neighbours[face[j]].add(face[(j + 1) % count])
+                neighbours[face[(j + 1) % count]].add(face[j])
+            offset += count
+
+        oldWeights = list(weights)
+        for i in range(len(weights)):
+            weights[i] = (oldWeights[i] + sum(oldWeights[v] for v in neighbours[i])) / (len(neighbours[i]) + 1)
+
+    return weights
+
+
+def arraySmooth(counts, connects, weights, iterations):
+    adjacency = ARTopology.getAdjacency(counts, connects)
+    return ARTopology.smoothValues(adjacency, weights, iterations)
+
+
+def main():
+    counts, connects = gridTopology(GRID)
+    countsList, connectsList = counts.tolist(), connects.tolist()
+    weights = np.random.RandomState(0).rand((GRID + 1) ** 2)
+
+    oldTime = benchUtils.timeIt(lambda: loopSmooth(countsList, connectsList, weights.tolist(), ITERATIONS), repeat=1)
+    ARTopology.clearCache()
+    coldTime = benchUtils.timeIt(lambda: arraySmooth(counts, connects, weights, ITERATIONS), repeat=1)
+    warmTime = benchUtils.timeIt(lambda: arraySmooth(counts, connects, weights, ITERATIONS))
+    benchUtils.report('smooth x%s, cold cache' % ITERATIONS, oldTime, coldTime)
+    benchUtils.report('smooth x%s, warm cache' % ITERATIONS, oldTime, warmTime)
+
+    error = np.abs(np.array(loopSmooth(countsList, connectsList, weights.tolist(), ITERATIONS)) -
+                   arraySmooth(counts, connects, weights, ITERATIONS)).max()
+    print('max error: %s' % error)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark syncListsByKeyword, every primary against every secondary name like the old code,
+against the ARNaming keyed buckets.
+"""
+import benchUtils
+import ARNaming
+
+LIMBS = 40
+TWISTS = 12
+
+
+def oldSyncListsByKeyword(primaryList, secondaryList, keyword=None):
+    # old code
+    filterChars = '1234567890_'
+    if not keyword:
+        count = {}
+        for secondaryItem in secondaryList:
+            for word in str(secondaryItem).split('_'):
+                for fChar in filterChars:
+                    word = word.replace(fChar, '')
+                count[word] = count.get(word, 0) + 1
+        wordsDetect = [word for word in count if count[word] == len(secondaryList) and word not in str(primaryList[0])]
+
+        if len(wordsDetect) != 1:
+            return
+        keyword = wordsDetect[0]
+
+    arrangedSecondary = []
+    for primaryItem in primaryList:
+        actualList = []
+        for secondaryItem in secondaryList:
+            splitStr = str(secondaryItem).partition(keyword)
+            indexCut = None
+            for i, char in enumerate(splitStr[-1]):
+                if char in filterChars:
+                    indexCut = i + 1
+                else:
+                    break
+
+            compareWord = splitStr[0] + splitStr[-1][indexCut:]
+            if compareWord == str(primaryItem):
+                actualList.append(secondaryItem)
+
+        arrangedSecondary.append(actualList)
+
+    return arrangedSecondary
+
+
+def newSyncListsByKeyword(primaryList, secondaryList, keyword=None):
+    # ARCore.syncListsByKeyword without pymel
+    if not keyword:
+        keyword = ARNaming.detectKeyword(primaryList, secondaryList)
+        if not keyword:
+            return
+    return [[secondaryList[i] for i in group] for group in ARNaming.groupByKeyword(primaryList, secondaryList, keyword)]
+
+
+def limbNames():
+    # crowd variant, many limbs with dense twist joints
+    primary, secondary = [], []
+    for limb in range(LIMBS):
+        for zone in ('upperArm', 'foreArm', 'hand'):
+            primary.append('akona%s_%s_left_skin_joint' % (limb, zone))
+            if zone == 'hand':
+                continue
+            for twist in range(TWISTS):
+                secondary.append('akona%s_%s_twist%s_left_skin_joint' % (limb, zone, twist + 1))
+    # unsorted secondaries, like ls results
+    secondary = secondary[1::2] + secondary[::2]
+
+    return primary, secondary
+
+
+def main():
+    primary, secondary = limbNames()
+    result = []
+    for keyword in ('twist', None):
+        oldTime = benchUtils.timeIt(lambda: result.append(oldSyncListsByKeyword(primary, secondary, keyword)))
+        newTime = benchUtils.timeIt(lambda: result.append(newSyncListsByKeyword(primary, secondary, keyword)))
+        benchUtils.report('sync %sx%s %s' % (len(primary), len(secondary), keyword or 'detect'), oldTime, newTime)
+        print('same groups: %s' % (result[0] == result[-1]))
+        del result[:]
+
+
+if __name__ == '__main__':
+    main()
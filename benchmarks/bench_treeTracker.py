@@ -0,0 +1,84 @@
+"""
+Benchmark DGUtils.treeTracker, recursive pymel walk against the ARGraph iterative walk.
+Needs maya, run with mayapy: mayapy benchmarks/bench_treeTracker.py
+"""
+import maya.standalone
+maya.standalone.initialize()
+
+import maya.cmds as cmds
+import pymel.core as pm
+
+import benchUtils
+import ARGraph
+
+CHAIN = 400
+DEEP_CHAIN = 5000
+QUERIES = 20
+
+
+def oldTreeTracker(start, nodeType, inputs=True, maxNodes=0):
+    # old code
+    start = pm.PyNode(start)
+    output = []
+    checkedNodes = set()
+
+    def treeTracker_Recursive(start, nodeType):
+        connectedPlugs = start.inputs(p=True) if inputs else start.outputs(p=True)
+        connectedNodes = set([plug.node() for plug in connectedPlugs])
+        connectedNodes.difference_update(checkedNodes)
+        checkedNodes.update(connectedNodes)
+        for node in connectedNodes:
+            if maxNodes == 0 or maxNodes > len(output):
+                if node.type() == nodeType:
+                    output.append(node)
+                if maxNodes != 0 and maxNodes <= len(output):
+                    break
+                else:
+                    treeTracker_Recursive(node, nodeType)
+
+    treeTracker_Recursive(start, nodeType)
+    return output
+
+
+def createChain(length):
+    # addDoubleLinear chain, a multiplyDivide every 10 nodes
+    nodes = []
+    for i in range(length):
+        node = cmds.createNode('multiplyDivide' if i % 10 == 0 else 'addDoubleLinear')
+        if nodes:
+            outAttr = 'outputX' if cmds.nodeType(nodes[-1]) == 'multiplyDivide' else 'output'
+            inAttr = 'input1X' if cmds.nodeType(node) == 'multiplyDivide' else 'input1'
+            cmds.connectAttr('%s.%s' % (nodes[-1], outAttr), '%s.%s' % (node, inAttr))
+        nodes.append(node)
+
+    return nodes
+
+
+def main():
+    nodes = createChain(CHAIN)
+    end = nodes[-1]
+
+    oldTime = benchUtils.timeIt(lambda: oldTreeTracker(end, 'multiplyDivide'), repeat=1)
+    newTime = benchUtils.timeIt(lambda: ARGraph.walk(end, True, ['multiplyDivide']), repeat=1)
+    benchUtils.report('treeTracker %s nodes' % CHAIN, oldTime, newTime)
+    print('found old: %s new: %s' % (len(oldTreeTracker(end, 'multiplyDivide')),
+                                     len(ARGraph.walk(end, True, ['multiplyDivide']))))
+
+    # repeated queries of a build
+    with ARGraph.GraphSnapshot() as snapshot:
+        oldTime = benchUtils.timeIt(lambda: [oldTreeTracker(end, 'multiplyDivide') for i in range(QUERIES)], repeat=1)
+        newTime = benchUtils.timeIt(lambda: [ARGraph.walk(end, True, ['multiplyDivide'], snapshot=snapshot)
+                                             for i in range(QUERIES)], repeat=1)
+        benchUtils.report('%s queries, snapshot' % QUERIES, oldTime, newTime)
+
+    deepNodes = createChain(DEEP_CHAIN)
+    try:
+        oldTreeTracker(deepNodes[-1], 'multiplyDivide')
+        print('deep chain old: ok')
+    except RuntimeError as e:
+        print('deep chain old: %s' % e)
+    print('deep chain new: %s nodes found' % len(ARGraph.walk(deepNodes[-1], True, ['multiplyDivide'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark DeformerOp.WeightTransfer.closestWeights, one MMeshIntersector query per target vertex like the old code,
+against the batch query of the source triangle bvh.
+Needs maya, run with mayapy: mayapy benchmarks/bench_weightTransfer.py
+"""
+import maya.standalone
+maya.standalone.initialize()
+
+import numpy as np
+import maya.cmds as cmds
+import maya.api.OpenMaya as OpenMaya2
+
+import benchUtils
+import ARCore
+import ARSpatial
+import ARWeights
+
+SUBDIVISIONS = 120
+
+
+def oldClosestWeights(transfer, mesh):
+    # old code, the intersector is built like in the old WeightTransfer init
+    sourceDagPath = ARCore.MeshOp.getDagPath2(transfer.source)
+    intersector = OpenMaya2.MMeshIntersector()
+    intersector.create(sourceDagPath.node(), OpenMaya2.MMatrix())
+    triangleCounts = np.array(OpenMaya2.MFnMesh(sourceDagPath).getTriangles()[0], dtype=np.int64)
+    triangleOffset = np.cumsum(triangleCounts) - triangleCounts
+
+    targetPoints = ARCore.MeshOp.getPoints(str(mesh))
+    closestPoints = np.empty((len(targetPoints), 3), dtype=np.float64)
+    faces = np.empty(len(targetPoints), dtype=np.int64)
+    triangles = np.empty(len(targetPoints), dtype=np.int64)
+    for i, point in enumerate(targetPoints):
+        pointOnMesh = intersector.getClosestPoint(OpenMaya2.MPoint(*point))
+        closestPoint = pointOnMesh.point
+        closestPoints[i] = (closestPoint.x, closestPoint.y, closestPoint.z)
+        faces[i] = pointOnMesh.face
+        triangles[i] = pointOnMesh.triangle
+
+    triangleVertices = transfer._triangles[triangleOffset[faces] + triangles]
+    barycentric = ARSpatial.barycentricCoords(closestPoints, transfer._points[triangleVertices[:, 0]],
+                                              transfer._points[triangleVertices[:, 1]],
+                                              transfer._points[triangleVertices[:, 2]])
+    weights = (barycentric * transfer._vertexWeights[triangleVertices]).sum(axis=1)
+
+    valid = transfer._faceHasMember[faces]
+    return np.nonzero(valid)[0], weights[valid]
+
+
+def main():
+    # body like source with a cluster on its upper half, and a cloth like target over it
+    source = cmds.polySphere(name='source', radius=10, subdivisionsAxis=SUBDIVISIONS,
+                             subdivisionsHeight=SUBDIVISIONS)[0]
+    target = cmds.polySphere(name='target', radius=10.5, subdivisionsAxis=SUBDIVISIONS + 7,
+                             subdivisionsHeight=SUBDIVISIONS + 3)[0]
+    upper = [i for i, point in enumerate(ARCore.MeshOp.getPoints(source)) if point[1] > 0]
+    cluster = cmds.cluster(['%s.vtx[%s]' % (source, i) for i in upper], name='source_cluster')[0]
+    cmds.percent(cluster, ['%s.vtx[%s]' % (source, i) for i in upper[::3]], v=0.4)
+
+    transfer = ARCore.DeformerOp.WeightTransfer(cluster, source)
+    oldTime = benchUtils.timeIt(lambda: oldClosestWeights(transfer, target), repeat=1)
+    newTime = benchUtils.timeIt(lambda: transfer.closestWeights(target))
+    buildTime = benchUtils.timeIt(lambda: ARSpatial.TriangleBVH(transfer._points, transfer._triangles), repeat=1)
+    numVertices = cmds.polyEvaluate(target, vertex=True)
+    benchUtils.report('closest weights %s vertices' % numVertices, oldTime, newTime)
+    print('source bvh build: %.4fs' % buildTime)
+
+    oldIds, oldWeights = oldClosestWeights(transfer, target)
+    newIds, newWeights = transfer.closestWeights(target)
+    oldDense = ARWeights.denseFromSparse(oldIds, oldWeights, numVertices)
+    newDense = ARWeights.denseFromSparse(newIds, newWeights, numVertices)
+    print('vertices: old %s new %s, max weight difference: %.6f' %
+          (len(oldIds), len(newIds), np.abs(oldDense - newDense).max()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark ARWeights.WeightBuffer against the per element loops of DeformerOp.WeightsOP.
+Headless, runs on plain arrays.
+"""
+import numpy as np
+
+import benchUtils
+import ARWeights
+
+VERTICES = 200000
+
+
+def loopShrink(weights):
+    for i in range(len(weights)):
+        weights[i] = weights[i] * weights[i]
+
+
+def loopInvert(weights):
+    for i in range(len(weights)):
+        weights[i] = 1.0 - weights[i]
+
+
+def loopMirror(weights, symWeights, symID):
+    oldWeights = list(weights)
+    for i in range(len(oldWeights)):
+        newWeight = 0.0
+        for j in range(3):
+            newWeight += symWeights[i][j] * oldWeights[symID[i * 3 + j]]
+        weights[i] = newWeight
+
+
+def main():
+    random = np.random.RandomState(0)
+    values = random.rand(VERTICES).astype(np.float32)
+    symID = random.randint(0, VERTICES, (VERTICES, 3))
+    symWeights = random.rand(VERTICES, 3)
+    symWeights /= symWeights.sum(axis=1)[:, None]
+
+    listWeights = values.tolist()
+    listSymID = symID.ravel().tolist()
+    listSymWeights = symWeights.tolist()
+    buffer = ARWeights.WeightBuffer(values)
+
+    print('%s vertices' % VERTICES)
+    benchUtils.report('shrink', benchUtils.timeIt(lambda: loopShrink(listWeights)),
+                      benchUtils.timeIt(buffer.shrink))
+    benchUtils.report('invert', benchUtils.timeIt(lambda: loopInvert(listWeights)),
+                      benchUtils.timeIt(buffer.invert))
+    benchUtils.report('mirror', benchUtils.timeIt(lambda: loopMirror(listWeights, listSymWeights, listSymID), 1),
+                      benchUtils.timeIt(lambda: buffer.mirror(symID, symWeights)))
+
+    # check the results match
+    check = ARWeights.WeightBuffer(values)
+    check.mirror(symID, symWeights)
+    listWeights = values.tolist()
+    loopMirror(listWeights, listSymWeights, listSymID)
+    print('mirror max error: %.2e' % np.abs(check.weights - np.array(listWeights)).max())
+
+    other = ARWeights.WeightBuffer(random.rand(VERTICES))
+    print('clamp %.4fs, normalize %.4fs, blend %.4fs' % (benchUtils.timeIt(buffer.clamp),
+                                                       benchUtils.timeIt(buffer.normalize),
+                                                       benchUtils.timeIt(lambda: buffer.blend(other, 0.3))))
+
+
+if __name__ == '__main__':
+    main()
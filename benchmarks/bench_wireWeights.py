@@ -0,0 +1,66 @@
+"""
+Benchmark the setWireDeformer weights, one percent command per affected vertex and a smooth pass like the old code,
+against the in memory map written with one setWeight call.
+Needs maya, run with mayapy: mayapy benchmarks/bench_wireWeights.py
+"""
+import maya.standalone
+maya.standalone.initialize()
+
+import numpy as np
+import maya.cmds as cmds
+import pymel.core as pm
+
+import benchUtils
+import ARCore
+import ARWeights
+
+SUBDIVISIONS = (60, 120)  # axis, height
+RADIUS = 15
+SMOOTH = 4
+
+
+def createWire(name):
+    # limb like cylinder with a wire along it
+    transform = cmds.polyCylinder(name=name, radius=4, height=100, subdivisionsAxis=SUBDIVISIONS[0],
+                                  subdivisionsHeight=SUBDIVISIONS[1])[0]
+    mesh = pm.PyNode(transform).getShape()
+    curve = pm.curve(ep=[(0, -40, 0), (0, 40, 0)], d=2, name='%s_wire_curve' % name)
+    wire = pm.wire(mesh, gw=False, w=curve, dds=(0, 40))[0]
+
+    return wire, mesh, curve
+
+
+def readWeights(wire, mesh):
+    return np.array(cmds.percent(str(wire), '%s.vtx[*]' % mesh, q=True, v=True))
+
+
+def main():
+    oldWire, oldMesh, oldCurve = createWire('old')
+    newWire, newMesh, newCurve = createWire('new')
+    indices, distances = ARCore.vertexIntoCurveCilinder(str(oldMesh), str(oldCurve.getShape()), RADIUS, .05, .98)
+
+    def oldWeights():
+        # old code
+        pm.percent(oldWire, oldMesh, v=0)
+        for index in indices.tolist():
+            pm.percent(oldWire, oldMesh.vtx[index], v=1)
+        ARCore.DeformerOp.smoothDeformerWeights(str(oldWire), iterations=SMOOTH)
+
+    def newWeights():
+        weights = ARWeights.distanceFalloff(newMesh.numVertices(), indices, distances, RADIUS)
+        ARCore.DeformerOp.setDeformerWeights(str(newWire), weights, SMOOTH)
+
+    oldTime = benchUtils.timeIt(oldWeights, repeat=1)
+    newTime = benchUtils.timeIt(newWeights, repeat=1)
+    benchUtils.report('wire weights %s vertices' % len(indices), oldTime, newTime)
+    print('max weight difference: %.6f' % np.abs(readWeights(oldWire, oldMesh) - readWeights(newWire, newMesh)).max())
+
+    # distance falloff, no binary mask
+    weights = ARWeights.distanceFalloff(newMesh.numVertices(), indices, distances, RADIUS, 'smooth')
+    falloffTime = benchUtils.timeIt(lambda: ARCore.DeformerOp.setDeformerWeights(str(newWire), weights, SMOOTH),
+                                    repeat=1)
+    print('smooth falloff: %.4fs' % falloffTime)
+
+
+if __name__ == '__main__':
+    main()